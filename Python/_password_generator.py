@@ -0,0 +1,6089 @@
+#!/usr/bin/env python3
+"""
+Генератор случайных паролей с настройкой сложности
+
+Весь код генератора. Запускается и импортируется через password_generator.py:
+этот модуль Python кеширует в __pycache__ в виде байткода, а запускаемый
+скрипт компилируется заново при каждом запуске.
+"""
+
+import bisect
+import functools
+import math
+import operator
+import os
+import struct
+import sys
+from array import array
+
+# argparse, datetime, hashlib, mmap и concurrent.futures импортируются
+# лениво: обычный запуск "-l 16" не должен платить за их загрузку
+
+try:
+    from collections import _count_elements
+except ImportError:
+    def _count_elements(mapping, iterable):
+        """Подсчёт элементов (запасной вариант для реализаций без C-версии)"""
+        for element in iterable:
+            mapping[element] = mapping.get(element, 0) + 1
+
+
+# Публичный API для использования как библиотеки
+__all__ = [
+    'PasswordGenerator', 'PasswordPool', 'PasswordServer',
+    'CharsetPolicy', 'ConstraintPolicy', 'PatternPolicy', 'Wordlist', 'BreachIndex',
+    'EntropyBuffer', 'AlphabetSampler', 'FingerprintSet', 'StageProfiler',
+    'StrengthResult', 'AuditStats', 'EntropyReport', 'PasswordWriter', 'EncryptedWriter',
+    'check_password_strength', 'check_strength_batch', 'audit_passwords',
+    'charset_entropy_report', 'diceware_entropy_report', 'diceware_entropy_bits',
+    'collision_probability', 'uniqueness_warning', 'iter_unique',
+    'hash_password', 'hash_params', 'parse_hash_cost', 'iter_hashed', 'export_hashes',
+    'save_to_file', 'stream_passwords', 'decrypt_stream', 'request_passwords', 'main',
+]
+
+
+# Наборы символов
+LOWERCASE = "abcdefghijklmnopqrstuvwxyz"
+UPPERCASE = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+DIGITS = "0123456789"
+SPECIAL_CHARS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+AMBIGUOUS_CHARS = "0Ol1I"
+
+# Параметры файла политики (--policy) и их значения по умолчанию;
+# min_* = None означает 1 для включённого типа символов
+POLICY_OPTIONS = {
+    'length': None,
+    'lowercase': True,
+    'uppercase': True,
+    'digits': True,
+    'special': True,
+    'special_chars': SPECIAL_CHARS,
+    'exclude_ambiguous': False,
+    'min_lowercase': None,
+    'min_uppercase': None,
+    'min_digits': None,
+    'min_special': None,
+    'max_repeat': 0,
+    'max_sequence': 0,
+    'forbidden': (),
+    'forbidden_ignore_case': True,
+}
+# Последовательности, запрещаемые max_sequence (в обе стороны, буквы
+# без учёта регистра): алфавит, цифры и ряды клавиатуры
+POLICY_SEQUENCES = (LOWERCASE, DIGITS, "qwertyuiop", "asdfghjkl", "zxcvbnm")
+# Предел размера таблиц ConstraintPolicy для одной длины
+# (позиции x состояния автомата x векторы счётчиков)
+POLICY_TABLE_LIMIT = 2_000_000
+
+# Классы символов шаблона (--pattern): согласные, гласные, буквы, цифры,
+# спецсимволы и любой символ; остальные символы шаблона переносятся как есть
+PATTERN_CLASSES = {
+    'c': "bcdfghjklmnpqrstvwxz",
+    'C': "BCDFGHJKLMNPQRSTVWXZ",
+    'v': "aeiouy",
+    'V': "AEIOUY",
+    'a': LOWERCASE,
+    'A': UPPERCASE,
+    '9': DIGITS,
+    '!': SPECIAL_CHARS,
+    '*': LOWERCASE + UPPERCASE + DIGITS + SPECIAL_CHARS,
+}
+
+# Параметры потокового вывода
+STREAM_CHUNK_SIZE = 10000
+OUTPUT_BUFFER_SIZE = 1 << 20
+# Сколько байт с конца файла читать, чтобы продолжить нумерацию при --append
+OUTPUT_TAIL_SIZE = 1 << 16
+
+# Форматы вывода (--format): text - с заголовком и нумерацией, raw - по
+# паролю в строке, nul - через нулевой байт, jsonl и csv - для программ
+OUTPUT_FORMATS = ("text", "raw", "jsonl", "csv", "nul")
+
+# Хеширование паролей для выгрузки (--hash)
+HASH_METHODS = ("pbkdf2", "scrypt")
+HASH_DEFAULT_COST = {
+    "pbkdf2": {"iterations": 600000},
+    "scrypt": {"n": 1 << 14, "r": 8, "p": 1},
+}
+HASH_CHUNK_SIZE = 16
+HASH_SALT_SIZE = 16
+# hashlib.scrypt принимает maxmem только меньше INT_MAX
+SCRYPT_MAXMEM_LIMIT = (1 << 31) - 1
+
+# Сжатие и шифрование файлов вывода (--compress, --encrypt)
+COMPRESSION_METHODS = ("gzip", "lzma", "zstd")
+ENCRYPT_MAGIC = b"PGENC1\0\0"
+ENCRYPT_FRAME_SIZE = 1 << 16
+ENCRYPT_SCRYPT_N = 1 << 15
+ENCRYPT_SCRYPT_R = 8
+ENCRYPT_SCRYPT_P = 1
+PASSPHRASE_ENV = "PASSWORD_GENERATOR_PASSPHRASE"
+
+# Бэкенды генерации символьных паролей
+BACKENDS = ("auto", "python", "numpy")
+NUMPY_MIN_BATCH = 64
+
+# Параметры режима сервера (--serve)
+SERVER_MAX_COUNT = 1000000
+SERVER_MAX_LENGTH = 1024
+SERVER_MAX_CHARS = 1 << 24
+SERVER_WORD_CHARS = 8
+SERVER_INLINE_CHARS = 100000
+SERVER_ENTROPY_BLOCK = 1 << 20
+
+# Параметры проверки существующих паролей (--audit)
+AUDIT_BLOCK_SIZE = 1 << 20
+AUDIT_DUP_BUCKETS = 1024
+AUDIT_DUP_SPILL = 1 << 20
+
+# Кеш скомпилированных словарей diceware
+WORDLIST_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'password_generator'
+)
+WORDLIST_CACHE_MAGIC = b"PGWL1\0"
+
+# Индекс утёкших паролей (--build-index, --breach-index)
+BREACH_INDEX_MAGIC = b"PGBI1\0\0\0"
+BREACH_INDEX_FANOUT_BITS = 16
+BREACH_INDEX_RUN_SIZE = 1 << 21
+# Сколько раз подряд можно получить только утёкшие пароли
+BREACH_MAX_ATTEMPTS = 100
+
+# Детерминированный режим (--deterministic --seed): персонализация BLAKE2b
+SEED_PERSONALIZATION = b"pwgen-seed-v1"
+
+# Встроенный словарь для diceware генерации
+# (1593 слова: ~10.6 бит на слово, ~53 бита при 5 словах).
+# Хранится одной строкой и разбирается только при первом обращении
+# (Wordlist.builtin() или DICEWARE_WORDLIST)
+_DICEWARE_WORDS = """
+able about above acid acne acre adam aged ages aide
+aims alan alex ally alto anna anne anti ants arch
+area args army arts asia atom aunt auto away baby
+back bags bail bake ball band bank bare bark barn
+base bash bass bath bats beam bean bear beat been
+beer bell belt bend bent berg bert best beta beth
+bias bike bill bind bird bite bits blue blur boat
+body bold bolt bomb bond bone book boom boot bore
+born boss both bowl boys brad brag bran brat brew
+brig brim bulk bull bump bunk burn bush busy buzz
+byte cafe cage cake calf call calm came camp cane
+cape card care carl carp carr cart case cash cast
+cave cell cent chad char chat chef chen chip chop
+cite city clan clap clay clip club clue coal coat
+code coin cold cole coma comb come cone cook cool
+cope copy cord core cork corn cost cozy crab crew
+crop crow cruz cuba cube cult cure curl cute cyan
+dale dame damp dana dane dang dare dark darn dart
+dash data date dawn days dead deaf deal dean dear
+debt deck deed deem deep deer demo deny desk dial
+dice died diet dime dine dire dirt disc dish disk
+dive dock does doll dome done doom door dose doug
+dove down doze drag dram draw drew drop drug drum
+dual duck duct dude duel duke dull dumb dump dune
+dunk dusk dust duty dyer dyke each earl earn ears
+ease east easy eats echo edge edit eggs eith else
+emit emma envy epic eric erik euro even ever evil
+exam exit eyed eyes face fact fade fail fair fake
+fall fame fare farm fast fate fawn fear feat feel
+fees feet fell felt fern fest fiat file fill film
+find fine fire firm fish fist five flag flap flat
+flaw fled flee flew flex flip flit flow flux foam
+foil fold folk fond font food fool foot ford fore
+fork form fort four fowl fran fred free frog from
+fuel full fund funk fury fuse fuss gain gale game
+gang gaps gary gate gave gear gene germ gets gift
+gina girl give glad glow glue goal goat goes gold
+golf gone good gore gosh gown grab grad gram gray
+greg grew grey grid grim grin grip grit grow grub
+gulf gull gust guys hack hail hair half hall halt
+hand hang hank hans hard hare harm harp hart hash
+hate have hawk haze hazy head heal heap hear heat
+heck heel heir held hell helm help hemp hens herb
+here hero hers hide high hike hill hilt hint hire
+hits hive hoax hold hole holy home hong hood hoof
+hook hoop hope horn host hour huge hugh hull hunt
+hurt hyde hymn icon idea idle igor inch info into
+iowa iran iraq iris iron isle item ivan jack jade
+jail jake jane jazz jean jeff jerk jest jets jews
+jill joan jobs joel joey john join joke jose josh
+juan judy july jump june junk jury just jute kant
+karl kate keen keep kent kept kern keys khan kick
+kids kill kilo kind king kirk kiss kite knee knew
+knit knob knot know kong kurt labs lace lack lacy
+lady laid lake lamb lame lamp land lane lang laps
+lard lars lash last late lava lawn laws lazy lead
+leaf leak lean leap left legs lend lens lent leon
+less levy liar lice lick lied lien lies lieu life
+lift like lily limb lime limp line ling link lint
+lion lips lisa lisp list live load loaf loan lock
+loft logo logs loin lone long look loop loot lord
+lore lose loss lost lots loud lout love luck lucy
+luge luis luke lump lung lure lush lust lute lynx
+lyon lyre mace made maid mail maim main make male
+mall malt mama mane many maps marc mare mark mars
+mary mash mask mass mast mate math matt maul maya
+mayo maze mead meal mean meat meek meet melt memo
+mend menu meow mere mesa mesh mess mice mike mild
+mile milk mill milo mime mind mine ming mini mink
+mint miss mist mite mitt moan moat mock mode mold
+mole molt monk mood moon moor moot mope more morn
+moss most moth move much muck mule mum muse mush
+musk must mute mutt myth nail name nape navy near
+neat neck need neil neon nero nest neva news newt
+next nice nick nigh nina nine noah node noir none
+noon norm nose note noun nova nude null numb nuts
+oath obey odds odor ohio oily okay omen omit once
+only onto oops ooze opal open opus oral orca orcs
+otto ouch ours oust outs oven over owed owes owls
+owns pace pack pact page paid pail pain pair pale
+palm pane pang pant papa para pare park part pass
+past path paul pave pawn pays peak peal pear peas
+peat peck peek peel peer pelt penn pens peon perk
+perm pert pest pete pets pews phil pier pies pigs
+pike pile pill pine ping pink pins pint pipe pita
+pity plan play plea pled plot plow ploy plug plum
+plus poem poet poke pole poll polo pond pony pool
+poop poor pope pops pore pork porn port pose posh
+post posy pour pout pray prep prey prim prod prof
+prop pros prow prune puff puke pull pulp puma pump
+punk puns punt puny pupa pups pure purl purr push
+puts putt quad quay quid quit quiz race rack raft
+rage raid rail rain rake ramp rand rang rank rant
+rare rash rate rats rave rays raze razz read real
+ream reap rear reed reef reek reel refs rein rely
+rend reno rent rest reva rice rich rick ride rife
+rift rigs rill rims rind ring rink riot ripe rise
+risk rita rite road roam roan roar robe robs rock
+rode rods roil role roll rome romp rood roof rook
+room root rope rosa rose ross rosy rote rots rout
+rove rows roxy rube ruby ruck rude rued rues ruff
+rugs ruin rule rump rums rune rung runs runt ruse
+rush rusk rust ruth ruts ryde ryan sack safe saga
+sage sago said sail sake sale salt same sand sane
+sang sank sara sash sass sate saul save sawn saws
+says scab scam scan scar scat scot seal seam sear
+seas seat sect seed seek seem seen seep seer self
+sell semi send sent sept serf seth sets sewn sews
+sexy shag shah sham shaw shed shin ship shiv shoe
+shop shot show shun shut sick side sigh sign silk
+sill silo silt sine sing sink sins sips sire site
+sits size skew skid skim skin skip skis skit slab
+slag slam slap slat slaw slay sled slew slid slim
+sling slip slit slob sloe slog slop slot slow slue
+slug slum slur slut smog smug smut snag snap snip
+snob snot snow snub snug soak soap soar sobs sock
+soda sofa soft soil sold sole solo soma some song
+sons soon soot sops sore sort soul soup sour sous
+sown sows soya soys spam span spar spas spat spec
+sped spew spin spit spot spry spud spun spur stab
+stag stan star stat stay stem step stew stir stop
+stow stub stud stun subs such suds sued suer sues
+suit sulk sumo sums sung sunk suns supe sure surf
+surg swab swag swam swan swap swat sway swim swop
+swum sync tabs tack taco tact tags tail take tale
+talk tall tame tamp tang tank tans tape taps tara
+tare tarn taro tarp tars tart task tate taut taxi
+teak teal team tear teas teat tech teed teem teen
+tees tell temp tend tens tent term tern test text
+than that thaw thee them then thew they thin this
+thou thud thug thus tick tide tidy tied tier ties
+tiff tift tile till tilt time tina tine ting tins
+tint tiny tips tire toad tock toes toff tofu toga
+togs toil told toll tomb tome toms tone tong tons
+tony took tool toot tops tore torn tort tory toss
+tote tots tour tout town toys trad tram trap tray
+tree trek trey trim trio trip trod trot troy true
+tsar tuba tube tubs tuck tuft tugs tuna tune tung
+tunk turf turk turn tusk tutu twig twin twit type
+typo tyre ugly ulna undo unit unto upon urea urge
+uric urns used user uses utah vail vain vale vamp
+vane vans vary vase vast vats veal veer veil vein
+vela vend vent verb vera vers very vest veto vets
+vial vice vida vied vies view vile vill vine vino
+vins vint viny viol visa vise void volt vote vows
+wade wads waft wage wags waif wail wait wake walk
+wall walt wand wane want ward ware warm warn warp
+wars wart wary wash wasp wave wavy waxy ways weak
+weal wean wear webb weds weed week weep weft weir
+well welt went wept were west wets what when whet
+whey whim whip whir whit whom whop wick wide wife
+wigs wild wile will wilt wily wimp wind wine wing
+wink wins wipe wire wiry wise wish wisp with wits
+woes woke wolf womb wont wood woof wool woos word
+wore work worm worn wort wove wows wrap wren writ
+wynn xray yale yank yard yarn yawn yeah year yell
+yelp yens yeti yews yoke yolk york your yowl yuan
+yuck yule yuma yurt zeal zebu zeds zeke zero zest
+zeta zeus zinc zing zion zips zits zone zonk zoom
+zoos zulu zuni
+"""
+
+
+class EntropyBuffer:
+    """
+    Буферизованный источник криптографически стойких случайных байтов
+
+    Читает os.urandom большими блоками, чтобы не обращаться к ОС
+    за каждым символом пароля. Буфер не потокобезопасен: PasswordGenerator
+    держит отдельный буфер для каждого потока.
+    """
+
+    def __init__(self, block_size=65536):
+        """
+        Args:
+            block_size (int): Минимальный размер блока, читаемого из ОС
+        """
+        self.block_size = block_size
+        self._buffer = b""
+        self._pos = 0
+        self._pid = os.getpid()
+
+    def read(self, n):
+        """
+        Возвращает n случайных байтов из буфера
+
+        Args:
+            n (int): Количество байтов
+
+        Returns:
+            bytes: Случайные байты
+        """
+        if self._pid != os.getpid():
+            # После fork буфер родителя нельзя использовать повторно
+            self._buffer = b""
+            self._pos = 0
+            self._pid = os.getpid()
+        available = len(self._buffer) - self._pos
+        if n > available:
+            self._buffer = self._buffer[self._pos:] + os.urandom(max(self.block_size, n - available))
+            self._pos = 0
+        data = self._buffer[self._pos:self._pos + n]
+        self._pos += n
+        return data
+
+    def prefill(self):
+        """Заранее заполняет буфер, чтобы первые запросы не ждали os.urandom"""
+        self.read(0)
+        available = len(self._buffer) - self._pos
+        if available < self.block_size:
+            self._buffer = self._buffer[self._pos:] + os.urandom(self.block_size - available)
+            self._pos = 0
+
+    def randbelow(self, n):
+        """
+        Возвращает случайное целое число из диапазона [0, n) без смещения
+
+        Args:
+            n (int): Верхняя граница (не включается)
+
+        Returns:
+            int: Случайное число
+        """
+        if n <= 0:
+            raise ValueError("Верхняя граница должна быть положительной")
+        bits = (n - 1).bit_length()
+        if bits == 0:
+            return 0
+        nbytes = (bits + 7) // 8
+        excess = nbytes * 8 - bits
+        # Отбрасываем значения вне диапазона, чтобы не было смещения
+        while True:
+            value = int.from_bytes(self.read(nbytes), 'big') >> excess
+            if value < n:
+                return value
+
+
+class SeededStream:
+    """
+    Детерминированный поток байтов для пароля с заданным номером
+
+    Байты - BLAKE2b с ключом из seed в режиме счётчика:
+    blake2b(номер пароля || номер блока, key). Поток пароля i не зависит
+    от остальных, поэтому любой пароль вычисляется отдельно, а результат
+    не зависит от разбиения на пачки и процессы. Это НЕ секретные пароли:
+    любой, кто знает seed, получит те же самые.
+    """
+
+    randbelow = EntropyBuffer.randbelow
+
+    def __init__(self, key, index):
+        """
+        Args:
+            key (bytes): Ключ из seed_key()
+            index (int): Номер пароля (от 0)
+        """
+        import hashlib
+
+        if not 0 <= index < 1 << 128:
+            raise ValueError("Номер пароля должен быть от 0 до 2^128")
+        self._blake2b = hashlib.blake2b
+        self._key = key
+        self._prefix = index.to_bytes(16, 'little')
+        self._counter = 0
+        self._buffer = b""
+        self._pos = 0
+
+    @staticmethod
+    def seed_key(seed):
+        """
+        Ключ потока из seed
+
+        Args:
+            seed (str или bytes): Seed
+
+        Returns:
+            bytes: 32-байтовый ключ
+        """
+        import hashlib
+
+        if isinstance(seed, str):
+            seed = seed.encode('utf-8')
+        return hashlib.blake2b(seed, digest_size=32, person=SEED_PERSONALIZATION).digest()
+
+    def read(self, n):
+        """
+        Возвращает следующие n байтов потока
+
+        Args:
+            n (int): Количество байтов
+
+        Returns:
+            bytes: Байты потока
+        """
+        available = len(self._buffer) - self._pos
+        if n > available:
+            blocks = [self._buffer[self._pos:]]
+            while available < n:
+                block = self._prefix + self._counter.to_bytes(8, 'little')
+                blocks.append(self._blake2b(block, key=self._key).digest())
+                self._counter += 1
+                available += 64
+            self._buffer = b"".join(blocks)
+            self._pos = 0
+        data = self._buffer[self._pos:self._pos + n]
+        self._pos += n
+        return data
+
+
+class AlphabetSampler:
+    """
+    Равномерная выборка символов алфавита из случайных байтов
+
+    Байты переводятся в символы одним вызовом bytes.translate: байты,
+    которые дали бы смещение (значения >= 256 - 256 % размер алфавита),
+    удаляются этим же вызовом (rejection sampling).
+    """
+
+    def __init__(self, alphabet):
+        """
+        Args:
+            alphabet (str): Алфавит (повторы символов увеличивают их вес)
+        """
+        if not alphabet:
+            raise ValueError("Алфавит не может быть пустым")
+        self.alphabet = alphabet
+        self.size = len(alphabet)
+        self._charmap = None
+        if self.size > 256:
+            # Байтовая таблица не подходит - выбираем посимвольно
+            self._table = None
+            return
+
+        self._limit = 256 - 256 % self.size
+        if all(ord(c) < 256 for c in alphabet):
+            # Байт сразу превращается в нужный символ (latin-1)
+            self._table = bytes(ord(alphabet[b % self.size]) if b < self._limit else 0
+                                for b in range(256))
+        else:
+            # Байт превращается в индекс, индекс - в символ через str.translate
+            self._table = bytes(b % self.size if b < self._limit else 0 for b in range(256))
+            self._charmap = dict(enumerate(alphabet))
+        self._delete = bytes(range(self._limit, 256))
+
+    def sample(self, entropy, k):
+        """
+        Возвращает строку из k случайных символов алфавита
+
+        Args:
+            entropy (EntropyBuffer): Источник случайных байтов
+            k (int): Количество символов
+
+        Returns:
+            str: Случайные символы
+        """
+        if self._table is None:
+            alphabet = self.alphabet
+            return ''.join(alphabet[entropy.randbelow(self.size)] for _ in range(k))
+
+        chunks = []
+        need = k
+        while need > 0:
+            # Берём байты с запасом на отброшенные значения
+            raw = entropy.read(need * 256 // self._limit + 16)
+            chunk = raw.translate(self._table, self._delete)
+            chunks.append(chunk)
+            need -= len(chunk)
+
+        text = b''.join(chunks)[:k].decode('latin-1')
+        if self._charmap is not None:
+            text = text.translate(self._charmap)
+        return text
+
+
+class CharsetPolicy:
+    """
+    Скомпилированный набор символов для генерации паролей
+
+    Неизменяемый и хешируемый объект: итоговый алфавит, алфавиты типов
+    символов (уже без похожих символов) и таблицы выборки вычисляются
+    один раз. Создавайте экземпляры через CharsetPolicy.compile() -
+    результат кешируется для одинаковых параметров.
+    """
+
+    __slots__ = ('key', 'alphabet', 'classes', 'required_sets', 'sampler')
+
+    def __init__(self, use_uppercase=True, use_digits=True, use_special=True,
+                 exclude_ambiguous=False, custom_chars=None):
+        """
+        Args:
+            use_uppercase (bool): Использовать заглавные буквы
+            use_digits (bool): Использовать цифры
+            use_special (bool): Использовать специальные символы
+            exclude_ambiguous (bool): Исключить похожие символы (0, O, l, 1, I)
+            custom_chars (str): Кастомный набор символов (игнорирует другие опции)
+        """
+        # Если указан кастомный набор символов
+        if custom_chars:
+            if len(custom_chars) < 2:
+                raise ValueError("Кастомный набор должен содержать минимум 2 символа")
+            alphabet = custom_chars
+            classes = ()
+        else:
+            # Формируем набор символов по типам
+            classes = [LOWERCASE]
+            if use_uppercase:
+                classes.append(UPPERCASE)
+            if use_digits:
+                classes.append(DIGITS)
+            if use_special:
+                classes.append(SPECIAL_CHARS)
+
+            # Исключаем похожие символы из каждого типа, а не только из
+            # итогового алфавита - иначе обязательный символ может оказаться похожим
+            if exclude_ambiguous:
+                classes = [''.join(c for c in chars if c not in AMBIGUOUS_CHARS)
+                           for chars in classes]
+
+            classes = tuple(classes)
+            alphabet = ''.join(classes)
+
+        if not alphabet:
+            raise ValueError("Должен быть выбран хотя бы один тип символов")
+
+        set_attr = object.__setattr__
+        set_attr(self, 'key', (use_uppercase, use_digits, use_special,
+                               exclude_ambiguous, custom_chars))
+        set_attr(self, 'alphabet', alphabet)
+        set_attr(self, 'classes', classes)
+        set_attr(self, 'required_sets', tuple(frozenset(chars) for chars in classes))
+        set_attr(self, 'sampler', AlphabetSampler(alphabet))
+
+    @classmethod
+    def compile(cls, use_uppercase=True, use_digits=True, use_special=True,
+                exclude_ambiguous=False, custom_chars=None):
+        """
+        Возвращает скомпилированную политику из кеша
+
+        Args:
+            use_uppercase (bool): Использовать заглавные буквы
+            use_digits (bool): Использовать цифры
+            use_special (bool): Использовать специальные символы
+            exclude_ambiguous (bool): Исключить похожие символы (0, O, l, 1, I)
+            custom_chars (str): Кастомный набор символов (игнорирует другие опции)
+
+        Returns:
+            CharsetPolicy: Политика для этих параметров
+        """
+        return _compile_charset_policy(bool(use_uppercase), bool(use_digits),
+                                       bool(use_special), bool(exclude_ambiguous),
+                                       custom_chars or None)
+
+    def is_valid(self, password):
+        """
+        Проверяет, что в пароле есть символ каждого обязательного типа
+
+        Args:
+            password (str): Пароль для проверки
+
+        Returns:
+            bool: True, если все типы присутствуют
+        """
+        return all(not chars.isdisjoint(password) for chars in self.required_sets)
+
+    def describe(self):
+        """
+        Краткое описание политики для метаданных вывода
+
+        Returns:
+            str: Например "lower+upper+digits+special" или "custom(10)"
+        """
+        use_uppercase, use_digits, use_special, exclude_ambiguous, custom_chars = self.key
+        if custom_chars:
+            return f"custom({len(self.alphabet)})"
+        names = ['lower']
+        if use_uppercase:
+            names.append('upper')
+        if use_digits:
+            names.append('digits')
+        if use_special:
+            names.append('special')
+        if exclude_ambiguous:
+            names.append('no-ambiguous')
+        return '+'.join(names)
+
+    def keyspace(self, length):
+        """
+        Точное количество возможных паролей заданной длины
+
+        Пароли без символа хотя бы одного обязательного типа отбрасываются,
+        поэтому количество считается по формуле включений-исключений по
+        типам символов. Результат кешируется.
+
+        Args:
+            length (int): Длина пароля
+
+        Returns:
+            int: Количество паролей
+        """
+        if not self.classes:
+            return len(set(self.alphabet)) ** length
+        return _charset_keyspace(tuple(len(chars) for chars in self.classes), length)
+
+    def entropy_bits(self, length):
+        """
+        Точная энтропия пароля заданной длины
+
+        Все допустимые пароли равновероятны, поэтому энтропия равна
+        log2(keyspace). Для кастомного набора с повторяющимися символами
+        символы неравновероятны, и энтропия считается по Шеннону.
+
+        Args:
+            length (int): Длина пароля
+
+        Returns:
+            float: Энтропия в битах (с учётом обязательных типов символов)
+        """
+        if self.classes:
+            # Короче числа обязательных типов пароль не составить
+            count = self.keyspace(length)
+            return math.log2(count) if count else 0.0
+        size = len(self.alphabet)
+        counts = {}
+        _count_elements(counts, self.alphabet)
+        # Повторы в кастомном наборе делают символы неравновероятными
+        per_char = sum(c * math.log2(size / c) for c in counts.values()) / size
+        return length * per_char
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CharsetPolicy нельзя изменить")
+
+    def __delattr__(self, name):
+        raise AttributeError("CharsetPolicy нельзя изменить")
+
+    def __eq__(self, other):
+        return isinstance(other, CharsetPolicy) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __reduce__(self):
+        # При передаче в другой процесс политика компилируется заново
+        return (_compile_charset_policy, self.key)
+
+    def __repr__(self):
+        return f"CharsetPolicy(alphabet={self.alphabet!r})"
+
+
+@functools.lru_cache(maxsize=256)
+def _charset_keyspace(class_sizes, length):
+    """
+    Количество строк длины length, содержащих символ каждого типа
+
+    Args:
+        class_sizes (tuple): Размеры непересекающихся типов символов
+        length (int): Длина строки
+
+    Returns:
+        int: Количество строк (включения-исключения по подмножествам типов)
+    """
+    total = 0
+    size = sum(class_sizes)
+    for mask in range(1 << len(class_sizes)):
+        missing = sum(n for bit, n in enumerate(class_sizes) if mask >> bit & 1)
+        sign = -1 if bin(mask).count('1') % 2 else 1
+        total += sign * (size - missing) ** length
+    return total
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_charset_policy(use_uppercase, use_digits, use_special,
+                            exclude_ambiguous, custom_chars):
+    """Компилирует CharsetPolicy (результат кешируется)"""
+    return CharsetPolicy(use_uppercase, use_digits, use_special,
+                         exclude_ambiguous, custom_chars)
+
+
+class ConstraintPolicy:
+    """
+    Политика паролей с ограничениями, скомпилированная в точный сэмплер
+
+    Поддерживает минимальное количество символов каждого типа, предел
+    одинаковых символов подряд, запрет алфавитных и клавиатурных
+    последовательностей и запрещённые подстроки. Запреты компилируются
+    в детерминированный автомат, а для каждой длины динамическим
+    программированием считается число допустимых продолжений из каждого
+    состояния. Пароль выбирается одним равномерным числом из [0, N) и
+    восстанавливается по этим таблицам, поэтому все допустимые пароли
+    равновероятны, отбраковки нет, а энтропия равна точно log2(N).
+    Эквивалентные состояния автомата объединяются, а таблицы больше
+    POLICY_TABLE_LIMIT не строятся (ValueError).
+
+    Создавайте экземпляры через ConstraintPolicy.load() или from_dict() -
+    результат кешируется для одинаковых параметров.
+    """
+
+    __slots__ = ('key', 'length', 'alphabet', 'classes', 'class_names', 'minimums',
+                 '_char_class', '_char_pos', '_default', '_special',
+                 '_special_by_class', '_inc', '_tables')
+
+    def __init__(self, key):
+        """
+        Args:
+            key (tuple): Нормализованные параметры политики
+                (пары имя-значение в порядке POLICY_OPTIONS)
+        """
+        spec = dict(key)
+        class_names = ('lowercase', 'uppercase', 'digits', 'special')
+        labels = ('lower', 'upper', 'digits', 'special')
+        sources = (LOWERCASE, UPPERCASE, DIGITS, spec['special_chars'])
+
+        classes = []
+        names = []
+        minimums = []
+        for name, label, chars in zip(class_names, labels, sources):
+            minimum = spec['min_' + name]
+            if not spec[name]:
+                if minimum:
+                    raise ValueError(f"min_{name} задан для отключённого типа символов")
+                continue
+            if spec['exclude_ambiguous']:
+                chars = ''.join(c for c in chars if c not in AMBIGUOUS_CHARS)
+            if not chars:
+                continue
+            classes.append(chars)
+            names.append(label)
+            minimums.append(1 if minimum is None else minimum)
+
+        if not classes:
+            raise ValueError("Должен быть выбран хотя бы один тип символов")
+        alphabet = ''.join(classes)
+
+        set_attr = object.__setattr__
+        set_attr(self, 'key', key)
+        set_attr(self, 'length', spec['length'])
+        set_attr(self, 'alphabet', alphabet)
+        set_attr(self, 'classes', tuple(classes))
+        set_attr(self, 'class_names', tuple(names))
+        set_attr(self, 'minimums', tuple(minimums))
+        set_attr(self, '_tables', {})
+
+        char_class = []
+        char_pos = []
+        for k, chars in enumerate(classes):
+            char_class.extend([k] * len(chars))
+            char_pos.extend(range(len(chars)))
+        set_attr(self, '_char_class', char_class)
+        set_attr(self, '_char_pos', char_pos)
+
+        # Вектор счётчиков по типам (с насыщением на минимуме) кодируется
+        # смешанной системой счисления: inc[k][v] - вектор после символа типа k
+        radix = [m + 1 for m in minimums]
+        size = functools.reduce(operator.mul, radix, 1)
+        inc = []
+        stride = 1
+        for r in radix:
+            inc.append([v if (v // stride) % r == r - 1 else v + stride
+                        for v in range(size)])
+            stride *= r
+        set_attr(self, '_inc', inc)
+
+        self._build_automaton(self._patterns(spec))
+
+    @classmethod
+    def from_dict(cls, spec):
+        """
+        Возвращает скомпилированную политику из словаря параметров
+
+        Args:
+            spec (dict): Параметры политики (см. POLICY_OPTIONS)
+
+        Returns:
+            ConstraintPolicy: Политика (из кеша для одинаковых параметров)
+        """
+        if not isinstance(spec, dict):
+            raise ValueError("Политика должна быть таблицей параметров")
+        unknown = sorted(set(spec) - set(POLICY_OPTIONS))
+        if unknown:
+            raise ValueError(f"Неизвестные параметры политики: {', '.join(unknown)}")
+
+        values = dict(POLICY_OPTIONS, **spec)
+        for name, value in values.items():
+            default = POLICY_OPTIONS[name]
+            if name == 'forbidden':
+                if isinstance(value, str) or not all(isinstance(w, str) and w for w in value):
+                    raise ValueError("forbidden должен быть списком непустых строк")
+                values[name] = tuple(value)
+            elif name == 'special_chars':
+                if not isinstance(value, str) or not value:
+                    raise ValueError("special_chars должен быть непустой строкой")
+                if not set(value).isdisjoint(LOWERCASE + UPPERCASE + DIGITS):
+                    raise ValueError("special_chars не должен содержать буквы и цифры")
+                values[name] = ''.join(dict.fromkeys(value))
+            elif isinstance(default, bool):
+                if not isinstance(value, bool):
+                    raise ValueError(f"{name} должен быть true или false")
+            elif value is not None or default is not None:
+                if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                    raise ValueError(f"{name} должен быть неотрицательным целым числом")
+
+        if values['length'] is not None and values['length'] < 4:
+            raise ValueError("Длина пароля должна быть не менее 4 символов")
+        minimums = sum(values['min_' + name] or 0 for name in
+                       ('lowercase', 'uppercase', 'digits', 'special'))
+        if values['length'] is not None and minimums > values['length']:
+            raise ValueError(f"Сумма минимумов по типам символов ({minimums}) "
+                             f"больше длины пароля ({values['length']})")
+        if 0 < values['max_sequence'] < 2:
+            raise ValueError("max_sequence должен быть не меньше 2 (0 - без ограничения)")
+
+        return _compile_constraint_policy(tuple(values.items()))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Загружает политику из файла JSON или TOML
+
+        Формат определяется по расширению: .toml читается через tomllib
+        (Python 3.11+), всё остальное - как JSON.
+
+        Args:
+            path (str): Путь к файлу политики
+
+        Returns:
+            ConstraintPolicy: Скомпилированная политика
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        if path.lower().endswith('.toml'):
+            try:
+                import tomllib
+            except ImportError:
+                raise ValueError("Для политик в TOML нужен Python 3.11+ (или используйте JSON)")
+            try:
+                spec = tomllib.loads(data.decode('utf-8'))
+            except (UnicodeDecodeError, tomllib.TOMLDecodeError) as e:
+                raise ValueError(f"Некорректный файл политики {path}: {e}")
+        else:
+            import json
+            try:
+                spec = json.loads(data)
+            except ValueError as e:
+                raise ValueError(f"Некорректный файл политики {path}: {e}")
+        return cls.from_dict(spec)
+
+    def _patterns(self, spec):
+        """
+        Составляет запрещённые шаблоны из параметров политики
+
+        Шаблон - кортеж множеств допустимых символов для каждой позиции.
+        Шаблоны с символами вне алфавита пропускаются: они не могут встретиться.
+
+        Args:
+            spec (dict): Параметры политики
+
+        Returns:
+            list: Запрещённые шаблоны
+        """
+        alphabet = set(self.alphabet)
+
+        def variants(ch, ignore_case):
+            options = {ch.lower(), ch.upper()} if ignore_case else {ch}
+            return frozenset(options & alphabet)
+
+        patterns = []
+        max_repeat = spec['max_repeat']
+        if max_repeat:
+            for ch in self.alphabet:
+                patterns.append((frozenset(ch),) * (max_repeat + 1))
+
+        window = spec['max_sequence'] + 1
+        if window > 1:
+            for source in POLICY_SEQUENCES:
+                for text in (source, source[::-1]):
+                    for i in range(len(text) - window + 1):
+                        patterns.append(tuple(variants(ch, True) for ch in text[i:i + window]))
+
+        for word in spec['forbidden']:
+            patterns.append(tuple(variants(ch, spec['forbidden_ignore_case']) for ch in word))
+
+        return list(dict.fromkeys(p for p in patterns if all(p)))
+
+    def _build_automaton(self, patterns):
+        """
+        Строит детерминированный автомат поиска запрещённых шаблонов
+
+        Состояние - множество частичных совпадений (шаблон, длина совпадения).
+        Для каждого символа хранится переход из пустого состояния (_default),
+        а для состояния - только отличающиеся от него переходы (_special),
+        их обычно единицы. Переход -1 означает найденный запрещённый шаблон.
+
+        Args:
+            patterns (list): Запрещённые шаблоны
+        """
+        alphabet = self.alphabet
+        index = {ch: i for i, ch in enumerate(alphabet)}
+        starts = [[] for _ in alphabet]
+        for pi, pattern in enumerate(patterns):
+            for ch in pattern[0]:
+                starts[index[ch]].append(pi)
+
+        def step(state, ci):
+            ch = alphabet[ci]
+            matches = []
+            for pi in starts[ci]:
+                if len(patterns[pi]) == 1:
+                    return None
+                matches.append((pi, 1))
+            for pi, k in state:
+                if ch in patterns[pi][k]:
+                    if k + 1 == len(patterns[pi]):
+                        return None
+                    matches.append((pi, k + 1))
+            return frozenset(matches)
+
+        states = {}
+        queue = []
+
+        def state_id(state):
+            if state is None:
+                return -1
+            sid = states.get(state)
+            if sid is None:
+                sid = states[state] = len(queue)
+                queue.append(state)
+            return sid
+
+        empty = frozenset()
+        state_id(empty)
+        default = [state_id(step(empty, ci)) for ci in range(len(alphabet))]
+
+        special = []
+        position = 0
+        while position < len(queue):
+            state = queue[position]
+            position += 1
+            advancing = set()
+            for pi, k in state:
+                advancing.update(patterns[pi][k])
+            transitions = {}
+            for ci in sorted(index[ch] for ch in advancing):
+                target = state_id(step(state, ci))
+                if target != default[ci]:
+                    transitions[ci] = target
+            special.append(transitions)
+
+        default, special = self._minimize(default, special)
+
+        # Особые символы состояния по типам, в порядке позиции внутри типа
+        by_class = []
+        for transitions in special:
+            groups = [[] for _ in self.classes]
+            for ci in transitions:
+                groups[self._char_class[ci]].append(self._char_pos[ci])
+            by_class.append([sorted(g) for g in groups])
+
+        set_attr = object.__setattr__
+        set_attr(self, '_default', default)
+        set_attr(self, '_special', special)
+        set_attr(self, '_special_by_class', by_class)
+
+    @staticmethod
+    def _minimize(default, special):
+        """
+        Объединяет эквивалентные состояния автомата
+
+        Состояния эквивалентны, если по любому символу переходят в
+        эквивалентные состояния. Разбиение уточняется, пока число классов
+        растёт; пустое состояние остаётся под номером 0.
+
+        Args:
+            default (list): Переходы из пустого состояния по символам
+            special (list): Отличающиеся переходы каждого состояния
+
+        Returns:
+            tuple: (default, special) для объединённых состояний
+        """
+        blocks = [0] * len(special)
+        count = 1
+        while True:
+            signatures = {}
+            refined = []
+            for state, transitions in enumerate(special):
+                signature = [blocks[state]]
+                for ci, target in sorted(transitions.items()):
+                    block = blocks[target] if target >= 0 else -1
+                    if block != (blocks[default[ci]] if default[ci] >= 0 else -1):
+                        signature.append((ci, block))
+                refined.append(signatures.setdefault(tuple(signature), len(signatures)))
+            blocks = refined
+            if len(signatures) == count:
+                break
+            count = len(signatures)
+
+        representatives = {}
+        for state, block in enumerate(blocks):
+            representatives.setdefault(block, state)
+        default = [blocks[target] if target >= 0 else -1 for target in default]
+        merged = []
+        for block in range(count):
+            transitions = {}
+            for ci, target in special[representatives[block]].items():
+                target = blocks[target] if target >= 0 else -1
+                if target != default[ci]:
+                    transitions[ci] = target
+            merged.append(transitions)
+        return default, merged
+
+    def _compile(self, length):
+        """
+        Считает таблицы количества допустимых паролей для длины
+
+        layers[p][s][v] - число способов дописать оставшиеся length - p
+        символов из состояния автомата s с вектором счётчиков v; последняя
+        строка каждого слоя - нули для перехода -1. Накопленные суммы по
+        символам типа для выбора символа (см. _cumulative()) считаются
+        при выборке по мере надобности и кешируются в cumulative.
+
+        Args:
+            length (int): Длина пароля
+
+        Returns:
+            tuple: (layers, cumulative)
+        """
+        tables = self._tables.get(length)
+        if tables is not None:
+            return tables
+
+        default = self._default
+        special = self._special
+        char_class = self._char_class
+        inc = self._inc
+        size = len(inc[0])
+        cells = (length + 1) * len(special) * size
+        if cells > POLICY_TABLE_LIMIT:
+            raise ValueError(f"Политика слишком сложна для длины {length}: таблицы из "
+                             f"{cells:,} значений больше предела {POLICY_TABLE_LIMIT:,} "
+                             f"(уменьшите длину, минимумы или число запретов)")
+
+        class_chars = []
+        start = 0
+        for chars in self.classes:
+            class_chars.append(range(start, start + len(chars)))
+            start += len(chars)
+
+        zero = [0] * size
+        final = [0] * size
+        final[-1] = 1
+        layer = [final] * len(special) + [zero]
+        layers = [layer]
+        for _ in range(length):
+            nxt = layer
+            # Переходы из пустого состояния: сумма по символам каждого типа,
+            # затем сдвиг вектора счётчиков на символ этого типа
+            base = zero
+            for k, chars in enumerate(class_chars):
+                rows = [nxt[default[ci]] for ci in chars]
+                total = [sum(column) for column in zip(*rows)]
+                base = [b + x for b, x in zip(base, map(total.__getitem__, inc[k]))]
+
+            layer = []
+            for transitions in special:
+                if not transitions:
+                    layer.append(base)
+                    continue
+                # Разница с пустым состоянием по типам символов, сдвиг - один раз на тип
+                deltas = {}
+                for ci, target in transitions.items():
+                    k = char_class[ci]
+                    delta = deltas.get(k, zero)
+                    deltas[k] = [d + new - old for d, new, old
+                                 in zip(delta, nxt[target], nxt[default[ci]])]
+                row = base
+                for k, delta in deltas.items():
+                    row = [r + x for r, x in zip(row, map(delta.__getitem__, inc[k]))]
+                layer.append(row)
+            layer.append(zero)
+            layers.append(layer)
+
+        layers.reverse()
+        tables = (layers, {})
+        self._tables[length] = tables
+        return tables
+
+    def _cumulative(self, tables, p, k, j):
+        """
+        Накопленные суммы числа продолжений по символам типа k
+
+        Для позиции p и вектора счётчиков j после символа типа k: элемент
+        i - сколько паролей начинается с первых i + 1 символов типа при
+        переходе из пустого состояния. Результат кешируется в таблицах.
+
+        Args:
+            tables (tuple): Таблицы из _compile()
+            p (int): Позиция символа
+            k (int): Номер типа символов
+            j (int): Вектор счётчиков после символа
+
+        Returns:
+            list: Накопленные суммы
+        """
+        layers, cache = tables
+        cumulative = cache.get((p, k, j))
+        if cumulative is None:
+            nxt = layers[p + 1]
+            start = sum(len(chars) for chars in self.classes[:k])
+            acc = 0
+            cumulative = []
+            for ci in range(start, start + len(self.classes[k])):
+                acc += nxt[self._default[ci]][j]
+                cumulative.append(acc)
+            cache[(p, k, j)] = cumulative
+        return cumulative
+
+    def keyspace(self, length):
+        """
+        Точное количество паролей длины length, удовлетворяющих политике
+
+        Args:
+            length (int): Длина пароля
+
+        Returns:
+            int: Количество паролей
+        """
+        if sum(self.minimums) > length:
+            return 0
+        return self._compile(length)[0][0][0][0]
+
+    def entropy_bits(self, length):
+        """
+        Точная энтропия пароля политики
+
+        Args:
+            length (int): Длина пароля
+
+        Returns:
+            float: log2 числа допустимых паролей
+        """
+        count = self.keyspace(length)
+        return math.log2(count) if count else 0.0
+
+    def sample(self, entropy, count, length):
+        """
+        Генерирует пароли, равномерно распределённые среди допустимых
+
+        Args:
+            entropy (EntropyBuffer): Источник случайности
+            count (int): Количество паролей
+            length (int): Длина пароля
+
+        Returns:
+            list: Пароли
+        """
+        total = self.keyspace(length)
+        if not total:
+            raise ValueError(f"Политике не удовлетворяет ни один пароль длины {length}")
+        tables = self._compile(length)
+        randbelow = entropy.randbelow
+        return [self._unrank(tables, randbelow(total)) for _ in range(count)]
+
+    def _unrank(self, tables, rank):
+        """
+        Восстанавливает пароль по его номеру среди допустимых
+
+        Для каждой позиции сначала перебираются особые символы текущего
+        состояния, затем тип символа по суммам для пустого состояния и
+        символ внутри типа - двоичным поиском по накопленным суммам (веса
+        особых символов в этих суммах пропускаются).
+
+        Args:
+            tables (tuple): Таблицы из _compile()
+            rank (int): Номер пароля в [0, keyspace)
+
+        Returns:
+            str: Пароль
+        """
+        layers, cache = tables
+        alphabet = self.alphabet
+        classes = self.classes
+        char_class = self._char_class
+        default = self._default
+        special = self._special
+        special_by_class = self._special_by_class
+        inc = self._inc
+
+        state = 0
+        vector = 0
+        chars = []
+        for p in range(len(layers) - 1):
+            nxt = layers[p + 1]
+            transitions = special[state]
+            chosen = -1
+            for ci, target in transitions.items():
+                weight = nxt[target][inc[char_class[ci]][vector]]
+                if rank < weight:
+                    chosen = ci
+                    break
+                rank -= weight
+
+            if chosen < 0:
+                offset = 0
+                hidden_by_class = special_by_class[state]
+                for k in range(len(classes)):
+                    j = inc[k][vector]
+                    cumulative = cache.get((p, k, j))
+                    if cumulative is None:
+                        cumulative = self._cumulative(tables, p, k, j)
+                    hidden = hidden_by_class[k]
+                    available = cumulative[-1]
+                    for pos in hidden:
+                        available -= cumulative[pos] - (cumulative[pos - 1] if pos else 0)
+                    if rank < available:
+                        # Переводим номер в шкалу с особыми символами типа
+                        for pos in hidden:
+                            begin = cumulative[pos - 1] if pos else 0
+                            if rank < begin:
+                                break
+                            rank += cumulative[pos] - begin
+                        pos = bisect.bisect_right(cumulative, rank)
+                        rank -= cumulative[pos - 1] if pos else 0
+                        chosen = offset + pos
+                        target = default[chosen]
+                        break
+                    rank -= available
+                    offset += len(classes[k])
+
+            chars.append(alphabet[chosen])
+            vector = inc[char_class[chosen]][vector]
+            state = target
+        return ''.join(chars)
+
+    def is_valid(self, password):
+        """
+        Проверяет, что пароль удовлетворяет политике
+
+        Args:
+            password (str): Пароль для проверки
+
+        Returns:
+            bool: True, если все ограничения выполнены
+        """
+        index = {ch: i for i, ch in enumerate(self.alphabet)}
+        state = 0
+        vector = 0
+        for ch in password:
+            ci = index.get(ch)
+            if ci is None:
+                return False
+            state = self._special[state].get(ci, self._default[ci])
+            if state < 0:
+                return False
+            vector = self._inc[self._char_class[ci]][vector]
+        return vector == len(self._inc[0]) - 1
+
+    def describe(self):
+        """
+        Краткое описание политики для метаданных вывода
+
+        Returns:
+            str: Например "policy(lower>=1,upper>=1,digits>=2,special>=1,repeat<=2)"
+        """
+        spec = dict(self.key)
+        parts = [f"{name}>={minimum}"
+                 for name, minimum in zip(self.class_names, self.minimums)]
+        if spec['exclude_ambiguous']:
+            parts.append('no-ambiguous')
+        if spec['max_repeat']:
+            parts.append(f"repeat<={spec['max_repeat']}")
+        if spec['max_sequence']:
+            parts.append(f"sequence<={spec['max_sequence']}")
+        if spec['forbidden']:
+            parts.append(f"forbidden={len(spec['forbidden'])}")
+        return f"policy({','.join(parts)})"
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConstraintPolicy нельзя изменить")
+
+    def __delattr__(self, name):
+        raise AttributeError("ConstraintPolicy нельзя изменить")
+
+    def __eq__(self, other):
+        return isinstance(other, ConstraintPolicy) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __reduce__(self):
+        # При передаче в другой процесс политика компилируется заново
+        return (_compile_constraint_policy, (self.key,))
+
+    def __repr__(self):
+        return f"ConstraintPolicy({self.describe()})"
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_constraint_policy(key):
+    """Компилирует ConstraintPolicy (результат кешируется)"""
+    return ConstraintPolicy(key)
+
+
+class PatternPolicy:
+    """
+    Шаблон пароля, скомпилированный в алфавиты позиций
+
+    Каждый символ шаблона из PATTERN_CLASSES заменяется случайным символом
+    своего класса, "\\" экранирует следующий символ, остальные символы
+    переносятся как есть. Пачка паролей генерируется по столбцам: для
+    каждого алфавита разом выбираются символы всех его позиций во всех
+    паролях пачки. Энтропия точная - сумма log2 размеров алфавитов позиций.
+
+    Создавайте экземпляры через PatternPolicy.compile() - результат
+    кешируется для одинаковых параметров.
+    """
+
+    __slots__ = ('key', 'pattern', 'length', 'alphabet', 'positions', '_groups')
+
+    def __init__(self, pattern, exclude_ambiguous=False):
+        """
+        Args:
+            pattern (str): Шаблон, например "Cvccvc-9999-Cvccvc"
+            exclude_ambiguous (bool): Исключить похожие символы (0, O, l, 1, I)
+        """
+        positions = []
+        chars = iter(pattern)
+        for ch in chars:
+            if ch == '\\':
+                literal = next(chars, None)
+                if literal is None:
+                    raise ValueError("Шаблон не может заканчиваться на \\")
+                positions.append(literal)
+                continue
+            alphabet = PATTERN_CLASSES.get(ch)
+            if alphabet is None:
+                positions.append(ch)
+                continue
+            if exclude_ambiguous:
+                alphabet = ''.join(c for c in alphabet if c not in AMBIGUOUS_CHARS)
+            positions.append(AlphabetSampler(alphabet))
+
+        if not any(isinstance(p, AlphabetSampler) for p in positions):
+            raise ValueError("В шаблоне нет ни одной случайной позиции "
+                             f"({', '.join(PATTERN_CLASSES)})")
+
+        # Позиции с одинаковым алфавитом заполняются из одной выборки
+        groups = {}
+        for i, position in enumerate(positions):
+            if isinstance(position, AlphabetSampler):
+                groups.setdefault(position.alphabet, (position, []))[1].append(i)
+
+        set_attr = object.__setattr__
+        set_attr(self, 'key', (pattern, exclude_ambiguous))
+        set_attr(self, 'pattern', pattern)
+        set_attr(self, 'length', len(positions))
+        set_attr(self, 'alphabet', ''.join(groups))
+        set_attr(self, 'positions', tuple(p.alphabet if isinstance(p, AlphabetSampler) else p
+                                          for p in positions))
+        set_attr(self, '_groups', tuple(groups.values()))
+
+    @classmethod
+    def compile(cls, pattern, exclude_ambiguous=False):
+        """
+        Возвращает скомпилированный шаблон из кеша
+
+        Args:
+            pattern (str): Шаблон
+            exclude_ambiguous (bool): Исключить похожие символы (0, O, l, 1, I)
+
+        Returns:
+            PatternPolicy: Шаблон
+        """
+        return _compile_pattern_policy(pattern, bool(exclude_ambiguous))
+
+    def sample(self, entropy, count, length=None):
+        """
+        Генерирует пароли по шаблону
+
+        Args:
+            entropy (EntropyBuffer): Источник случайности
+            count (int): Количество паролей
+            length (int): Не используется - длину задаёт шаблон
+
+        Returns:
+            list: Пароли
+        """
+        columns = [ch * count for ch in self.positions]
+        for sampler, indexes in self._groups:
+            block = sampler.sample(entropy, count * len(indexes))
+            for j, i in enumerate(indexes):
+                columns[i] = block[j * count:(j + 1) * count]
+        return [''.join(chars) for chars in zip(*columns)]
+
+    def keyspace(self, length=None):
+        """
+        Количество различных паролей шаблона
+
+        Args:
+            length (int): Не используется - длину задаёт шаблон
+
+        Returns:
+            int: Произведение размеров алфавитов позиций
+        """
+        return functools.reduce(operator.mul, (len(sampler.alphabet) ** len(indexes)
+                                               for sampler, indexes in self._groups), 1)
+
+    def entropy_bits(self, length=None):
+        """
+        Точная энтропия пароля шаблона
+
+        Args:
+            length (int): Не используется - длину задаёт шаблон
+
+        Returns:
+            float: Энтропия в битах
+        """
+        return sum(len(indexes) * math.log2(len(sampler.alphabet))
+                   for sampler, indexes in self._groups)
+
+    def describe(self):
+        """
+        Краткое описание шаблона для метаданных вывода
+
+        Returns:
+            str: Например "pattern(Cvccvc-9999)"
+        """
+        suffix = ',no-ambiguous' if self.key[1] else ''
+        return f"pattern({self.pattern}{suffix})"
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PatternPolicy нельзя изменить")
+
+    def __delattr__(self, name):
+        raise AttributeError("PatternPolicy нельзя изменить")
+
+    def __eq__(self, other):
+        return isinstance(other, PatternPolicy) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __reduce__(self):
+        # При передаче в другой процесс шаблон компилируется заново
+        return (_compile_pattern_policy, self.key)
+
+    def __repr__(self):
+        return f"PatternPolicy({self.pattern!r})"
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_pattern_policy(pattern, exclude_ambiguous):
+    """Компилирует PatternPolicy (результат кешируется)"""
+    return PatternPolicy(pattern, exclude_ambiguous)
+
+
+class Wordlist:
+    """
+    Компактный индексированный словарь для diceware
+
+    Слова хранятся одним блоком байтов UTF-8 (каждое слово завершается
+    переводом строки) и массивом смещений, а не списком строк Python.
+    Словари из файлов компилируются в бинарный вид и кешируются, поэтому
+    повторные запуски открывают кеш через mmap без разбора текста.
+    """
+
+    def __init__(self, data, offsets, source=None):
+        """
+        Args:
+            data: Байты слов, каждое слово завершается b"\\n"
+            offsets: Смещения начала слов (на одно больше, чем слов)
+            source (str): Путь к файлу словаря (None - встроенный)
+        """
+        if len(offsets) < 3:
+            raise ValueError("Словарь должен содержать минимум 2 слова")
+        self._data = data
+        self._offsets = offsets
+        self.source = source
+
+    @classmethod
+    def from_words(cls, words, source=None):
+        """
+        Создаёт словарь из списка слов с проверкой уникальности
+
+        Args:
+            words (list): Список слов
+            source (str): Путь к файлу словаря (None - встроенный)
+
+        Returns:
+            Wordlist: Словарь
+        """
+        seen = set()
+        for word in words:
+            if word in seen:
+                raise ValueError(f"Слово повторяется в словаре: {word}")
+            seen.add(word)
+
+        encoded = [word.encode('utf-8') + b"\n" for word in words]
+        offsets = array('I', [0])
+        position = 0
+        for item in encoded:
+            position += len(item)
+            offsets.append(position)
+        return cls(b"".join(encoded), offsets, source)
+
+    @classmethod
+    @functools.lru_cache(maxsize=1)
+    def builtin(cls):
+        """Возвращает встроенный словарь"""
+        return cls.from_words(_DICEWARE_WORDS.split())
+
+    @classmethod
+    def load(cls, path, use_cache=True):
+        """
+        Загружает словарь из файла
+
+        Поддерживаются файлы с одним словом в строке и стандартные
+        diceware файлы вида "11111<TAB>слово" (EFF large/short, 7776 слов).
+
+        Args:
+            path (str): Путь к файлу словаря
+            use_cache (bool): Использовать кеш скомпилированных словарей
+
+        Returns:
+            Wordlist: Словарь
+        """
+        import hashlib
+        import mmap
+
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        cache_path = None
+        if use_cache:
+            key = f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}".encode('utf-8')
+            cache_path = os.path.join(WORDLIST_CACHE_DIR,
+                                      hashlib.sha256(key).hexdigest()[:32] + ".wl")
+            cached = cls._open_cache(cache_path, path)
+            if cached is not None:
+                return cached
+
+        if stat.st_size == 0:
+            raise ValueError(f"Словарь пуст: {path}")
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                words = cls._parse(mm[:])
+        wordlist = cls.from_words(words, source=path)
+
+        if cache_path:
+            wordlist._save_cache(cache_path)
+        return wordlist
+
+    @staticmethod
+    def _parse(data):
+        """Выделяет слова из текста словаря"""
+        words = []
+        for line in data.decode('utf-8').splitlines():
+            parts = line.split()
+            if not parts or parts[0].startswith('#'):
+                continue
+            if len(parts) == 2 and parts[0].isdigit():
+                # Формат diceware: номер броска кубиков и слово
+                words.append(parts[1])
+            elif len(parts) == 1:
+                words.append(parts[0])
+            else:
+                raise ValueError(f"Некорректная строка словаря: {line!r}")
+        return words
+
+    @classmethod
+    def _open_cache(cls, cache_path, source):
+        """Открывает скомпилированный словарь через mmap (None - кеша нет)"""
+        import mmap
+
+        try:
+            with open(cache_path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        # Обрезанный или повреждённый кеш не ошибка: словарь разбирается заново
+        header_size = len(WORDLIST_CACHE_MAGIC) + 4
+        views = []
+        try:
+            if mm[:len(WORDLIST_CACHE_MAGIC)] != WORDLIST_CACHE_MAGIC:
+                raise ValueError("нет сигнатуры кеша")
+            count, = struct.unpack_from('<I', mm, len(WORDLIST_CACHE_MAGIC))
+            offsets_end = header_size + 4 * (count + 1)
+            if not count or len(mm) < offsets_end:
+                raise ValueError("кеш короче заголовка")
+            views.append(memoryview(mm))
+            views.append(views[0][header_size:offsets_end])
+            views.append(views[1].cast('I'))
+            views.append(views[0][offsets_end:])
+            offsets, data = views[2], views[3]
+            if offsets[0] != 0 or len(data) != offsets[-1]:
+                raise ValueError("размер данных не совпадает с заголовком")
+        except (struct.error, TypeError, ValueError):
+            for view in reversed(views):
+                view.release()
+            mm.close()
+            return None
+        return cls(data, offsets, source)
+
+    def _save_cache(self, cache_path):
+        """Атомарно сохраняет скомпилированный словарь (ошибки игнорируются)"""
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                f.write(WORDLIST_CACHE_MAGIC)
+                f.write(struct.pack('<I', len(self)))
+                f.write(array('I', self._offsets).tobytes())
+                f.write(self._data)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    @property
+    def bits_per_word(self):
+        """Энтропия одного слова в битах"""
+        return math.log2(len(self))
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        start = self._offsets[index]
+        return bytes(self._data[start:self._offsets[index + 1] - 1]).decode('utf-8')
+
+    def __reduce__(self):
+        # В другой процесс передаётся путь, а не содержимое словаря
+        if self.source is None:
+            return (Wordlist.builtin, ())
+        return (Wordlist.load, (self.source,))
+
+    def __repr__(self):
+        return f"Wordlist({len(self)} слов, source={self.source!r})"
+
+
+def _breach_key(sha1_digest):
+    """Ключ индекса утечек: первые 64 бита SHA-1"""
+    return int.from_bytes(sha1_digest[:8], 'big')
+
+
+def _breach_block_keys(data, hashed):
+    """
+    Переводит блок строк списка утечек в ключи индекса
+
+    Args:
+        data (bytes): Блок строк
+        hashed (bool): Строки - SHA-1 в hex ("HASH" или "HASH:COUNT"),
+            иначе - сами пароли
+
+    Returns:
+        array: Ключи (array('Q'))
+    """
+    from hashlib import sha1
+
+    keys = array('Q')
+    for number, line in enumerate(data.split(b'\n')):
+        if line.endswith(b'\r'):
+            line = line[:-1]
+        if not line:
+            continue
+        if hashed:
+            try:
+                keys.append(int(line[:16], 16))
+            except ValueError:
+                raise ValueError(f"Некорректная строка списка утечек: {line[:60]!r}") from None
+        else:
+            keys.append(_breach_key(sha1(line).digest()))
+    return keys
+
+
+def _looks_like_sha1(line):
+    """Проверяет, что строка - SHA-1 в hex (с необязательным ":COUNT")"""
+    digest = line.split(b':', 1)[0].strip()
+    if len(digest) != 40:
+        return False
+    try:
+        bytes.fromhex(digest.decode('ascii'))
+    except ValueError:
+        return False
+    return True
+
+
+class BreachIndex:
+    """
+    Индекс утёкших паролей: отсортированные 64-битные префиксы SHA-1
+
+    Файл открывается через mmap и не читается в память целиком. Таблица
+    первых 16 бит сужает поиск до небольшого отрезка, в котором ключ
+    ищется двоичным поиском. Вероятность ложного совпадения при миллиарде
+    паролей в индексе - порядка 1e-10.
+
+    Формат файла: BREACH_INDEX_MAGIC, количество ключей (uint64), таблица
+    начал отрезков (2**16 + 1 чисел uint64) и отсортированные ключи. Все
+    числа хранятся в little-endian независимо от платформы.
+    """
+
+    def __init__(self, keys, fanout, source=None):
+        """
+        Args:
+            keys: Отсортированные ключи без повторов
+            fanout: Начала отрезков ключей по первым 16 битам
+            source (str): Путь к файлу индекса
+        """
+        from bisect import bisect_left
+        from hashlib import sha1
+
+        self._keys = keys
+        self._fanout = fanout
+        self._bisect = bisect_left
+        self._sha1 = sha1
+        self.source = source
+
+    @classmethod
+    def open(cls, path):
+        """
+        Открывает файл индекса
+
+        Args:
+            path (str): Путь к файлу, созданному build()
+
+        Returns:
+            BreachIndex: Индекс
+        """
+        import mmap
+
+        path = os.path.abspath(path)
+        with open(path, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"Файл индекса утечек пуст: {path}") from None
+
+        magic_size = len(BREACH_INDEX_MAGIC)
+        fanout_end = magic_size + 8 + 8 * ((1 << BREACH_INDEX_FANOUT_BITS) + 1)
+        if mm[:magic_size] != BREACH_INDEX_MAGIC or len(mm) < fanout_end:
+            mm.close()
+            raise ValueError(f"Файл не является индексом утечек: {path}")
+        count, = struct.unpack_from('<Q', mm, magic_size)
+        last, = struct.unpack_from('<Q', mm, fanout_end - 8)
+        keys_size = len(mm) - fanout_end
+        if keys_size % 8 or keys_size // 8 != count or last != count:
+            mm.close()
+            raise ValueError(f"Файл индекса утечек повреждён: {path}")
+
+        if sys.byteorder == 'little':
+            fanout = memoryview(mm)[magic_size + 8:fanout_end].cast('Q')
+            keys = memoryview(mm)[fanout_end:].cast('Q')
+        else:
+            # На big-endian платформе ключи копируются в память с разворотом байтов
+            fanout = array('Q', mm[magic_size + 8:fanout_end])
+            keys = array('Q', mm[fanout_end:])
+            fanout.byteswap()
+            keys.byteswap()
+            mm.close()
+        return cls(keys, fanout, path)
+
+    @classmethod
+    def build(cls, source, path, run_size=BREACH_INDEX_RUN_SIZE):
+        """
+        Строит индекс из списка паролей или SHA-1 хешей
+
+        Строки вида "SHA1" или "SHA1:COUNT" (формат дампов Have I Been
+        Pwned) распознаются по первой непустой строке, иначе каждая строка
+        считается паролем. Ключи сортируются внешней сортировкой: пачки
+        по run_size ключей сортируются в памяти и сохраняются во временные
+        файлы, а затем сливаются с удалением повторов. Индекс записывается
+        во временный файл и атомарно переименовывается.
+
+        Args:
+            source (str): Файл списка или "-" для stdin
+            path (str): Файл индекса
+            run_size (int): Количество ключей в одной пачке сортировки
+
+        Returns:
+            BreachIndex: Открытый индекс
+        """
+        import heapq
+        import tempfile
+
+        path = os.path.abspath(path)
+        stream = sys.stdin.buffer if source == '-' else open(source, 'rb')
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with tempfile.TemporaryDirectory(prefix='breach_index_',
+                                             dir=os.path.dirname(path)) as tempdir:
+                runs = []
+                run = array('Q')
+                hashed = None
+
+                def save_run():
+                    run_path = os.path.join(tempdir, str(len(runs)))
+                    with open(run_path, 'wb') as f:
+                        array('Q', sorted(run)).tofile(f)
+                    runs.append(run_path)
+                    del run[:]
+
+                for block in _iter_line_blocks(stream):
+                    if hashed is None:
+                        first = next((line for line in block.splitlines() if line.strip()), None)
+                        if first is None:
+                            continue
+                        hashed = _looks_like_sha1(first)
+                    run.extend(_breach_block_keys(block, hashed))
+                    if len(run) >= run_size:
+                        save_run()
+
+                if runs:
+                    if run:
+                        save_run()
+                    keys = heapq.merge(*(_iter_run(run_path) for run_path in runs))
+                else:
+                    keys = sorted(run)
+                cls._write(temp_path, keys)
+            os.replace(temp_path, path)
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return cls.open(path)
+
+    @staticmethod
+    def _write(path, sorted_keys):
+        """Записывает отсортированные ключи в файл индекса, удаляя повторы"""
+        shift = 64 - BREACH_INDEX_FANOUT_BITS
+        counts = array('Q', bytes(8 << BREACH_INDEX_FANOUT_BITS))
+        header_size = len(BREACH_INDEX_MAGIC) + 8 + 8 * (len(counts) + 1)
+        total = 0
+        with open(path, 'wb', buffering=OUTPUT_BUFFER_SIZE) as f:
+            f.write(bytes(header_size))
+            batch = array('Q')
+            previous = None
+            for key in sorted_keys:
+                if key == previous:
+                    continue
+                previous = key
+                batch.append(key)
+                counts[key >> shift] += 1
+                if len(batch) >= 65536:
+                    total += BreachIndex._write_keys(f, batch)
+                    del batch[:]
+            total += BreachIndex._write_keys(f, batch)
+
+            # Таблица начал отрезков
+            fanout = array('Q', [0])
+            for value in counts:
+                fanout.append(fanout[-1] + value)
+            f.seek(0)
+            f.write(BREACH_INDEX_MAGIC)
+            f.write(struct.pack('<Q', total))
+            BreachIndex._write_keys(f, fanout)
+
+    @staticmethod
+    def _write_keys(f, values):
+        """Записывает массив uint64 в little-endian и возвращает его длину"""
+        if sys.byteorder == 'big':
+            values = array('Q', values)
+            values.byteswap()
+        values.tofile(f)
+        return len(values)
+
+    def contains_sha1(self, digest):
+        """
+        Проверяет SHA-1 хеш пароля
+
+        Args:
+            digest (bytes): SHA-1 (20 байт)
+
+        Returns:
+            bool: Хеш найден в индексе
+        """
+        key = _breach_key(digest)
+        prefix = key >> (64 - BREACH_INDEX_FANOUT_BITS)
+        high = self._fanout[prefix + 1]
+        position = self._bisect(self._keys, key, self._fanout[prefix], high)
+        return position < high and self._keys[position] == key
+
+    def __contains__(self, password):
+        if isinstance(password, str):
+            password = password.encode('utf-8', 'surrogateescape')
+        return self.contains_sha1(self._sha1(password).digest())
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __reduce__(self):
+        # В другой процесс передаётся путь, а не содержимое индекса
+        return (BreachIndex.open, (self.source,))
+
+    def __repr__(self):
+        return f"BreachIndex({len(self)} ключей, source={self.source!r})"
+
+
+def _iter_run(path, block=65536):
+    """Читает отсортированную пачку ключей из временного файла"""
+    with open(path, 'rb') as f:
+        while True:
+            keys = array('Q')
+            keys.frombytes(f.read(8 * block))
+            if not keys:
+                return
+            yield from keys
+
+
+def _load_numpy():
+    """
+    Импортирует NumPy, если он установлен
+
+    Returns:
+        module: Модуль numpy или None
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+@functools.lru_cache(maxsize=32)
+def _numpy_tables(policy):
+    """
+    Таблицы для векторной генерации по политике
+
+    Args:
+        policy (CharsetPolicy): Политика набора символов
+
+    Returns:
+        tuple: (байт -> индекс алфавита, индекс -> код символа,
+                индекс -> маска типов, маска всех обязательных типов)
+    """
+    np = _load_numpy()
+    size = policy.sampler.size
+    byte_to_index = np.arange(256, dtype=np.uint16) % size
+    codes = np.array([ord(c) for c in policy.alphabet], dtype='<u4')
+    masks = np.zeros(size, dtype=np.uint8)
+    for bit, chars in enumerate(policy.required_sets):
+        for i, c in enumerate(policy.alphabet):
+            if c in chars:
+                masks[i] |= 1 << bit
+    full_mask = (1 << len(policy.required_sets)) - 1
+    return byte_to_index, codes, masks, full_mask
+
+
+def _generate_batch_numpy(np, policy, entropy, count, length):
+    """
+    Векторная генерация пачки паролей через NumPy
+
+    Матрица индексов (count x length) строится из случайных байтов
+    с отбрасыванием смещённых значений, строки без обязательных типов
+    символов отбрасываются, а оставшиеся переводятся в символы
+    через таблицу одним обращением.
+
+    Args:
+        np (module): Модуль numpy
+        policy (CharsetPolicy): Политика набора символов
+        entropy (EntropyBuffer): Источник случайных байтов
+        count (int): Количество паролей
+        length (int): Длина пароля
+
+    Returns:
+        list: Список сгенерированных паролей
+    """
+    byte_to_index, codes, masks, full_mask = _numpy_tables(policy)
+    limit = 256 - 256 % policy.sampler.size
+    passwords = []
+    while len(passwords) < count:
+        rows = count - len(passwords)
+        need = rows * length
+        raw = np.frombuffer(entropy.read(need * 256 // limit + 64), dtype=np.uint8)
+        accepted = raw[raw < limit]
+        while accepted.size < need:
+            extra = np.frombuffer(entropy.read(need), dtype=np.uint8)
+            accepted = np.concatenate((accepted, extra[extra < limit]))
+
+        matrix = byte_to_index[accepted[:need]].reshape(rows, length)
+        if full_mask:
+            coverage = np.bitwise_or.reduce(masks[matrix], axis=1)
+            matrix = matrix[coverage == full_mask]
+
+        # Строки матрицы кодов символов читаются как строки фиксированной длины
+        chars = np.ascontiguousarray(codes[matrix])
+        passwords.extend(chars.view(f'<U{length}').ravel().tolist())
+    return passwords
+
+
+class FingerprintSet:
+    """
+    Компактное множество строк по 64-битным отпечаткам
+
+    Хранит не сами строки, а их хеши в таблице с открытой адресацией
+    на array('Q') - 8 байт на ячейку при заполнении не больше половины,
+    против ~100 байт на строку в set. Хеш строк в Python случаен для
+    каждого процесса, поэтому ложное совпадение двух разных строк
+    маловероятно (~n²/2**65) и лишь заставляет сгенерировать пароль заново.
+    """
+
+    def __init__(self, capacity=1024):
+        """
+        Args:
+            capacity (int): Ожидаемое количество элементов
+        """
+        size = 1 << max(4, (2 * capacity - 1).bit_length())
+        self._table = array('Q', bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    def add(self, item):
+        """
+        Добавляет строку
+
+        Args:
+            item (str): Строка
+
+        Returns:
+            bool: True, если строки ещё не было
+        """
+        fingerprint = hash(item) & 0xFFFFFFFFFFFFFFFF or 1
+        table = self._table
+        mask = self._mask
+        index = fingerprint & mask
+        while True:
+            value = table[index]
+            if value == 0:
+                break
+            if value == fingerprint:
+                return False
+            index = (index + 1) & mask
+        table[index] = fingerprint
+        self._count += 1
+        if self._count * 2 > mask:
+            self._grow()
+        return True
+
+    def _grow(self):
+        """Удваивает таблицу"""
+        old = self._table
+        size = 2 * len(old)
+        table = array('Q', bytes(8 * size))
+        mask = size - 1
+        for fingerprint in old:
+            if fingerprint:
+                index = fingerprint & mask
+                while table[index]:
+                    index = (index + 1) & mask
+                table[index] = fingerprint
+        self._table = table
+        self._mask = mask
+
+    def __contains__(self, item):
+        fingerprint = hash(item) & 0xFFFFFFFFFFFFFFFF or 1
+        table = self._table
+        mask = self._mask
+        index = fingerprint & mask
+        while True:
+            value = table[index]
+            if value == 0:
+                return False
+            if value == fingerprint:
+                return True
+            index = (index + 1) & mask
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def nbytes(self):
+        """Размер таблицы в байтах"""
+        return len(self._table) * 8
+
+
+def iter_unique(chunks, count, refill):
+    """
+    Убирает повторы из потока пачек и догенерирует недостающие пароли
+
+    Args:
+        chunks: Итератор пачек паролей (всего count паролей)
+        count (int): Общее количество паролей
+        refill: Функция refill(n), возвращающая список из n новых паролей
+
+    Yields:
+        list: Пачка паролей, не встречавшихся раньше
+    """
+    seen = FingerprintSet(count)
+    add = seen.add
+    missing = 0
+    for chunk in chunks:
+        fresh = [pwd for pwd in chunk if add(pwd)]
+        missing += len(chunk) - len(fresh)
+        if fresh:
+            yield fresh
+
+    attempts = 0
+    while missing > 0:
+        fresh = [pwd for pwd in refill(missing) if add(pwd)]
+        if fresh:
+            attempts = 0
+            missing -= len(fresh)
+            yield fresh
+        else:
+            attempts += 1
+            if attempts >= BREACH_MAX_ATTEMPTS:
+                raise ValueError(f"Не удалось получить {count} различных паролей: "
+                                 f"пространство паролей почти исчерпано")
+
+
+def collision_probability(count, keyspace_bits):
+    """
+    Вероятность хотя бы одного повтора среди count паролей (парадокс дней рождения)
+
+    Args:
+        count (int): Количество паролей
+        keyspace_bits (float): log2 количества возможных паролей
+
+    Returns:
+        float: Вероятность от 0 до 1
+    """
+    if keyspace_bits > 1000:
+        return 0.0
+    pairs = count * (count - 1) / 2
+    return -math.expm1(-pairs / 2 ** keyspace_bits)
+
+
+def uniqueness_warning(count, keyspace_bits, unique=False):
+    """
+    Предупреждение о повторах для заданного количества паролей
+
+    Args:
+        count (int): Количество паролей
+        keyspace_bits (float): log2 количества возможных паролей
+        unique (bool): Включён режим различных паролей
+
+    Returns:
+        str: Текст предупреждения или None
+    """
+    if keyspace_bits < 64:
+        keyspace = 2 ** keyspace_bits
+        if unique and count > keyspace:
+            raise ValueError(f"Нельзя получить {count} различных паролей: "
+                             f"возможно только около {keyspace:,.0f}")
+        if unique and count > keyspace / 2:
+            return (f"Запрошено {count / keyspace:.0%} всех возможных паролей "
+                    f"(~{keyspace:,.0f}): генерация различных паролей будет медленной")
+    probability = collision_probability(count, keyspace_bits)
+    if unique or probability < 0.01:
+        return None
+    expected = count * (count - 1) / 2 / 2 ** keyspace_bits
+    return (f"Вероятность повторов: {probability:.0%} (ожидается ~{expected:,.1f}), "
+            f"используйте --unique")
+
+
+class PasswordGenerator:
+    """
+    Класс для генерации паролей с различными параметрами сложности
+
+    Один экземпляр можно использовать из нескольких потоков одновременно:
+    у каждого потока свой буфер энтропии (threading.local), поэтому потоки
+    не делят состояние и не ждут общей блокировки. Для asyncio есть
+    обёртки agenerate_batch() и agenerate_diceware_multiple().
+
+    С seed генератор детерминированный: пароль номер i строится из
+    SeededStream(seed, i), номера выдаются по порядку с нуля (или задаются
+    параметром start). Такие пароли НЕ секретны и нужны только для
+    воспроизводимых тестовых данных.
+    """
+
+    def __init__(self, backend="python", block_size=65536, seed=None):
+        """
+        Args:
+            backend (str): Бэкенд генерации: "python", "numpy" или "auto"
+                (NumPy, если установлен). Если NumPy не установлен,
+                используется "python".
+            block_size (int): Размер блока os.urandom для буфера каждого потока
+            seed (str): Seed детерминированного режима (None - случайные пароли)
+        """
+        import threading
+
+        if backend not in BACKENDS:
+            raise ValueError(f"Неизвестный бэкенд: {backend}")
+        self.lowercase = LOWERCASE
+        self.uppercase = UPPERCASE
+        self.digits = DIGITS
+        self.special = SPECIAL_CHARS
+        self.block_size = block_size
+        self._local = threading.local()
+        self.seed = seed
+        self._seed_key = SeededStream.seed_key(seed) if seed is not None else None
+        self._next_index = 0
+        self._index_lock = threading.Lock()
+        self._numpy = _load_numpy() if backend != "python" else None
+        self.backend = "numpy" if self._numpy is not None else "python"
+
+    @property
+    def _entropy(self):
+        """Буфер энтропии текущего потока (создаётся при первом обращении)"""
+        try:
+            return self._local.entropy
+        except AttributeError:
+            entropy = self._local.entropy = EntropyBuffer(self.block_size)
+            return entropy
+
+    def _reserve(self, count, start=None):
+        """
+        Номер первого из count паролей детерминированного режима
+
+        Args:
+            count (int): Количество паролей
+            start (int): Явный номер первого пароля (None - следующие по порядку)
+
+        Returns:
+            int: Номер первого пароля
+        """
+        if self._seed_key is None:
+            if start is not None:
+                raise ValueError("start используется только в детерминированном режиме (seed)")
+            return None
+        if start is not None:
+            if start < 0:
+                raise ValueError("Номер пароля не может быть отрицательным")
+            return start
+        with self._index_lock:
+            start = self._next_index
+            self._next_index += count
+        return start
+
+    def generate(self, length=12, use_uppercase=True, use_digits=True,
+                 use_special=True, exclude_ambiguous=False, custom_chars=None,
+                 policy=None, breach_index=None):
+        """
+        Генерирует случайный пароль с заданными параметрами
+
+        Args:
+            length (int): Длина пароля
+            use_uppercase (bool): Использовать заглавные буквы
+            use_digits (bool): Использовать цифры
+            use_special (bool): Использовать специальные символы
+            exclude_ambiguous (bool): Исключить похожие символы (0, O, l, 1, I)
+            custom_chars (str): Кастомный набор символов (игнорирует другие опции)
+            policy (CharsetPolicy, ConstraintPolicy или PatternPolicy): Готовая
+                политика (заменяет флаги выше; длину PatternPolicy задаёт шаблон)
+            breach_index (BreachIndex): Индекс утёкших паролей, совпадения
+                генерируются заново
+
+        Returns:
+            str: Сгенерированный пароль
+        """
+        return self.generate_batch(
+            1, length=length, use_uppercase=use_uppercase, use_digits=use_digits,
+            use_special=use_special, exclude_ambiguous=exclude_ambiguous,
+            custom_chars=custom_chars, policy=policy, breach_index=breach_index
+        )[0]
+
+    def generate_batch(self, count=1, length=12, use_uppercase=True, use_digits=True,
+                       use_special=True, exclude_ambiguous=False, custom_chars=None,
+                       policy=None, breach_index=None, unique=False, start=None):
+        """
+        Генерирует пачку паролей из крупных блоков случайных байтов
+
+        Символы всех паролей пачки выбираются разом из os.urandom. Пароли,
+        в которых нет хотя бы одного символа каждого выбранного типа,
+        отбрасываются и генерируются заново, поэтому каждый пароль
+        равновероятен среди всех паролей, удовлетворяющих требованиям.
+        Так же отбрасываются пароли, найденные в индексе утечек, а с unique -
+        повторы внутри пачки.
+
+        Args:
+            count (int): Количество паролей
+            length (int): Длина пароля
+            use_uppercase (bool): Использовать заглавные буквы
+            use_digits (bool): Использовать цифры
+            use_special (bool): Использовать специальные символы
+            exclude_ambiguous (bool): Исключить похожие символы (0, O, l, 1, I)
+            custom_chars (str): Кастомный набор символов (игнорирует другие опции)
+            policy (CharsetPolicy, ConstraintPolicy или PatternPolicy): Готовая
+                политика (заменяет флаги выше; длину PatternPolicy задаёт шаблон)
+            breach_index (BreachIndex): Индекс утёкших паролей, совпадения
+                генерируются заново
+            unique (bool): Все пароли пачки различны
+            start (int): С seed - номер первого пароля (по умолчанию:
+                следующий по порядку)
+
+        Returns:
+            list: Список сгенерированных паролей
+        """
+        if isinstance(policy, PatternPolicy):
+            # Длину пароля задаёт шаблон
+            length = policy.length
+        if length < 4:
+            raise ValueError("Длина пароля должна быть не менее 4 символов")
+
+        if policy is None:
+            policy = CharsetPolicy.compile(use_uppercase, use_digits, use_special,
+                                           exclude_ambiguous, custom_chars)
+
+        first = self._reserve(count, start)
+        if first is not None:
+            if unique:
+                raise ValueError("unique нельзя использовать с seed: пароль задаётся его номером")
+            return [self._seeded_password(i, length, policy, breach_index)
+                    for i in range(first, first + count)]
+
+        def sample(n):
+            if breach_index is None:
+                return self._sample_batch(n, length, policy)
+            return _reject_breached(lambda k: self._sample_batch(k, length, policy),
+                                    n, breach_index)
+
+        if unique:
+            return [pwd for chunk in iter_unique([sample(count)], count, sample) for pwd in chunk]
+        return sample(count)
+
+    def _seeded_password(self, index, length, policy, breach_index=None):
+        """Детерминированный пароль с номером index (совпадения с утечками - заново)"""
+        entropy = SeededStream(self._seed_key, index)
+        for _ in range(BREACH_MAX_ATTEMPTS):
+            password = self._sample_batch(1, length, policy, entropy)[0]
+            if breach_index is None or password not in breach_index:
+                return password
+        raise ValueError("Все сгенерированные пароли найдены в индексе утечек")
+
+    def _sample_batch(self, count, length, policy, entropy=None):
+        """Генерирует пачку паролей, удовлетворяющих политике"""
+        if entropy is None:
+            entropy = self._entropy
+        if isinstance(policy, (ConstraintPolicy, PatternPolicy)):
+            return policy.sample(entropy, count, length)
+
+        sampler = policy.sampler
+        if (self._numpy is not None and count >= NUMPY_MIN_BATCH
+                and sampler.size <= 256 and '\0' not in policy.alphabet):
+            return _generate_batch_numpy(self._numpy, policy, entropy, count, length)
+
+        is_valid = policy.is_valid if policy.required_sets else None
+        passwords = []
+        while len(passwords) < count:
+            missing = count - len(passwords)
+            block = sampler.sample(entropy, missing * length)
+            candidates = [block[i:i + length] for i in range(0, len(block), length)]
+            if is_valid is not None:
+                candidates = [pwd for pwd in candidates if is_valid(pwd)]
+            passwords.extend(candidates)
+
+        return passwords
+
+    def generate_multiple(self, count=1, **kwargs):
+        """
+        Генерирует несколько паролей
+
+        Args:
+            count (int): Количество паролей
+            **kwargs: Параметры для метода generate() (включая policy)
+
+        Returns:
+            list: Список сгенерированных паролей
+        """
+        return self.generate_batch(count, **kwargs)
+
+    def seek(self, index):
+        """
+        Переходит к паролю с номером index в детерминированном режиме
+
+        Следующий вызов generate_batch() и других методов начнётся с этого
+        пароля; предыдущие пароли не генерируются.
+
+        Args:
+            index (int): Номер пароля (от 0)
+        """
+        if self._seed_key is None:
+            raise ValueError("seek() работает только в детерминированном режиме (seed)")
+        if index < 0:
+            raise ValueError("Номер пароля не может быть отрицательным")
+        with self._index_lock:
+            self._next_index = index
+
+    def at(self, index, policy=None, diceware=False, **kwargs):
+        """
+        Пароль с номером index в детерминированном режиме
+
+        Пароль вычисляется за O(1) по своему номеру, без генерации
+        предыдущих, и совпадает с index-м паролем последовательного прогона
+        с теми же seed и параметрами. Счётчик seek() не меняется.
+
+        Args:
+            index (int): Номер пароля (от 0)
+            policy (CharsetPolicy, ConstraintPolicy или PatternPolicy): Политика
+            diceware (bool): Diceware пароль
+            **kwargs: Параметры для generate_batch() или generate_diceware()
+
+        Returns:
+            str: Пароль
+        """
+        if self._seed_key is None:
+            raise ValueError("at() работает только в детерминированном режиме (seed)")
+        if diceware:
+            return self.generate_diceware_multiple(1, start=index, **kwargs)[0]
+        return self.generate_batch(1, policy=policy, start=index, **kwargs)[0]
+
+    async def agenerate_batch(self, count=1, executor=None, **kwargs):
+        """
+        Асинхронная обёртка generate_batch() для asyncio
+
+        Генерация выполняется в пуле потоков, поэтому event loop не
+        блокируется; каждый поток пула использует свой буфер энтропии.
+
+        Args:
+            count (int): Количество паролей
+            executor (Executor): Пул для генерации (по умолчанию: пул
+                потоков event loop)
+            **kwargs: Параметры для generate_batch()
+
+        Returns:
+            list: Список сгенерированных паролей
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, functools.partial(self.generate_batch, count, **kwargs))
+
+    async def agenerate_diceware_multiple(self, count=1, executor=None, **kwargs):
+        """
+        Асинхронная обёртка generate_diceware_multiple() для asyncio
+
+        Args:
+            count (int): Количество паролей
+            executor (Executor): Пул для генерации (по умолчанию: пул
+                потоков event loop)
+            **kwargs: Параметры для generate_diceware_multiple()
+
+        Returns:
+            list: Список сгенерированных паролей
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, functools.partial(self.generate_diceware_multiple, count, **kwargs))
+
+    def generate_pattern(self, pattern, count=1, exclude_ambiguous=False, breach_index=None,
+                         unique=False):
+        """
+        Генерирует пароли по шаблону, например "Cvccvc-9999-Cvccvc"
+
+        Шаблон компилируется один раз (см. PatternPolicy), пароли пачки
+        генерируются по столбцам из крупных блоков случайных байтов.
+
+        Args:
+            pattern (str): Шаблон (классы символов - PATTERN_CLASSES)
+            count (int): Количество паролей
+            exclude_ambiguous (bool): Исключить похожие символы (0, O, l, 1, I)
+            breach_index (BreachIndex): Индекс утёкших паролей, совпадения
+                генерируются заново
+            unique (bool): Все пароли различны
+
+        Returns:
+            list: Список сгенерированных паролей
+        """
+        policy = PatternPolicy.compile(pattern, exclude_ambiguous)
+        return self.generate_batch(count, policy=policy, breach_index=breach_index,
+                                   unique=unique)
+
+    def generate_diceware(self, words=5, separator="-", capitalize=False, add_number=False,
+                          wordlist=None, breach_index=None):
+        """
+        Генерирует запоминающийся пароль по методу Diceware
+
+        Args:
+            words (int): Количество слов (по умолчанию: 5)
+            separator (str): Разделитель между словами (по умолчанию: "-")
+            capitalize (bool): Капитализировать первую букву каждого слова
+            add_number (bool): Добавить случайное число в конец
+            wordlist (Wordlist): Словарь (по умолчанию: встроенный)
+            breach_index (BreachIndex): Индекс утёкших паролей, совпадения
+                генерируются заново
+
+        Returns:
+            str: Сгенерированный пароль из слов
+        """
+        index = self._reserve(1)
+        entropy = self._entropy if index is None else SeededStream(self._seed_key, index)
+        return self._diceware(entropy, words, separator, capitalize, add_number,
+                              wordlist, breach_index)
+
+    def _diceware(self, entropy, words=5, separator="-", capitalize=False, add_number=False,
+                  wordlist=None, breach_index=None):
+        """Diceware пароль из заданного источника случайности"""
+        if words < 3:
+            raise ValueError("Количество слов должно быть не менее 3")
+        if words > 10:
+            raise ValueError("Количество слов не должно превышать 10")
+
+        if wordlist is None:
+            wordlist = Wordlist.builtin()
+
+        randbelow = entropy.randbelow
+        size = len(wordlist)
+        for _ in range(BREACH_MAX_ATTEMPTS):
+            # Выбираем случайные слова из словаря
+            selected_words = [wordlist[randbelow(size)] for _ in range(words)]
+
+            # Капитализация если нужно
+            if capitalize:
+                selected_words = [word.capitalize() for word in selected_words]
+
+            # Собираем пароль
+            password = separator.join(selected_words)
+
+            # Добавляем число если нужно
+            if add_number:
+                password += separator + str(randbelow(10000))
+
+            if breach_index is None or password not in breach_index:
+                return password
+        raise ValueError("Все сгенерированные пароли найдены в индексе утечек")
+
+    def generate_diceware_multiple(self, count=1, unique=False, start=None, **kwargs):
+        """
+        Генерирует несколько diceware паролей
+
+        Args:
+            count (int): Количество паролей
+            unique (bool): Все пароли различны
+            start (int): С seed - номер первого пароля (по умолчанию:
+                следующий по порядку)
+            **kwargs: Параметры для метода generate_diceware()
+
+        Returns:
+            list: Список сгенерированных паролей
+        """
+        first = self._reserve(count, start)
+        if first is not None:
+            if unique:
+                raise ValueError("unique нельзя использовать с seed: пароль задаётся его номером")
+            return [self._diceware(SeededStream(self._seed_key, i), **kwargs)
+                    for i in range(first, first + count)]
+
+        def sample(n):
+            return [self.generate_diceware(**kwargs) for _ in range(n)]
+
+        if unique:
+            return [pwd for chunk in iter_unique([sample(count)], count, sample) for pwd in chunk]
+        return sample(count)
+
+    def iter_batches(self, count, chunk_size=STREAM_CHUNK_SIZE, diceware=False, unique=False,
+                     **kwargs):
+        """
+        Лениво генерирует пароли пачками фиксированного размера
+
+        В памяти одновременно находится только одна пачка, поэтому
+        расход памяти не зависит от общего количества паролей (с unique
+        добавляются 16 байт на пароль для FingerprintSet).
+
+        Args:
+            count (int): Общее количество паролей
+            chunk_size (int): Размер одной пачки
+            diceware (bool): Генерировать diceware пароли
+            unique (bool): Все пароли различны
+            **kwargs: Параметры для generate_batch() или generate_diceware()
+
+        Yields:
+            list: Очередная пачка паролей
+        """
+        if chunk_size < 1:
+            raise ValueError("Размер пачки должен быть не менее 1")
+        if unique and self._seed_key is not None:
+            raise ValueError("unique нельзя использовать с seed: пароль задаётся его номером")
+        generate_chunk = self.generate_diceware_multiple if diceware else self.generate_batch
+        if unique:
+            yield from iter_unique(self.iter_batches(count, chunk_size, diceware, **kwargs),
+                                   count, lambda n: generate_chunk(n, **kwargs))
+            return
+        remaining = count
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            yield generate_chunk(size, **kwargs)
+            remaining -= size
+
+    def generate_parallel(self, count, jobs=None, diceware=False, ordered=True,
+                          chunk_size=STREAM_CHUNK_SIZE, unique=False, **kwargs):
+        """
+        Генерирует пароли пачками в нескольких процессах
+
+        Каждый процесс создаёт собственный PasswordGenerator, поэтому его
+        случайные байты независимо читаются из os.urandom. Одновременно
+        в работе не больше двух пачек на процесс, так что расход памяти
+        не зависит от общего количества паролей.
+
+        Args:
+            count (int): Общее количество паролей
+            jobs (int): Количество процессов (по умолчанию: число ядер)
+            diceware (bool): Генерировать diceware пароли
+            ordered (bool): Возвращать пачки в порядке отправки
+            chunk_size (int): Размер одной пачки
+            unique (bool): Все пароли различны (повторы отсеиваются
+                в вызывающем процессе и догенерируются в нём же)
+            **kwargs: Параметры для generate_batch() или generate_diceware()
+
+        Yields:
+            list: Очередная пачка паролей
+        """
+        if unique:
+            if self._seed_key is not None:
+                raise ValueError("unique нельзя использовать с seed: пароль задаётся его номером")
+            generate_chunk = self.generate_diceware_multiple if diceware else self.generate_batch
+            yield from iter_unique(
+                self.generate_parallel(count, jobs, diceware, ordered, chunk_size, **kwargs),
+                count, lambda n: generate_chunk(n, **kwargs))
+            return
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        if jobs < 1:
+            raise ValueError("Количество процессов должно быть не менее 1")
+        if chunk_size < 1:
+            raise ValueError("Размер пачки должен быть не менее 1")
+        if jobs == 1:
+            yield from self.iter_batches(count, chunk_size, diceware, **kwargs)
+            return
+
+        from collections import deque
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+        # С seed номера паролей распределяются заранее: пачка получает
+        # свой start, и результат не зависит от числа процессов
+        first = self._reserve(count)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_parallel_worker,
+                                 initargs=(self.backend, self.seed)) as pool:
+            pending = deque()
+
+            def collect():
+                # Забираем готовые пачки: первую по порядку или любые завершённые
+                if ordered:
+                    return [pending.popleft().result()]
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                return [future.result() for future in done]
+
+            for offset in range(0, count, chunk_size):
+                size = min(chunk_size, count - offset)
+                options = kwargs if first is None else dict(kwargs, start=first + offset)
+                pending.append(pool.submit(_parallel_worker, diceware, size, options))
+                if len(pending) >= jobs * 2:
+                    yield from collect()
+            while pending:
+                yield from collect()
+
+
+def _reject_breached(generate, count, breach_index):
+    """
+    Генерирует пароли, отбрасывая найденные в индексе утечек
+
+    Args:
+        generate: Функция generate(n), возвращающая список из n паролей
+        count (int): Количество паролей
+        breach_index (BreachIndex): Индекс утёкших паролей
+
+    Returns:
+        list: Список паролей
+    """
+    passwords = []
+    attempts = 0
+    while len(passwords) < count:
+        found = [pwd for pwd in generate(count - len(passwords)) if pwd not in breach_index]
+        if found:
+            attempts = 0
+        else:
+            attempts += 1
+            if attempts >= BREACH_MAX_ATTEMPTS:
+                raise ValueError("Все сгенерированные пароли найдены в индексе утечек")
+        passwords.extend(found)
+    return passwords
+
+
+# Генератор рабочего процесса для generate_parallel()
+_worker_generator = None
+
+
+def _init_parallel_worker(backend, seed=None):
+    """Создаёт в рабочем процессе собственный генератор"""
+    global _worker_generator
+    _worker_generator = PasswordGenerator(backend=backend, seed=seed)
+
+
+def _generate_chunk(generator, diceware, size, kwargs):
+    """Генерирует одну пачку символьных или diceware паролей"""
+    if diceware:
+        return generator.generate_diceware_multiple(size, **kwargs)
+    return generator.generate_batch(size, **kwargs)
+
+
+def _parallel_worker(diceware, size, kwargs):
+    """Генерирует одну пачку паролей в рабочем процессе"""
+    return _generate_chunk(_worker_generator, diceware, size, kwargs)
+
+
+def parse_hash_cost(method, spec=None):
+    """
+    Разбирает параметры стоимости хеширования
+
+    Args:
+        method (str): Метод из HASH_METHODS
+        spec (str): Строка вида "iterations=600000" (pbkdf2)
+            или "n=16384,r=8,p=1" (scrypt); None - значения по умолчанию
+
+    Returns:
+        dict: Параметры для hash_password()
+    """
+    if method not in HASH_METHODS:
+        raise ValueError(f"Неизвестный метод хеширования: {method}")
+    cost = dict(HASH_DEFAULT_COST[method])
+    for item in (spec or '').split(','):
+        if not item.strip():
+            continue
+        name, _, value = item.partition('=')
+        name = name.strip()
+        if name not in cost:
+            raise ValueError(f"Неизвестный параметр {name!r} для {method} "
+                             f"(допустимы: {', '.join(cost)})")
+        try:
+            cost[name] = int(value)
+        except ValueError:
+            raise ValueError(f"Параметр {name} должен быть целым числом") from None
+
+    if method == "pbkdf2":
+        if cost["iterations"] < 1:
+            raise ValueError("Количество итераций должно быть не менее 1")
+    else:
+        n = cost["n"]
+        if n < 2 or n & (n - 1):
+            raise ValueError("Параметр n для scrypt должен быть степенью двойки больше 1")
+        if cost["r"] < 1 or cost["p"] < 1:
+            raise ValueError("Параметры r и p для scrypt должны быть не менее 1")
+        scrypt_maxmem(n, cost["r"], cost["p"])
+    return cost
+
+
+def scrypt_maxmem(n, r, p):
+    """
+    Предел памяти maxmem для hashlib.scrypt
+
+    scrypt занимает около 128 * r * (n + p) байт; предел берётся с запасом
+    вдвое, но не больше SCRYPT_MAXMEM_LIMIT.
+
+    Args:
+        n (int): Параметр стоимости
+        r (int): Размер блока
+        p (int): Параллельность
+
+    Returns:
+        int: Значение maxmem
+
+    Raises:
+        ValueError: Если параметрам нужно больше SCRYPT_MAXMEM_LIMIT байт
+    """
+    needed = 128 * r * (n + p)
+    if needed >= SCRYPT_MAXMEM_LIMIT:
+        raise ValueError(f"scrypt с n={n}, r={r}, p={p} требует около {needed >> 20} МиБ "
+                         f"памяти, больше предела {SCRYPT_MAXMEM_LIMIT >> 20} МиБ")
+    return min(2 * needed, SCRYPT_MAXMEM_LIMIT)
+
+
+def hash_params(method, cost):
+    """
+    Описание алгоритма и стоимости в стиле PHC для строки выгрузки
+
+    Returns:
+        str: Например "$pbkdf2-sha256$i=600000" или "$scrypt$ln=14,r=8,p=1"
+    """
+    if method == "pbkdf2":
+        return f"$pbkdf2-sha256$i={cost['iterations']}"
+    return f"$scrypt$ln={cost['n'].bit_length() - 1},r={cost['r']},p={cost['p']}"
+
+
+def hash_password(password, method="pbkdf2", salt=None, **cost):
+    """
+    Вычисляет хеш пароля для хранения (PBKDF2-HMAC-SHA256 или scrypt)
+
+    Args:
+        password (str): Пароль
+        method (str): Метод из HASH_METHODS
+        salt (bytes): Соль (по умолчанию: HASH_SALT_SIZE случайных байт)
+        **cost: Параметры стоимости (см. parse_hash_cost())
+
+    Returns:
+        tuple: (соль, хеш) в байтах
+    """
+    import hashlib
+
+    if salt is None:
+        salt = os.urandom(HASH_SALT_SIZE)
+    cost = {**HASH_DEFAULT_COST[method], **cost}
+    data = password.encode('utf-8')
+    if method == "pbkdf2":
+        digest = hashlib.pbkdf2_hmac('sha256', data, salt, cost["iterations"])
+    else:
+        n, r, p = cost["n"], cost["r"], cost["p"]
+        digest = hashlib.scrypt(data, salt=salt, n=n, r=r, p=p,
+                                maxmem=scrypt_maxmem(n, r, p), dklen=32)
+    return salt, digest
+
+
+def _hash_chunk(passwords, method, cost):
+    """Хеширует пачку паролей (выполняется в рабочих процессах)"""
+    rows = []
+    for password in passwords:
+        salt, digest = hash_password(password, method, **cost)
+        rows.append((password, salt.hex(), digest.hex()))
+    return rows
+
+
+def iter_hashed(chunks, method="pbkdf2", jobs=None, **cost):
+    """
+    Хеширует пачки паролей в пуле процессов
+
+    Вычисление ключа занимает почти всё время, поэтому пачки хешируются
+    параллельно, а в работе одновременно не больше двух пачек на процесс.
+    Порядок пачек сохраняется.
+
+    Args:
+        chunks: Итератор пачек паролей
+        method (str): Метод из HASH_METHODS
+        jobs (int): Количество процессов (по умолчанию: число ядер)
+        **cost: Параметры стоимости (см. parse_hash_cost())
+
+    Yields:
+        list: Строки (пароль, соль hex, хеш hex) очередной пачки
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs < 1:
+        raise ValueError("Количество процессов должно быть не менее 1")
+    cost = {**HASH_DEFAULT_COST[method], **cost}
+    if jobs == 1:
+        for chunk in chunks:
+            yield _hash_chunk(chunk, method, cost)
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_hash_chunk, chunk, method, cost))
+            if len(pending) >= jobs * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class PasswordPool:
+    """
+    Запас готовых паролей с фоновым пополнением
+
+    Для каждой политики (режим и параметры генерации) хранится кольцевой
+    буфер готовых паролей. get() забирает пароль из буфера за O(1) и удаляет
+    его оттуда, поэтому один пароль никогда не выдаётся дважды. Когда
+    в буфере остаётся меньше low_water паролей, фоновый поток пополняет
+    его пачкой через generate_batch()/generate_diceware_multiple().
+
+    Пример:
+        with PasswordPool(capacity=10000) as pool:
+            pool.register(length=16)
+            password = pool.get(length=16)
+    """
+
+    def __init__(self, capacity=1000, low_water=None, backend="python"):
+        """
+        Args:
+            capacity (int): Размер буфера каждой политики
+            low_water (int): Порог пополнения (по умолчанию: половина capacity)
+            backend (str): Бэкенд генерации символьных паролей
+        """
+        import threading
+
+        if capacity < 1:
+            raise ValueError("Размер буфера должен быть не менее 1")
+        self.capacity = capacity
+        self.low_water = capacity // 2 if low_water is None else low_water
+        if not 0 <= self.low_water < capacity:
+            raise ValueError("Порог пополнения должен быть от 0 до размера буфера")
+
+        self._buffers = {}
+        self._policies = {}
+        # Генератор потокобезопасен: у фонового и вызывающих потоков
+        # свои буферы энтропии, блокировка на промахах не нужна
+        self._generator = PasswordGenerator(backend=backend)
+        self._stats_lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._closed = False
+        self._error = None
+        self._stats = {'hits': 0, 'misses': 0, 'refills': 0, 'refilled': 0}
+        self._thread = threading.Thread(target=self._refill_loop,
+                                        name="PasswordPool-refill", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _key(diceware, options):
+        """Ключ политики: режим и отсортированные параметры"""
+        return (diceware, tuple(sorted(options.items())))
+
+    def register(self, diceware=False, wait=True, **options):
+        """
+        Добавляет политику и заполняет её буфер
+
+        Args:
+            diceware (bool): Diceware пароли
+            wait (bool): Дождаться первого заполнения буфера
+            **options: Параметры для generate_batch() или generate_diceware()
+
+        Returns:
+            tuple: Ключ политики
+        """
+        from collections import deque
+
+        if self._error is not None:
+            raise self._error
+        key = self._key(diceware, options)
+        with self._wakeup:
+            if key not in self._buffers:
+                # Проверяем параметры сразу, а не в фоновом потоке
+                _generate_chunk(self._generator, diceware, 1, options)
+                self._policies[key] = (diceware, options)
+                self._buffers[key] = deque(maxlen=self.capacity)
+            self._wakeup.notify()
+        if wait:
+            self._refill(key)
+        return key
+
+    def get(self, diceware=False, **options):
+        """
+        Возвращает готовый пароль
+
+        Если политика ещё не зарегистрирована, она регистрируется без
+        ожидания. При пустом буфере пароль генерируется сразу (промах).
+        Если фоновый поток пополнения завершился с ошибкой, она
+        выбрасывается здесь.
+
+        Args:
+            diceware (bool): Diceware пароль
+            **options: Параметры для generate_batch() или generate_diceware()
+
+        Returns:
+            str: Пароль
+        """
+        if self._error is not None:
+            raise self._error
+        key = self._key(diceware, options)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            self.register(diceware, wait=False, **options)
+            buffer = self._buffers[key]
+
+        try:
+            password = buffer.popleft()
+        except IndexError:
+            password = _generate_chunk(self._generator, diceware, 1, options)[0]
+            outcome = 'misses'
+        else:
+            outcome = 'hits'
+        with self._stats_lock:
+            self._stats[outcome] += 1
+
+        if len(buffer) < self.low_water:
+            with self._wakeup:
+                self._wakeup.notify()
+        return password
+
+    def stats(self):
+        """
+        Возвращает статистику пула
+
+        Returns:
+            dict: hits, misses, hit_rate, refills (число пополнений),
+                  refilled (добавлено в буферы при пополнениях), available
+                  (паролей в буферах по политикам)
+        """
+        # _wakeup защищает словарь буферов от register(), _stats_lock -
+        # счётчики и пополнение буферов
+        with self._wakeup, self._stats_lock:
+            stats = dict(self._stats)
+            available = {key: len(buffer) for key, buffer in self._buffers.items()}
+        total = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / total if total else 0.0
+        stats['available'] = available
+        return stats
+
+    def _refill(self, key):
+        """Дополняет буфер политики до полного размера"""
+        buffer = self._buffers[key]
+        missing = self.capacity - len(buffer)
+        if missing <= 0:
+            return
+        diceware, options = self._policies[key]
+        chunk = _generate_chunk(self._generator, diceware, missing, options)
+        with self._stats_lock:
+            # Пока пачка генерировалась, буфер мог пополнить другой поток
+            # (register с wait=True); лишнее deque молча вытеснил бы,
+            # поэтому добавляем и считаем только то, что помещается
+            kept = chunk[:self.capacity - len(buffer)]
+            buffer.extend(kept)
+            if kept:
+                self._stats['refills'] += 1
+                self._stats['refilled'] += len(kept)
+
+    def _refill_loop(self):
+        """Фоновый поток: пополняет буферы, опустившиеся ниже порога"""
+        while True:
+            with self._wakeup:
+                while not self._closed and not any(
+                        len(buffer) < self.low_water for buffer in self._buffers.values()):
+                    self._wakeup.wait()
+                if self._closed:
+                    return
+                keys = [key for key, buffer in self._buffers.items()
+                        if len(buffer) < self.low_water]
+            try:
+                for key in keys:
+                    self._refill(key)
+            except Exception as e:
+                # Ошибку получат вызывающие get(), иначе они никогда
+                # не узнали бы, что пул больше не пополняется
+                with self._wakeup:
+                    self._error = e
+                    self._closed = True
+                return
+
+    def close(self):
+        """Останавливает фоновый поток и очищает буферы"""
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join()
+        for buffer in self._buffers.values():
+            buffer.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@functools.lru_cache(maxsize=1)
+def _argparse_classes():
+    """
+    Создаёт классы парсера аргументов
+
+    argparse импортируется только здесь, поэтому полный парсер
+    строится лишь для -h, ошибок и редких опций.
+
+    Returns:
+        tuple: (CustomFormatter, CustomArgumentParser)
+    """
+    import argparse
+
+    class CustomFormatter(argparse.RawDescriptionHelpFormatter):
+        """Кастомный форматтер для скрытия metavar у определённых опций"""
+        def _format_action_invocation(self, action):
+            if not action.option_strings:
+                default = self._get_default_metavar_for_positional(action)
+                metavar, = self._metavar_formatter(action, default)(1)
+                return metavar
+            else:
+                parts = []
+                # Если есть короткая опция
+                if action.option_strings:
+                    parts.extend(action.option_strings)
+                return ', '.join(parts)
+
+        def add_usage(self, usage, actions, groups, prefix=None):
+            if prefix is None:
+                prefix = 'Использование: '
+            return super().add_usage(usage, actions, groups, prefix)
+
+        def format_help(self):
+            help_text = super().format_help()
+            # Заменяем "options:" на "Опции:"
+            help_text = help_text.replace('options:', 'Опции:')
+            help_text = help_text.replace('optional arguments:', 'Опции:')
+            return help_text
+
+
+    class CustomArgumentParser(argparse.ArgumentParser):
+        """Кастомный парсер с улучшенным выводом ошибок"""
+        def error(self, message):
+            """Переопределяем вывод ошибок"""
+            self.print_usage(sys.stderr)
+            sys.stderr.write(f"{self.prog}: error: {message}\n")
+            sys.stderr.write("Используйте флаг '-h' для просмотра справки\n")
+            sys.exit(2)
+
+    return CustomFormatter, CustomArgumentParser
+
+
+def __getattr__(name):
+    """Ленивые атрибуты модуля: классы парсера и встроенный словарь"""
+    if name == 'CustomFormatter':
+        return _argparse_classes()[0]
+    if name == 'CustomArgumentParser':
+        return _argparse_classes()[1]
+    if name == 'DICEWARE_WORDLIST':
+        return _DICEWARE_WORDS.split()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Значения аргументов командной строки по умолчанию
+# (общие для полного парсера и быстрого пути)
+CLI_DEFAULTS = {
+    'interactive': False,
+    'length': None,
+    'count': None,
+    'no_uppercase': False,
+    'no_digits': False,
+    'no_special': False,
+    'exclude_ambiguous': False,
+    'simple': False,
+    'complex': False,
+    'output': None,
+    'show_strength': False,
+    'custom_chars': None,
+    'stream': False,
+    'raw': False,
+    'format': None,
+    'metadata': False,
+    'append': False,
+    'compress': None,
+    'encrypt': False,
+    'decrypt': None,
+    'jobs': None,
+    'unordered': False,
+    'unique': False,
+    'backend': 'python',
+    'diceware': False,
+    'words': 5,
+    'separator': '-',
+    'wordlist': None,
+    'capitalize': False,
+    'add_number': False,
+    'serve': None,
+    'client': None,
+    'audit': None,
+    'audit_report': None,
+    'build_index': None,
+    'breach_index': None,
+    'hash': None,
+    'hash_cost': None,
+    'policy': None,
+    'entropy': False,
+    'pattern': None,
+    'deterministic': False,
+    'seed': None,
+    'range': None,
+    'profile': False,
+    'profile_dump': None,
+}
+
+# Флаги и числовые опции, которые понимает быстрый путь
+_FAST_FLAGS = {
+    '-s': 'simple', '--simple': 'simple',
+    '--complex': 'complex',
+    '--no-uppercase': 'no_uppercase',
+    '--no-digits': 'no_digits',
+    '--no-special': 'no_special',
+    '--exclude-ambiguous': 'exclude_ambiguous',
+    '--show-strength': 'show_strength',
+    '--raw': 'raw',
+    '-d': 'diceware', '--diceware': 'diceware',
+    '--capitalize': 'capitalize',
+    '--add-number': 'add_number',
+    '--entropy': 'entropy',
+    '--profile': 'profile',
+}
+_FAST_INT_OPTIONS = {
+    '-l': 'length', '--length': 'length',
+    '-c': 'count', '--count': 'count',
+    '--words': 'words',
+}
+
+
+def diceware_entropy_bits(words, wordlist_size, add_number=False):
+    """
+    Энтропия diceware пароля
+
+    Args:
+        words (int): Количество слов
+        wordlist_size (int): Размер словаря
+        add_number (bool): В конце добавлено число 0-9999
+
+    Returns:
+        float: Энтропия в битах
+    """
+    bits = words * math.log2(wordlist_size)
+    if add_number:
+        bits += math.log2(10000)
+    return bits
+
+
+class EntropyReport:
+    """
+    Точный размер пространства паролей для режима генерации
+
+    keyspace - количество различных паролей, entropy_bits - энтропия
+    распределения, из которого они выбираются. exact = False означает,
+    что keyspace - верхняя оценка (разные наборы слов могут дать одну
+    строку).
+    """
+
+    __slots__ = ('description', 'keyspace', 'entropy_bits', 'exact', 'details')
+
+    def __init__(self, description, keyspace, entropy_bits, exact=True, details=()):
+        self.description = description
+        self.keyspace = keyspace
+        self.entropy_bits = entropy_bits
+        self.exact = exact
+        self.details = list(details)
+
+    def format(self):
+        """
+        Текст отчёта для --entropy
+
+        Returns:
+            str: Многострочный отчёт
+        """
+        digits = len(str(self.keyspace))
+        if digits <= 30:
+            keyspace = f"{self.keyspace:,}"
+        else:
+            keyspace = f"~10^{digits - 1} ({digits} цифр)"
+        lines = [f"Режим: {self.description}"]
+        lines.extend(f"  {label}: {value}" for label, value in self.details)
+        lines.append(f"  Паролей: {keyspace}{'' if self.exact else ' (верхняя оценка)'}")
+        lines.append(f"  Энтропия: {self.entropy_bits:.2f} бит"
+                     f"{'' if self.exact else ' (верхняя оценка)'}")
+        return '\n'.join(lines)
+
+
+def charset_entropy_report(length=12, use_uppercase=True, use_digits=True, use_special=True,
+                           exclude_ambiguous=False, custom_chars=None, policy=None):
+    """
+    Точная энтропия символьных паролей для параметров generate()
+
+    Учитывает исключение похожих символов и то, что в пароле обязателен
+    символ каждого выбранного типа. Считается аналитически (с кешем), без
+    генерации паролей.
+
+    Args:
+        length (int): Длина пароля
+        use_uppercase (bool): Использовать заглавные буквы
+        use_digits (bool): Использовать цифры
+        use_special (bool): Использовать специальные символы
+        exclude_ambiguous (bool): Исключить похожие символы (0, O, l, 1, I)
+        custom_chars (str): Кастомный набор символов (игнорирует другие опции)
+        policy (CharsetPolicy, ConstraintPolicy или PatternPolicy): Готовая
+            политика (заменяет флаги выше)
+
+    Returns:
+        EntropyReport: Отчёт
+    """
+    if length < 4:
+        raise ValueError("Длина пароля должна быть не менее 4 символов")
+    if policy is None:
+        policy = CharsetPolicy.compile(use_uppercase, use_digits, use_special,
+                                       exclude_ambiguous, custom_chars)
+    if isinstance(policy, PatternPolicy):
+        random_positions = sum(len(indexes) for _, indexes in policy._groups)
+        details = [("Шаблон", policy.pattern), ("Длина", policy.length),
+                   ("Случайных позиций", random_positions)]
+        return EntropyReport(policy.describe(), policy.keyspace(), policy.entropy_bits(),
+                             details=details)
+    keyspace = policy.keyspace(length)
+    if not keyspace:
+        raise ValueError(f"Политике не удовлетворяет ни один пароль длины {length}")
+    bits = policy.entropy_bits(length)
+    alphabet_size = len(set(policy.alphabet))
+    details = [("Длина", length), ("Размер алфавита", alphabet_size)]
+    if isinstance(policy, CharsetPolicy) and policy.classes:
+        sizes = ', '.join(str(len(chars)) for chars in policy.classes)
+        details.append(("Обязательные типы", f"{len(policy.classes)} (размеры {sizes})"))
+    if alphabet_size < len(policy.alphabet):
+        details.append(("Повторы в наборе", "символы неравновероятны, энтропия по Шеннону"))
+    else:
+        unconstrained = length * math.log2(alphabet_size)
+        if unconstrained - bits >= 0.005:
+            details.append(("Без ограничений", f"{unconstrained:.2f} бит (ограничения "
+                                               f"отнимают {unconstrained - bits:.2f})"))
+    return EntropyReport(policy.describe(), keyspace, bits, details=details)
+
+
+@functools.lru_cache(maxsize=16)
+def _diceware_word_stats(wordlist, separator, capitalize, add_number):
+    """
+    Статистика словаря для отчёта об энтропии diceware (кешируется)
+
+    Args:
+        wordlist (Wordlist): Словарь
+        separator (str): Разделитель между словами
+        capitalize (bool): Слова капитализируются
+        add_number (bool): В конце добавляется число
+
+    Returns:
+        tuple: (различных слов, бит на слово, разбиение на слова однозначно)
+    """
+    counts = {}
+    _count_elements(counts, (word.capitalize() for word in wordlist) if capitalize else wordlist)
+    size = len(wordlist)
+    bits = sum(c * math.log2(size / c) for c in counts.values()) / size
+    # Пароль однозначно делится на слова, только если разделителя нет в
+    # словах, а с числом в конце - если он не состоит из одних цифр
+    unambiguous = bool(separator) and all(separator not in word for word in counts)
+    if add_number and separator.isdigit():
+        unambiguous = False
+    return len(counts), bits, unambiguous
+
+
+def diceware_entropy_report(words=5, separator="-", capitalize=False, add_number=False,
+                            wordlist=None):
+    """
+    Точная энтропия diceware паролей для параметров generate_diceware()
+
+    Капитализация может склеить слова, различающиеся только регистром,
+    а разделитель, встречающийся внутри слов, - разные наборы слов; это
+    учитывается в отчёте.
+
+    Args:
+        words (int): Количество слов
+        separator (str): Разделитель между словами
+        capitalize (bool): Капитализировать первую букву каждого слова
+        add_number (bool): Добавить случайное число 0-9999 в конец
+        wordlist (Wordlist): Словарь (по умолчанию: встроенный)
+
+    Returns:
+        EntropyReport: Отчёт
+    """
+    if words < 3:
+        raise ValueError("Количество слов должно быть не менее 3")
+    if words > 10:
+        raise ValueError("Количество слов не должно превышать 10")
+    if wordlist is None:
+        wordlist = Wordlist.builtin()
+    distinct, bits_per_word, unambiguous = _diceware_word_stats(
+        wordlist, separator, bool(capitalize), bool(add_number))
+    keyspace = distinct ** words
+    bits = words * bits_per_word
+    if add_number:
+        keyspace *= 10000
+        bits += math.log2(10000)
+
+    details = [("Слов", words), ("Размер словаря", len(wordlist)),
+               ("Бит на слово", f"{bits_per_word:.2f}")]
+    if distinct < len(wordlist):
+        details.append(("Капитализация", f"склеивает слова, различных: {distinct}"))
+    if add_number:
+        details.append(("Число в конце", f"0-9999, {math.log2(10000):.2f} бит"))
+    if not unambiguous:
+        details.append(("Разделитель", f"{separator!r} встречается в словах или пуст: "
+                                       "разные наборы слов могут совпасть"))
+    return EntropyReport(f"diceware:{words}:{len(wordlist)}", keyspace, bits,
+                         exact=unambiguous, details=details)
+
+
+def pluralize_password(count):
+    """
+    Возвращает правильную форму слова "пароль" в зависимости от числа
+
+    Args:
+        count (int): Количество паролей
+
+    Returns:
+        str: "пароль", "пароля" или "паролей"
+    """
+    if count % 100 in (11, 12, 13, 14):
+        return "паролей"
+
+    last_digit = count % 10
+    if last_digit == 1:
+        return "пароль"
+    elif last_digit in (2, 3, 4):
+        return "пароля"
+    else:
+        return "паролей"
+
+
+def _build_class_table():
+    """
+    Таблица типов для первых 256 символов (для str.translate)
+
+    Строчная буква переводится в "l", заглавная - в "u", цифра - в "d",
+    спецсимвол - в "s", остальные символы удаляются. Символы за пределами
+    таблицы str.translate оставляет как есть.
+    """
+    table = []
+    for code in range(256):
+        char = chr(code)
+        if char.islower():
+            table.append('l')
+        elif char.isupper():
+            table.append('u')
+        elif char.isdigit():
+            table.append('d')
+        elif char in SPECIAL_CHARS:
+            table.append('s')
+        else:
+            table.append(None)
+    return table
+
+
+_CLASS_TABLE = _build_class_table()
+_CLASS_MARKERS = frozenset('luds')
+
+# Сколько символов даёт каждый тип при оценке энтропии по алфавиту
+_CLASS_POOL_SIZES = {'l': 26, 'u': 26, 'd': 10, 's': len(SPECIAL_CHARS)}
+
+# c * log2(c) для энтропии Шеннона по частотам символов
+_COUNT_LOG_TABLE = [0.0] + [c * math.log2(c) for c in range(1, 257)]
+
+
+class StrengthResult:
+    """
+    Результат проверки силы пароля
+
+    Для совместимости распаковывается как кортеж (баллы, уровень, описание).
+    Описание строится только при обращении к нему.
+    """
+
+    __slots__ = ('score', 'level', 'length', 'unique_chars', 'has_lower', 'has_upper',
+                 'has_digit', 'has_special', 'entropy_bits', 'shannon_bits', 'breached')
+
+    def __init__(self, score, level, length, unique_chars, has_lower, has_upper,
+                 has_digit, has_special, entropy_bits, shannon_bits, breached=False):
+        self.score = score
+        self.level = level
+        self.length = length
+        self.unique_chars = unique_chars
+        self.has_lower = has_lower
+        self.has_upper = has_upper
+        self.has_digit = has_digit
+        self.has_special = has_special
+        self.entropy_bits = entropy_bits
+        self.shannon_bits = shannon_bits
+        self.breached = breached
+
+    @property
+    def details(self):
+        """Описание: длина, разнообразие, типы символов"""
+        types = []
+        if self.has_lower:
+            types.append("строчные")
+        if self.has_upper:
+            types.append("заглавные")
+        if self.has_digit:
+            types.append("цифры")
+        if self.has_special:
+            types.append("спецсимволы")
+        parts = [
+            f"Длина: {self.length}",
+            f"Разнообразие: {self.unique_chars}/{self.length}",
+            f"Типы: {', '.join(types)}",
+        ]
+        if self.breached:
+            parts.append("Найден в индексе утечек")
+        return " | ".join(parts)
+
+    def __iter__(self):
+        return iter((self.score, self.level, self.details))
+
+    def __getitem__(self, index):
+        return (self.score, self.level, self.details)[index]
+
+    def __len__(self):
+        return 3
+
+    def __repr__(self):
+        return (f"StrengthResult(score={self.score}, level={self.level!r}, "
+                f"entropy_bits={self.entropy_bits:.1f})")
+
+
+def check_password_strength(password, breach_index=None):
+    """
+    Проверяет силу пароля
+
+    Типы символов определяются за один проход str.translate по таблице
+    на 256 символов, частоты - за один проход Counter. Пароль, найденный
+    в индексе утечек, получает 0 баллов и уровень "Слабый".
+
+    Args:
+        password (str): Пароль для проверки
+        breach_index (BreachIndex): Индекс утёкших паролей
+
+    Returns:
+        StrengthResult: Результат (распаковывается как (баллы, уровень, описание))
+    """
+    # Длина пароля
+    length = len(password)
+    if length >= 16:
+        score = 3
+    elif length >= 12:
+        score = 2
+    elif length >= 8:
+        score = 1
+    else:
+        score = 0
+
+    # Наличие разных типов символов
+    classes = set(password.translate(_CLASS_TABLE))
+    other = ()
+    if not classes <= _CLASS_MARKERS:
+        # Символы за пределами таблицы проверяем по отдельности
+        other = classes - _CLASS_MARKERS
+        classes -= other
+        for char in other:
+            if char.islower():
+                classes.add('l')
+            elif char.isupper():
+                classes.add('u')
+            elif char.isdigit():
+                classes.add('d')
+
+    score += len(classes)
+
+    # Разнообразие символов (уникальность)
+    counts = {}
+    _count_elements(counts, password)
+    unique_chars = len(counts)
+    uniqueness_ratio = unique_chars / length if length > 0 else 0
+    if uniqueness_ratio > 0.8:
+        score += 2
+    elif uniqueness_ratio > 0.6:
+        score += 1
+
+    breached = breach_index is not None and password in breach_index
+    if breached:
+        score = 0
+
+    # Определение уровня
+    if score >= 9:
+        level = "Очень сильный"
+    elif score >= 7:
+        level = "Сильный"
+    elif score >= 5:
+        level = "Средний"
+    else:
+        level = "Слабый"
+
+    # Энтропия: по размеру алфавита и по Шеннону (частоты символов)
+    pool = sum(_CLASS_POOL_SIZES[c] for c in classes) + len(other)
+    entropy_bits = length * math.log2(pool) if pool > 1 else 0.0
+    if length <= 256:
+        shannon_bits = (_COUNT_LOG_TABLE[length]
+                        - sum(map(_COUNT_LOG_TABLE.__getitem__, counts.values())))
+    else:
+        shannon_bits = length * math.log2(length) - sum(c * math.log2(c) for c in counts.values())
+
+    return StrengthResult(score, level, length, unique_chars, 'l' in classes, 'u' in classes,
+                          'd' in classes, 's' in classes, entropy_bits, shannon_bits, breached)
+
+
+def check_strength_batch(passwords, breach_index=None):
+    """
+    Проверяет силу множества паролей потоком
+
+    Принимает любой итерируемый источник, в том числе открытый файл
+    или sys.stdin: завершающие переводы строк отбрасываются, байтовые
+    строки декодируются как UTF-8 (некорректные байты сохраняются как
+    суррогаты, чтобы проверка по индексу утечек видела исходные байты).
+    Результаты выдаются по одному, поэтому
+    память не зависит от количества паролей.
+
+    Args:
+        passwords: Итерируемый источник паролей
+        breach_index (BreachIndex): Индекс утёкших паролей
+
+    Yields:
+        StrengthResult: Результат для очередного пароля
+    """
+    check = check_password_strength
+    for password in passwords:
+        if isinstance(password, bytes):
+            password = password.decode('utf-8', 'surrogateescape')
+        if password.endswith('\n'):
+            password = password.rstrip('\r\n')
+        yield check(password, breach_index)
+
+
+# Порядок уровней силы в отчётах
+STRENGTH_LEVELS = ("Слабый", "Средний", "Сильный", "Очень сильный")
+
+# Диапазоны длины для гистограммы (совпадают с порогами оценки)
+_AUDIT_LENGTH_RANGES = ((0, 7), (8, 11), (12, 15), (16, 19), (20, 31), (32, None))
+
+_AUDIT_CSV_HEADER = ("line,length,score,level,lower,upper,digit,special,"
+                     "entropy_bits,shannon_bits,breached\n")
+
+
+class AuditStats:
+    """
+    Сводная статистика проверки списка паролей
+
+    Хранит только счётчики, поэтому её размер не зависит от количества
+    паролей. Статистики отдельных пачек объединяются методом merge().
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.empty = 0
+        self.breached = 0
+        self.levels = {}
+        self.lengths = {}
+        # Маска типов символов (строчные=1, заглавные=2, цифры=4, спецсимволы=8)
+        self.class_masks = {}
+        self.entropy_sum = 0.0
+        self.min_entropy = None
+        # Заполняется после подсчёта повторов
+        self.unique = None
+        self.duplicated = 0
+        self.duplicate_copies = 0
+        self.max_repeats = 0
+
+    def add(self, result):
+        """
+        Учитывает результат проверки одного пароля
+
+        Args:
+            result (StrengthResult): Результат check_password_strength()
+        """
+        self.total += 1
+        levels = self.levels
+        levels[result.level] = levels.get(result.level, 0) + 1
+        lengths = self.lengths
+        lengths[result.length] = lengths.get(result.length, 0) + 1
+        mask = (result.has_lower | result.has_upper << 1
+                | result.has_digit << 2 | result.has_special << 3)
+        self.class_masks[mask] = self.class_masks.get(mask, 0) + 1
+        self.breached += result.breached
+        self.entropy_sum += result.entropy_bits
+        if self.min_entropy is None or result.entropy_bits < self.min_entropy:
+            self.min_entropy = result.entropy_bits
+
+    def merge(self, other):
+        """
+        Добавляет счётчики другой статистики
+
+        Args:
+            other (AuditStats): Статистика пачки
+        """
+        self.total += other.total
+        self.empty += other.empty
+        self.breached += other.breached
+        for mine, theirs in ((self.levels, other.levels), (self.lengths, other.lengths),
+                             (self.class_masks, other.class_masks)):
+            for key, value in theirs.items():
+                mine[key] = mine.get(key, 0) + value
+        self.entropy_sum += other.entropy_sum
+        if other.min_entropy is not None and (self.min_entropy is None
+                                              or other.min_entropy < self.min_entropy):
+            self.min_entropy = other.min_entropy
+
+    def class_counts(self):
+        """
+        Возвращает охват типов символов
+
+        Returns:
+            tuple: (по типам {"строчные": n, ...}, по числу типов {0: n, ..., 4: n})
+        """
+        by_class = dict.fromkeys(("строчные", "заглавные", "цифры", "спецсимволы"), 0)
+        by_number = dict.fromkeys(range(5), 0)
+        for mask, value in self.class_masks.items():
+            for bit, name in enumerate(by_class):
+                if mask >> bit & 1:
+                    by_class[name] += value
+            by_number[bin(mask).count('1')] += value
+        return by_class, by_number
+
+    def length_ranges(self):
+        """
+        Возвращает гистограмму длины по диапазонам
+
+        Returns:
+            list: Пары (подпись диапазона, количество)
+        """
+        histogram = []
+        for low, high in _AUDIT_LENGTH_RANGES:
+            value = sum(n for length, n in self.lengths.items()
+                        if length >= low and (high is None or length <= high))
+            label = f"{low}+" if high is None else f"{low}-{high}"
+            histogram.append((label, value))
+        return histogram
+
+    def summary(self):
+        """
+        Форматирует статистику для вывода
+
+        Returns:
+            str: Текст отчёта
+        """
+        def bar(value):
+            # Полоска гистограммы шириной до 30 символов
+            return '#' * round(30 * value / self.total) if self.total else ''
+
+        def row(label, value):
+            share = 100 * value / self.total if self.total else 0.0
+            return f"  {label:<16}{value:>12,}  {share:5.1f}%  {bar(value)}"
+
+        lines = [f"{'='*50}",
+                 f"  Проверено {self.total:,} {pluralize_password(self.total)}",
+                 f"{'='*50}"]
+        if self.empty:
+            lines.append(f"Пустых строк пропущено: {self.empty:,}")
+        if self.breached:
+            lines.append(f"Найдено в индексе утечек: {self.breached:,}")
+        if self.total:
+            lines.append(f"Энтропия по алфавиту: средняя {self.entropy_sum / self.total:.1f} бит, "
+                         f"минимальная {self.min_entropy:.1f} бит")
+
+        lines.append("\nСила паролей:")
+        lines.extend(row(level, self.levels.get(level, 0)) for level in STRENGTH_LEVELS)
+
+        lines.append("\nДлина:")
+        lines.extend(row(label, value) for label, value in self.length_ranges())
+
+        by_class, by_number = self.class_counts()
+        lines.append("\nТипы символов:")
+        lines.extend(row(name, value) for name, value in by_class.items())
+        lines.append("\nКоличество типов:")
+        lines.extend(row(str(number), value) for number, value in by_number.items())
+
+        if self.unique is not None:
+            lines.append("\nПовторы:")
+            lines.append(f"  Уникальных паролей:        {self.unique:>12,}")
+            lines.append(f"  Встречаются повторно:      {self.duplicated:>12,}")
+            lines.append(f"  Лишних копий:              {self.duplicate_copies:>12,}")
+            lines.append(f"  Максимум повторов одного:  {self.max_repeats:>12,}")
+        return '\n'.join(lines)
+
+
+class _DuplicateCounter:
+    """
+    Подсчёт повторов по 64-битным хешам паролей с ограниченной памятью
+
+    Хеши раскладываются по корзинам по старшим битам. Когда в памяти
+    накапливается больше AUDIT_DUP_SPILL хешей, корзины дописываются во
+    временные файлы, а при подсчёте читаются по одной - в памяти
+    одновременно находится только одна корзина.
+    """
+
+    def __init__(self, buckets=AUDIT_DUP_BUCKETS, spill=AUDIT_DUP_SPILL):
+        self._shift = 64 - (buckets - 1).bit_length()
+        self._buckets = [array('Q') for _ in range(buckets)]
+        self._spill = spill
+        self._buffered = 0
+        self._tempdir = None
+
+    def add(self, hashes):
+        """
+        Добавляет пачку хешей
+
+        Args:
+            hashes (array): Хеши паролей (array('Q'))
+        """
+        buckets = self._buckets
+        shift = self._shift
+        for value in hashes:
+            buckets[value >> shift].append(value)
+        self._buffered += len(hashes)
+        if self._buffered >= self._spill:
+            self._flush()
+
+    def _flush(self):
+        """Дописывает корзины во временные файлы"""
+        if self._tempdir is None:
+            import tempfile
+            self._tempdir = tempfile.TemporaryDirectory(prefix='password_audit_')
+        for index, bucket in enumerate(self._buckets):
+            if bucket:
+                with open(os.path.join(self._tempdir.name, str(index)), 'ab') as f:
+                    bucket.tofile(f)
+                del bucket[:]
+        self._buffered = 0
+
+    def count(self, stats):
+        """
+        Подсчитывает повторы и записывает их в статистику
+
+        Args:
+            stats (AuditStats): Статистика для заполнения
+        """
+        unique = duplicated = copies = max_repeats = 0
+        try:
+            for index, bucket in enumerate(self._buckets):
+                if self._tempdir is not None:
+                    path = os.path.join(self._tempdir.name, str(index))
+                    if os.path.exists(path):
+                        spilled = array('Q')
+                        with open(path, 'rb') as f:
+                            spilled.frombytes(f.read())
+                        bucket = spilled + bucket
+                if not bucket:
+                    continue
+                counts = {}
+                _count_elements(counts, bucket)
+                unique += len(counts)
+                if len(counts) < len(bucket):
+                    repeats = [n for n in counts.values() if n > 1]
+                    duplicated += len(repeats)
+                    copies += sum(repeats) - len(repeats)
+                    max_repeats = max(max_repeats, *repeats)
+        finally:
+            self.close()
+        stats.unique = unique
+        stats.duplicated = duplicated
+        stats.duplicate_copies = copies
+        stats.max_repeats = max_repeats or (1 if unique else 0)
+
+    def close(self):
+        """Удаляет временные файлы"""
+        self._buckets = [array('Q') for _ in self._buckets]
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+            self._tempdir = None
+
+
+def _iter_line_blocks(stream, block_size=AUDIT_BLOCK_SIZE):
+    """
+    Читает бинарный поток блоками, которые заканчиваются на границе строки
+
+    Args:
+        stream: Бинарный поток
+        block_size (int): Примерный размер блока в байтах
+
+    Yields:
+        bytes: Блок целых строк
+    """
+    tail = b''
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        cut = block.rfind(b'\n')
+        if cut < 0:
+            tail += block
+            continue
+        yield tail + block[:cut + 1]
+        tail = block[cut + 1:]
+    if tail:
+        yield tail
+
+
+def _audit_block(data, first_line, report_format=None, breach_index=None):
+    """
+    Проверяет блок строк (выполняется и в рабочих процессах)
+
+    Args:
+        data (bytes): Блок строк в UTF-8
+        first_line (int): Номер первой строки блока
+        report_format (str): "csv", "jsonl" или None (без построчного отчёта)
+        breach_index (BreachIndex): Индекс утёкших паролей
+
+    Returns:
+        tuple: (AuditStats, array('Q') хешей паролей, текст отчёта или None)
+    """
+    from hashlib import blake2b
+
+    stats = AuditStats()
+    digests = []
+    rows = [] if report_format else None
+    lines = data.split(b'\n')
+    if data.endswith(b'\n'):
+        lines.pop()
+    check = check_password_strength
+    for number, line in enumerate(lines, first_line):
+        if line.endswith(b'\r'):
+            line = line[:-1]
+        if not line:
+            stats.empty += 1
+            continue
+        digests.append(blake2b(line, digest_size=8).digest())
+        result = check(line.decode('utf-8', 'surrogateescape'), breach_index)
+        stats.add(result)
+        if report_format == 'csv':
+            rows.append(f"{number},{result.length},{result.score},{result.level},"
+                        f"{result.has_lower:d},{result.has_upper:d},{result.has_digit:d},"
+                        f"{result.has_special:d},{result.entropy_bits:.1f},"
+                        f"{result.shannon_bits:.1f},{result.breached:d}\n")
+        elif report_format == 'jsonl':
+            rows.append(f'{{"line": {number}, "length": {result.length}, '
+                        f'"score": {result.score}, "level": "{result.level}", '
+                        f'"lower": {str(result.has_lower).lower()}, '
+                        f'"upper": {str(result.has_upper).lower()}, '
+                        f'"digit": {str(result.has_digit).lower()}, '
+                        f'"special": {str(result.has_special).lower()}, '
+                        f'"entropy_bits": {result.entropy_bits:.1f}, '
+                        f'"shannon_bits": {result.shannon_bits:.1f}, '
+                        f'"breached": {str(result.breached).lower()}}}\n')
+
+    hashes = array('Q')
+    hashes.frombytes(b''.join(digests))
+    return stats, hashes, ''.join(rows) if rows is not None else None
+
+
+def audit_passwords(source, jobs=1, report=None, breach_index=None):
+    """
+    Проверяет силу паролей из файла или потока
+
+    Файл читается блоками по AUDIT_BLOCK_SIZE байт, блоки проверяются
+    в нескольких процессах (jobs > 1), в работе одновременно не больше
+    двух блоков на процесс. Повторы считаются по 64-битным хешам
+    с выгрузкой во временные файлы, так что память не зависит от размера
+    входа. Пустые строки пропускаются.
+
+    Args:
+        source (str): Путь к файлу (по одному паролю в строке) или "-" для stdin
+        jobs (int): Количество процессов
+        report (str): Файл построчного отчёта (.jsonl/.ndjson - JSON Lines, иначе CSV)
+        breach_index (BreachIndex): Индекс утёкших паролей
+
+    Returns:
+        AuditStats: Сводная статистика
+    """
+    if jobs < 1:
+        raise ValueError("Количество процессов должно быть не менее 1")
+
+    report_format = None
+    if report:
+        report_format = 'jsonl' if report.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+    stats = AuditStats()
+    duplicates = _DuplicateCounter()
+    stream = sys.stdin.buffer if source == '-' else open(source, 'rb')
+    report_file = None
+    try:
+        if report:
+            report_file = open(report, 'wb', buffering=OUTPUT_BUFFER_SIZE)
+            if report_format == 'csv':
+                report_file.write(_AUDIT_CSV_HEADER.encode('utf-8'))
+
+        def blocks():
+            # Блоки с номером первой строки
+            line = 1
+            for data in _iter_line_blocks(stream):
+                yield data, line
+                line += data.count(b'\n')
+
+        def consume(result):
+            block_stats, hashes, rows = result
+            stats.merge(block_stats)
+            duplicates.add(hashes)
+            if rows:
+                report_file.write(rows.encode('utf-8'))
+
+        if jobs == 1:
+            for data, line in blocks():
+                consume(_audit_block(data, line, report_format, breach_index))
+        else:
+            from collections import deque
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                pending = deque()
+                for data, line in blocks():
+                    pending.append(pool.submit(_audit_block, data, line, report_format,
+                                               breach_index))
+                    if len(pending) >= jobs * 2:
+                        consume(pending.popleft().result())
+                while pending:
+                    consume(pending.popleft().result())
+
+        duplicates.count(stats)
+    finally:
+        duplicates.close()
+        if report_file is not None:
+            report_file.close()
+        if stream is not sys.stdin.buffer:
+            stream.close()
+    return stats
+
+
+def _load_zstd():
+    """
+    Импортирует модуль сжатия zstd
+
+    Returns:
+        tuple: ("stdlib", compression.zstd) в Python 3.14+,
+            ("zstandard", zstandard), если он установлен, или (None, None)
+    """
+    try:
+        from compression import zstd
+        return "stdlib", zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        return None, None
+    return "zstandard", zstandard
+
+
+def _open_compressor(method, fileobj):
+    """
+    Оборачивает бинарный поток потоковым сжатием
+
+    Закрытие сжимающего потока не закрывает fileobj.
+
+    Args:
+        method (str): Метод из COMPRESSION_METHODS
+        fileobj: Бинарный поток для сжатых данных
+
+    Returns:
+        Бинарный поток для записи несжатых данных
+    """
+    if method == "gzip":
+        import gzip
+        return gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=6)
+    if method == "lzma":
+        import lzma
+        return lzma.LZMAFile(fileobj, mode='wb')
+    if method == "zstd":
+        source, zstd = _load_zstd()
+        if source == "stdlib":
+            return zstd.ZstdFile(fileobj, mode='wb')
+        if source == "zstandard":
+            return zstd.ZstdCompressor().stream_writer(fileobj, closefd=False)
+        raise ValueError("Для сжатия zstd нужен Python 3.14+ или модуль zstandard "
+                         "(pip install zstandard)")
+    raise ValueError(f"Неизвестный метод сжатия: {method}")
+
+
+def _open_decompressor(method, fileobj):
+    """
+    Оборачивает бинарный поток потоковой распаковкой
+
+    Args:
+        method (str): Метод из COMPRESSION_METHODS
+        fileobj: Бинарный поток сжатых данных
+
+    Returns:
+        Бинарный поток для чтения распакованных данных
+    """
+    if method == "gzip":
+        import gzip
+        return gzip.GzipFile(fileobj=fileobj, mode='rb')
+    if method == "lzma":
+        import lzma
+        return lzma.LZMAFile(fileobj, mode='rb')
+    if method == "zstd":
+        source, zstd = _load_zstd()
+        if source == "stdlib":
+            return zstd.ZstdFile(fileobj, mode='rb')
+        if source == "zstandard":
+            return zstd.ZstdDecompressor().stream_reader(fileobj, closefd=False)
+        raise ValueError("Для распаковки zstd нужен Python 3.14+ или модуль zstandard "
+                         "(pip install zstandard)")
+    raise ValueError(f"Неизвестный метод сжатия: {method}")
+
+
+def _derive_keys(passphrase, salt, n, r, p):
+    """
+    Получает ключи шифрования и аутентификации из парольной фразы (scrypt)
+
+    Returns:
+        tuple: (ключ потока, ключ HMAC) по 32 байта
+    """
+    import hashlib
+
+    key = hashlib.scrypt(passphrase.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                         maxmem=scrypt_maxmem(n, r, p), dklen=64)
+    return key[:32], key[32:]
+
+
+def _keystream_xor(enc_key, nonce, index, data):
+    """Шифрует или расшифровывает кадр: XOR с потоком SHAKE256(ключ, nonce, номер)"""
+    import hashlib
+
+    size = len(data)
+    stream = hashlib.shake_256(enc_key + nonce + index.to_bytes(8, 'little')).digest(size)
+    return (int.from_bytes(data, 'little') ^ int.from_bytes(stream, 'little')).to_bytes(
+        size, 'little')
+
+
+class EncryptedWriter:
+    """
+    Потоковое шифрование файла парольной фразой
+
+    Ключ получается из парольной фразы через scrypt со случайной солью.
+    Данные делятся на кадры по ENCRYPT_FRAME_SIZE байт; каждый кадр
+    шифруется XOR с потоком SHAKE256(ключ, nonce, номер кадра)
+    и защищается HMAC-SHA256 (шифрование, затем MAC). Последний кадр
+    помечается, поэтому обрезанный файл не расшифруется молча.
+
+    Формат: ENCRYPT_MAGIC, метод сжатия (1 байт), log2(N), r, p scrypt,
+    соль (16 байт), nonce (16 байт), HMAC заголовка (32 байта) и кадры
+    "длина (uint32), признак последнего кадра (1 байт), данные, HMAC".
+    """
+
+    def __init__(self, stream, passphrase, compression=None):
+        """
+        Args:
+            stream: Бинарный поток для зашифрованных данных (не закрывается)
+            passphrase (str): Парольная фраза
+            compression (str): Метод сжатия данных (записывается в заголовок)
+        """
+        import hmac
+
+        if not passphrase:
+            raise ValueError("Парольная фраза не может быть пустой")
+        salt = os.urandom(16)
+        self._nonce = os.urandom(16)
+        self._enc_key, self._mac_key = _derive_keys(
+            passphrase, salt, ENCRYPT_SCRYPT_N, ENCRYPT_SCRYPT_R, ENCRYPT_SCRYPT_P)
+        self._hmac = hmac
+        self._stream = stream
+        self._buffer = bytearray()
+        self._index = 0
+        self.closed = False
+
+        codec = COMPRESSION_METHODS.index(compression) + 1 if compression else 0
+        header = (ENCRYPT_MAGIC
+                  + bytes((codec, ENCRYPT_SCRYPT_N.bit_length() - 1,
+                           ENCRYPT_SCRYPT_R, ENCRYPT_SCRYPT_P))
+                  + salt + self._nonce)
+        stream.write(header + self._mac(header))
+
+    def _mac(self, data):
+        return self._hmac.new(self._mac_key, data, 'sha256').digest()
+
+    def _write_frame(self, data, final):
+        """Шифрует и записывает один кадр"""
+        frame_header = struct.pack('<IB', len(data), final)
+        encrypted = _keystream_xor(self._enc_key, self._nonce, self._index, data)
+        tag = self._mac(self._nonce + self._index.to_bytes(8, 'little')
+                        + frame_header + encrypted)
+        self._stream.write(frame_header + encrypted + tag)
+        self._index += 1
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("Запись в закрытый поток")
+        self._buffer += data
+        size = ENCRYPT_FRAME_SIZE
+        if len(self._buffer) >= size:
+            whole = len(self._buffer) - len(self._buffer) % size
+            for start in range(0, whole, size):
+                self._write_frame(bytes(self._buffer[start:start + size]), False)
+            del self._buffer[:whole]
+        return len(data)
+
+    def flush(self):
+        self._stream.flush()
+
+    def close(self):
+        """Записывает последний кадр (сам поток не закрывается)"""
+        if not self.closed:
+            self._write_frame(bytes(self._buffer), True)
+            self._buffer = bytearray()
+            self._stream.flush()
+            self.closed = True
+
+
+def decrypt_stream(stream, passphrase, output):
+    """
+    Расшифровывает и распаковывает файл, созданный с --encrypt
+
+    Каждый кадр проверяется до расшифровки; при неверной парольной фразе,
+    изменённых или обрезанных данных выбрасывается ValueError. Заголовок
+    и длины кадров ещё не проверены HMAC, поэтому параметры scrypt больше,
+    чем у EncryptedWriter, и кадры длиннее ENCRYPT_FRAME_SIZE отклоняются
+    до вычисления ключа и чтения данных.
+
+    Args:
+        stream: Бинарный поток зашифрованного файла
+        passphrase (str): Парольная фраза
+        output: Бинарный поток для расшифрованных данных
+    """
+    import hmac
+    import io
+
+    header_size = len(ENCRYPT_MAGIC) + 4 + 32
+    header = stream.read(header_size + 32)
+    if len(header) != header_size + 32 or not header.startswith(ENCRYPT_MAGIC):
+        raise ValueError("Файл не зашифрован генератором паролей")
+    codec, log_n, r, p = header[len(ENCRYPT_MAGIC):len(ENCRYPT_MAGIC) + 4]
+    if (codec > len(COMPRESSION_METHODS)
+            or not 1 <= log_n <= ENCRYPT_SCRYPT_N.bit_length() - 1
+            or not 1 <= r <= ENCRYPT_SCRYPT_R or not 1 <= p <= ENCRYPT_SCRYPT_P):
+        raise ValueError("Некорректный заголовок зашифрованного файла")
+    salt = header[len(ENCRYPT_MAGIC) + 4:len(ENCRYPT_MAGIC) + 20]
+    nonce = header[len(ENCRYPT_MAGIC) + 20:header_size]
+    enc_key, mac_key = _derive_keys(passphrase, salt, 1 << log_n, r, p)
+
+    def mac(data):
+        return hmac.new(mac_key, data, 'sha256').digest()
+
+    if not hmac.compare_digest(mac(header[:header_size]), header[header_size:]):
+        raise ValueError("Неверная парольная фраза или файл повреждён")
+
+    def frames():
+        index = 0
+        while True:
+            frame_header = stream.read(5)
+            if len(frame_header) < 5:
+                raise ValueError("Зашифрованный файл обрезан")
+            size, final = struct.unpack('<IB', frame_header)
+            # Все кадры, кроме последнего, ровно ENCRYPT_FRAME_SIZE байт
+            if (final > 1 or size > ENCRYPT_FRAME_SIZE
+                    or (not final and size != ENCRYPT_FRAME_SIZE)):
+                raise ValueError(f"Файл повреждён (кадр {index})")
+            encrypted = stream.read(size)
+            tag = stream.read(32)
+            if len(encrypted) < size or len(tag) < 32:
+                raise ValueError("Зашифрованный файл обрезан")
+            expected = mac(nonce + index.to_bytes(8, 'little') + frame_header + encrypted)
+            if not hmac.compare_digest(expected, tag):
+                raise ValueError(f"Файл повреждён (кадр {index})")
+            yield _keystream_xor(enc_key, nonce, index, encrypted)
+            index += 1
+            if final:
+                if stream.read(1):
+                    raise ValueError("Лишние данные после последнего кадра")
+                return
+
+    if not codec:
+        for data in frames():
+            output.write(data)
+        return
+
+    class FrameReader(io.RawIOBase):
+        """Поток расшифрованных кадров для распаковки"""
+
+        def __init__(self):
+            self._frames = frames()
+            self._pending = b''
+
+        def readable(self):
+            return True
+
+        def readinto(self, buffer):
+            while not self._pending:
+                self._pending = next(self._frames, None)
+                if self._pending is None:
+                    self._pending = b''
+                    return 0
+            size = min(len(buffer), len(self._pending))
+            buffer[:size] = self._pending[:size]
+            self._pending = self._pending[size:]
+            return size
+
+    source = io.BufferedReader(FrameReader(), OUTPUT_BUFFER_SIZE)
+    with _open_decompressor(COMPRESSION_METHODS[codec - 1], source) as decompressed:
+        while True:
+            data = decompressed.read(OUTPUT_BUFFER_SIZE)
+            if not data:
+                break
+            output.write(data)
+
+
+class PasswordWriter:
+    """
+    Буферизованная запись паролей пачками
+
+    Каждая пачка форматируется одной операцией join и записывается
+    в бинарный поток одним вызовом write. Заголовок CSV пишется один
+    раз - перед первой пачкой и только в пустой файл.
+    """
+
+    def __init__(self, stream, numbered=True, start=1, format="text", metadata=None):
+        """
+        Args:
+            stream: Бинарный поток для записи
+            numbered (bool): Нумеровать строки ("1. пароль") в формате text
+            start (int): Номер первого пароля
+            format (str): Формат вывода из OUTPUT_FORMATS
+            metadata (dict): Для jsonl и csv: {"policy": ..., "entropy_bits": ...};
+                к этим полям добавляется уровень силы каждого пароля
+        """
+        if format not in OUTPUT_FORMATS:
+            raise ValueError(f"Неизвестный формат вывода: {format}")
+        if metadata is not None and format not in ("jsonl", "csv"):
+            raise ValueError("Метаданные доступны только для форматов jsonl и csv")
+        self._stream = stream
+        self.format = format
+        self.numbered = numbered and format == "text"
+        self.metadata = metadata
+        self.fresh = True
+        self._next_index = start
+        self._file = stream
+        self._layers = ()
+        self._path = None
+        self._temp_path = None
+        self._mode = None
+
+    @classmethod
+    def open(cls, filename, append=False, atomic=True, compress=None, passphrase=None,
+             **kwargs):
+        """
+        Открывает файл для записи с крупным буфером
+
+        По умолчанию запись идёт во временный файл рядом с целевым, который
+        переименовывается в filename только при close() - прерванная запись
+        не оставляет полуготовый файл. Временный файл доступен только
+        владельцу, а при переименовании получает права заменяемого файла
+        (для нового - обычные права по umask); символическая ссылка
+        сохраняется, заменяется файл, на который она указывает. В режиме
+        append пароли дописываются в конец существующего файла.
+
+        Сжатие и шифрование применяются к каждой пачке по мере записи,
+        поэтому открытый текст не попадает на диск целиком.
+
+        Args:
+            filename (str): Имя файла
+            append (bool): Дописывать в конец файла
+            atomic (bool): Писать через временный файл (не для append)
+            compress (str): Метод сжатия из COMPRESSION_METHODS
+            passphrase (str): Парольная фраза для шифрования (EncryptedWriter)
+            **kwargs: Параметры конструктора
+
+        Returns:
+            PasswordWriter: Объект записи
+        """
+        if append:
+            if compress or passphrase is not None:
+                raise ValueError("Дописывать можно только в несжатый и незашифрованный файл")
+            writer = cls(open(filename, 'ab', buffering=OUTPUT_BUFFER_SIZE), **kwargs)
+            writer.fresh = writer._stream.tell() == 0
+            if writer.format == "text" and not writer.fresh:
+                # Нумерация продолжается с последнего номера в файле
+                last = cls._last_number(filename)
+                if last is not None:
+                    writer.numbered = True
+                    writer._next_index = last + 1
+            return writer
+
+        path = filename
+        if atomic:
+            filename = os.path.realpath(filename)
+            try:
+                mode = os.stat(filename).st_mode & 0o7777
+            except FileNotFoundError:
+                umask = os.umask(0)
+                os.umask(umask)
+                mode = 0o666 & ~umask
+            path = os.path.join(os.path.dirname(filename),
+                                f".{os.path.basename(filename)}.{os.getpid()}.tmp")
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0),
+                         0o600)
+            file = open(fd, 'wb', buffering=OUTPUT_BUFFER_SIZE)
+        else:
+            file = open(path, 'wb', buffering=OUTPUT_BUFFER_SIZE)
+        try:
+            # Слои в порядке записи: сжатие, затем шифрование, затем файл
+            layers = []
+            stream = file
+            if passphrase is not None:
+                stream = EncryptedWriter(stream, passphrase, compress)
+                layers.append(stream)
+            if compress:
+                stream = _open_compressor(compress, stream)
+                layers.append(stream)
+            writer = cls(stream, **kwargs)
+        except BaseException:
+            file.close()
+            if atomic:
+                os.remove(path)
+            raise
+        writer._file = file
+        writer._layers = tuple(reversed(layers))
+        if atomic:
+            writer._path = filename
+            writer._temp_path = path
+            writer._mode = mode
+        return writer
+
+    @staticmethod
+    def _last_number(filename):
+        """
+        Номер последней строки "N. пароль" в конце текстового файла
+
+        Args:
+            filename (str): Имя файла
+
+        Returns:
+            int or None: Номер или None, если последняя строка без номера
+        """
+        with open(filename, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(size - OUTPUT_TAIL_SIZE, 0))
+            lines = f.read().splitlines()
+        # Последняя строка должна уместиться в прочитанный хвост целиком
+        if not lines or (len(lines) == 1 and size > OUTPUT_TAIL_SIZE):
+            return None
+        number, sep, _ = lines[-1].lstrip().partition(b'. ')
+        if sep and number.isdigit():
+            return int(number)
+        return None
+
+    def write_text(self, text):
+        """Записывает произвольный текст (заголовки, разделители)"""
+        self._stream.write(text.encode('utf-8'))
+
+    def write(self, data):
+        """Записывает готовые байты"""
+        self._stream.write(data)
+
+    def _write_header(self):
+        """Записывает строку заголовка CSV"""
+        columns = ["password"]
+        if self.metadata is not None:
+            columns.extend(("policy", "entropy_bits", "level"))
+        self._stream.write((','.join(columns) + '\n').encode('utf-8'))
+
+    def write_chunk(self, passwords):
+        """
+        Записывает пачку паролей
+
+        Args:
+            passwords (list): Пачка паролей
+        """
+        if self.fresh:
+            if self.format == "csv":
+                self._write_header()
+            self.fresh = False
+        if not passwords:
+            return
+
+        fmt = self.format
+        if fmt == "jsonl":
+            text = self._format_jsonl(passwords)
+        elif fmt == "csv":
+            text = self._format_csv(passwords)
+        elif fmt == "nul":
+            text = '\0'.join(passwords) + '\0'
+        elif self.numbered:
+            text = ''.join(f"{i:2d}. {pwd}\n"
+                           for i, pwd in enumerate(passwords, self._next_index))
+        else:
+            text = '\n'.join(passwords) + '\n'
+        self._next_index += len(passwords)
+        self._stream.write(text.encode('utf-8'))
+
+    def _levels(self, passwords):
+        """Уровни силы паролей для метаданных"""
+        return [result.level for result in check_strength_batch(passwords)]
+
+    def _format_jsonl(self, passwords):
+        """Форматирует пачку как JSON Lines"""
+        from json.encoder import encode_basestring
+
+        if self.metadata is None:
+            return ''.join(f'{{"password": {encode_basestring(pwd)}}}\n' for pwd in passwords)
+        fields = (f', "policy": {encode_basestring(str(self.metadata["policy"]))}'
+                  f', "entropy_bits": {self.metadata["entropy_bits"]:.1f}')
+        return ''.join(f'{{"password": {encode_basestring(pwd)}{fields}, "level": "{level}"}}\n'
+                       for pwd, level in zip(passwords, self._levels(passwords)))
+
+    def _format_csv(self, passwords):
+        """Форматирует пачку как CSV (кавычки - только где нужны)"""
+        import csv
+        import io
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        if self.metadata is None:
+            writer.writerows((pwd,) for pwd in passwords)
+        else:
+            policy = self.metadata["policy"]
+            entropy = f"{self.metadata['entropy_bits']:.1f}"
+            writer.writerows((pwd, policy, entropy, level)
+                             for pwd, level in zip(passwords, self._levels(passwords)))
+        return buffer.getvalue()
+
+    def flush(self):
+        self._stream.flush()
+
+    def close(self):
+        """Закрывает поток; при атомарной записи переименовывает файл"""
+        try:
+            # Дописываем хвосты сжатия и последний кадр шифрования
+            for layer in self._layers:
+                layer.close()
+            if self._temp_path is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+        if self._temp_path is not None:
+            os.chmod(self._temp_path, self._mode)
+            os.replace(self._temp_path, self._path)
+            self._temp_path = None
+
+    def discard(self):
+        """Закрывает поток без сохранения (временный файл удаляется)"""
+        self._file.close()
+        if self._temp_path is not None:
+            try:
+                os.remove(self._temp_path)
+            except OSError:
+                pass
+            self._temp_path = None
+
+
+def file_header(count, length):
+    """
+    Возвращает заголовок файла с паролями
+
+    Args:
+        count (int): Количество паролей
+        length (int): Длина паролей
+
+    Returns:
+        str: Текст заголовка
+    """
+    from datetime import datetime
+
+    header = (f"Генератор паролей\n"
+              f"Дата: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+              f"{'='*50}\n\n")
+    if count != 1:
+        header += f"Сгенерировано {count} {pluralize_password(count)} (длина: {length})\n\n"
+    return header
+
+
+def save_to_file(passwords, filename, length, count=None, raw=False, format=None,
+                 metadata=None, append=False, compress=None, passphrase=None, start=1):
+    """
+    Сохраняет пароли в файл
+
+    Args:
+        passwords (list): Список паролей для сохранения
+        filename (str): Имя файла для сохранения
+        length (int): Длина паролей
+        count (int): Количество паролей (по умолчанию: len(passwords))
+        raw (bool): Без заголовка и нумерации, по одному паролю в строке
+        format (str): Формат из OUTPUT_FORMATS (заменяет raw)
+        metadata (dict): Метаданные для форматов jsonl и csv
+        append (bool): Дописать в конец файла (заголовок - только в пустой файл)
+        compress (str): Метод сжатия из COMPRESSION_METHODS
+        passphrase (str): Парольная фраза для шифрования файла
+        start (int): Номер первого пароля в формате text
+    """
+    if count is None:
+        count = len(passwords)
+    if format is None:
+        format = "raw" if raw else "text"
+    try:
+        writer = PasswordWriter.open(filename, append=append, compress=compress,
+                                     passphrase=passphrase, numbered=count != 1, start=start,
+                                     format=format, metadata=metadata)
+        try:
+            if format == "text" and writer.fresh:
+                writer.write_text(file_header(count, length))
+            writer.write_chunk(passwords)
+        except BaseException:
+            writer.discard()
+            raise
+        writer.close()
+
+        print(f"Пароли сохранены в файл: {filename}")
+    except IOError as e:
+        print(f"Ошибка при сохранении в файл: {e}", file=sys.stderr)
+
+
+def stream_passwords(chunks, count, title, filename=None, raw=False, length=None,
+                     format=None, metadata=None, append=False, compress=None,
+                     passphrase=None, start=1):
+    """
+    Пишет пароли по мере генерации в stdout или в файл
+
+    Args:
+        chunks: Итератор пачек паролей
+        count (int): Общее количество паролей
+        title (str): Пояснение для заголовка, например "(длина: 16)"
+        filename (str): Имя файла (None - стандартный вывод)
+        raw (bool): Без заголовка и нумерации, по одному паролю в строке
+        length (int): Длина паролей для заголовка файла
+        format (str): Формат из OUTPUT_FORMATS (заменяет raw)
+        metadata (dict): Метаданные для форматов jsonl и csv
+        append (bool): Дописать в конец файла (заголовок - только в пустой файл)
+        compress (str): Метод сжатия файла из COMPRESSION_METHODS
+        passphrase (str): Парольная фраза для шифрования файла
+        start (int): Номер первого пароля в формате text
+    """
+    if format is None:
+        format = "raw" if raw else "text"
+    numbered = format == "text" and count != 1
+    writer = None
+    try:
+        if filename:
+            writer = PasswordWriter.open(filename, append=append, compress=compress,
+                                         passphrase=passphrase, numbered=numbered,
+                                         start=start, format=format, metadata=metadata)
+            if format == "text" and writer.fresh:
+                writer.write_text(file_header(count, length))
+        else:
+            sys.stdout.flush()
+            writer = PasswordWriter(sys.stdout.buffer, numbered=numbered, start=start,
+                                    format=format, metadata=metadata)
+            if numbered:
+                writer.write_text(result_banner(count, title))
+
+        try:
+            for chunk in chunks:
+                writer.write_chunk(chunk)
+            if numbered and not filename:
+                writer.write_text("\n")
+        except BaseException:
+            if filename:
+                writer.discard()
+            raise
+        if filename:
+            writer.close()
+        else:
+            writer.flush()
+    except BrokenPipeError:
+        # Читатель закрыл канал (например, head) - это обрабатывает main()
+        raise
+    except IOError as e:
+        if filename:
+            print(f"Ошибка при сохранении в файл: {e}", file=sys.stderr)
+        else:
+            print(f"Ошибка вывода: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if filename:
+        print(f"Пароли сохранены в файл: {filename}")
+
+
+def result_banner(count, title):
+    """
+    Возвращает рамку с заголовком перед списком паролей
+
+    Args:
+        count (int): Количество паролей
+        title (str): Пояснение, например "(длина: 16)"
+
+    Returns:
+        str: Текст рамки с пустыми строками вокруг
+    """
+    return (f"\n{'='*50}\n"
+            f"  Сгенерировано {count} {pluralize_password(count)} {title}\n"
+            f"{'='*50}\n\n")
+
+
+def print_passwords(passwords, start=1, numbered=True, level_format=None, header="",
+                    footer=""):
+    """
+    Выводит пароли в stdout крупными блоками
+
+    Каждая пачка из STREAM_CHUNK_SIZE паролей форматируется одним join
+    и пишется в sys.stdout.buffer одним вызовом вместо print() на строку.
+
+    Args:
+        passwords (list): Пароли
+        start (int): Номер первого пароля
+        numbered (bool): Нумеровать строки ("1. пароль")
+        level_format (str): Шаблон уровня силы после пароля, например "  [{}]";
+            None - без оценки силы
+        header (str): Текст перед паролями
+        footer (str): Текст после паролей
+    """
+    # Всё, что уже выведено через print(), должно оказаться раньше паролей
+    sys.stdout.flush()
+    stream = sys.stdout.buffer
+    if header:
+        stream.write(header.encode('utf-8'))
+    for offset in range(0, len(passwords), STREAM_CHUNK_SIZE):
+        chunk = passwords[offset:offset + STREAM_CHUNK_SIZE]
+        if level_format is not None:
+            chunk = [pwd + level_format.format(result.level)
+                     for pwd, result in zip(chunk, check_strength_batch(chunk))]
+        if numbered:
+            text = ''.join(f"{i:2d}. {pwd}\n" for i, pwd in enumerate(chunk, start + offset))
+        else:
+            text = '\n'.join(chunk) + '\n'
+        stream.write(text.encode('utf-8'))
+    if footer:
+        stream.write(footer.encode('utf-8'))
+    stream.flush()
+
+
+def export_hashes(chunks, method, cost, filename=None, format="csv", jobs=None,
+                  compress=None, passphrase=None):
+    """
+    Хеширует пароли и пишет строки "пароль, соль, хеш, параметры"
+
+    Строки пишутся по мере готовности в stdout или в файл (с теми же
+    атомарной записью, сжатием и шифрованием, что и у паролей). После
+    выгрузки в stderr выводится достигнутая скорость хеширования.
+
+    Args:
+        chunks: Итератор пачек паролей
+        method (str): Метод из HASH_METHODS
+        cost (dict): Параметры стоимости (см. parse_hash_cost())
+        filename (str): Имя файла (None - стандартный вывод)
+        format (str): "csv" или "jsonl"
+        jobs (int): Количество процессов (по умолчанию: число ядер)
+        compress (str): Метод сжатия файла из COMPRESSION_METHODS
+        passphrase (str): Парольная фраза для шифрования файла
+    """
+    import time
+
+    if format not in ("csv", "jsonl"):
+        raise ValueError("Хеши выгружаются только в форматах csv и jsonl")
+    params = hash_params(method, cost)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    if format == "csv":
+        import csv
+        import io
+
+        def format_rows(rows):
+            buffer = io.StringIO()
+            csv.writer(buffer, lineterminator='\n').writerows(
+                (password, salt, digest, params) for password, salt, digest in rows)
+            return buffer.getvalue()
+    else:
+        from json.encoder import encode_basestring
+
+        def format_rows(rows):
+            return ''.join(f'{{"password": {encode_basestring(password)}, "salt": "{salt}", '
+                           f'"digest": "{digest}", "params": "{params}"}}\n'
+                           for password, salt, digest in rows)
+
+    started = time.perf_counter()
+    hashed = 0
+    writer = None
+    try:
+        if filename:
+            writer = PasswordWriter.open(filename, compress=compress, passphrase=passphrase,
+                                         format="raw")
+        else:
+            sys.stdout.flush()
+            writer = PasswordWriter(sys.stdout.buffer, format="raw")
+        try:
+            if format == "csv":
+                writer.write_text("password,salt,digest,params\n")
+            for rows in iter_hashed(chunks, method, jobs, **cost):
+                writer.write_text(format_rows(rows))
+                hashed += len(rows)
+        except BaseException:
+            if filename:
+                writer.discard()
+            raise
+        if filename:
+            writer.close()
+        else:
+            writer.flush()
+    except BrokenPipeError:
+        # Читатель закрыл канал (например, head) - это обрабатывает main()
+        raise
+    except IOError as e:
+        if filename:
+            print(f"Ошибка при сохранении в файл: {e}", file=sys.stderr)
+        else:
+            print(f"Ошибка вывода: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - started
+    if filename:
+        print(f"Хеши сохранены в файл: {filename}")
+    rate = hashed / elapsed if elapsed > 0 else 0.0
+    print(f"Хешировано {hashed} {pluralize_password(hashed)} за {elapsed:.2f} с: "
+          f"{rate:,.1f} хешей/с ({params}, процессов: {jobs})", file=sys.stderr)
+
+
+class PasswordServer:
+    """
+    Сервер генерации паролей для амортизации времени запуска
+
+    Держит "прогретый" генератор (заполненный буфер энтропии, скомпилированную
+    политику по умолчанию, загруженный словарь) и отвечает на запросы в
+    формате JSON, по одному объекту в строке:
+
+        {"mode": "chars", "count": 3, "length": 16, "use_special": false}
+        {"mode": "diceware", "count": 2, "words": 6, "capitalize": true}
+
+    Ответ: {"passwords": [...]} или {"error": "..."}; поле "id" запроса
+    копируется в ответ. Небольшие запросы выполняются прямо в цикле asyncio,
+    крупные - в отдельном процессе, чтобы не задерживать остальных клиентов.
+    """
+
+    _CHARS_OPTIONS = {'length': int, 'use_uppercase': bool, 'use_digits': bool,
+                      'use_special': bool, 'exclude_ambiguous': bool, 'custom_chars': str}
+    _DICEWARE_OPTIONS = {'words': int, 'separator': str, 'capitalize': bool,
+                         'add_number': bool}
+
+    def __init__(self, wordlist=None, backend="python", breach_index=None):
+        """
+        Args:
+            wordlist (Wordlist): Словарь для diceware (по умолчанию: встроенный)
+            backend (str): Бэкенд генерации символьных паролей
+            breach_index (BreachIndex): Индекс утёкших паролей для всех запросов
+        """
+        self.wordlist = wordlist or Wordlist.builtin()
+        self.backend = backend
+        self.breach_index = breach_index
+        self.generator = PasswordGenerator(backend=backend, block_size=SERVER_ENTROPY_BLOCK)
+        self._executor = None
+
+    def warm_up(self):
+        """Заполняет буфер энтропии и компилирует политику по умолчанию"""
+        self.generator._entropy.prefill()
+        CharsetPolicy.compile()
+        len(self.wordlist)
+
+    def handle_request(self, request):
+        """
+        Выполняет один запрос в текущем потоке
+
+        Args:
+            request (dict): Запрос
+
+        Returns:
+            dict: Ответ
+        """
+        try:
+            count, diceware, options = self._parse_request(request)
+            passwords = _generate_chunk(self.generator, diceware, count, options)
+        except (ValueError, TypeError) as e:
+            return self._response(request, error=str(e))
+        return self._response(request, passwords, diceware)
+
+    def _parse_request(self, request):
+        """Проверяет запрос и возвращает (count, diceware, параметры генерации)"""
+        if not isinstance(request, dict):
+            raise ValueError("Запрос должен быть JSON объектом")
+        mode = request.get('mode', 'chars')
+        if mode not in ('chars', 'diceware'):
+            raise ValueError(f"Неизвестный режим: {mode}")
+        count = request.get('count', 1)
+        if type(count) is not int or not 1 <= count <= SERVER_MAX_COUNT:
+            raise ValueError(f"count должен быть от 1 до {SERVER_MAX_COUNT}")
+        length = request.get('length')
+        if type(length) is int and length > SERVER_MAX_LENGTH:
+            raise ValueError(f"length должен быть не более {SERVER_MAX_LENGTH}")
+
+        diceware = mode == 'diceware'
+        allowed = self._DICEWARE_OPTIONS if diceware else self._CHARS_OPTIONS
+        options = {}
+        for key, value in request.items():
+            if key in ('id', 'mode', 'count'):
+                continue
+            expected = allowed.get(key)
+            if expected is None:
+                raise ValueError(f"Неизвестный параметр: {key}")
+            if value is not None and type(value) is not expected:
+                raise ValueError(f"Параметр {key} должен иметь тип {expected.__name__}")
+            options[key] = value
+        if count * self._password_chars(diceware, options) > SERVER_MAX_CHARS:
+            raise ValueError(f"Слишком большой запрос: ответ превысит "
+                             f"{SERVER_MAX_CHARS} символов, уменьшите count")
+        if diceware:
+            options['wordlist'] = self.wordlist
+        if self.breach_index is not None:
+            options['breach_index'] = self.breach_index
+        return count, diceware, options
+
+    @staticmethod
+    def _password_chars(diceware, options):
+        """Оценка длины одного пароля запроса в символах"""
+        if not diceware:
+            return options.get('length') or 12
+        separator = options.get('separator')
+        separator = "-" if separator is None else separator
+        return (options.get('words') or 5) * (SERVER_WORD_CHARS + len(separator))
+
+    def _response(self, request, passwords=None, diceware=False, error=None):
+        """Формирует ответ на запрос"""
+        response = {}
+        if isinstance(request, dict) and 'id' in request:
+            response['id'] = request['id']
+        if error is not None:
+            response['error'] = error
+            return response
+        if diceware:
+            response['wordlist_size'] = len(self.wordlist)
+        response['passwords'] = passwords
+        return response
+
+    async def _dispatch(self, line):
+        """Разбирает строку запроса и возвращает строку ответа"""
+        import asyncio
+        import json
+
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return self._encode({'error': f"Некорректный JSON: {e}"})
+        try:
+            count, diceware, options = self._parse_request(request)
+            size = self._password_chars(diceware, options)
+            if self._executor is not None and count * size > SERVER_INLINE_CHARS:
+                # Крупный запрос - в отдельном процессе, чтобы не держать GIL
+                loop = asyncio.get_running_loop()
+                passwords = await loop.run_in_executor(
+                    self._executor, _parallel_worker, diceware, count, options)
+            else:
+                passwords = _generate_chunk(self.generator, diceware, count, options)
+        except (ValueError, TypeError) as e:
+            return self._encode(self._response(request, error=str(e)))
+        return self._encode(self._response(request, passwords, diceware))
+
+    @staticmethod
+    def _encode(response):
+        """Кодирует ответ в строку JSON"""
+        import json
+
+        return json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n"
+
+    async def _handle_connection(self, reader, writer):
+        """Обслуживает одно подключение: запросы выполняются по очереди"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                writer.write(await self._dispatch(line))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def serve_unix(self, path):
+        """
+        Принимает подключения через Unix domain socket до Ctrl+C или SIGTERM
+
+        Args:
+            path (str): Путь к сокету
+        """
+        import asyncio
+        import signal
+        import stat
+        from concurrent.futures import ProcessPoolExecutor
+
+        if not hasattr(asyncio, 'start_unix_server'):
+            raise ValueError("Unix domain socket не поддерживается в этой системе, "
+                             "используйте --serve -")
+        try:
+            mode = os.lstat(path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            # Удаляем только сокет, оставшийся от прошлого запуска
+            if not stat.S_ISSOCK(mode):
+                raise ValueError(f"{path} уже существует и не является сокетом")
+            os.remove(path)
+        created = []
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            stop = loop.create_future()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(signum, lambda: stop.done() or stop.set_result(None))
+            server = await asyncio.start_unix_server(self._handle_connection, path=path)
+            info = os.lstat(path)
+            created.append((info.st_dev, info.st_ino))
+            async with server:
+                await stop
+
+        self.warm_up()
+        self._executor = ProcessPoolExecutor(max_workers=1, initializer=_init_parallel_worker,
+                                             initargs=(self.backend,))
+        print(f"Сервер запущен: {path}", file=sys.stderr)
+        try:
+            asyncio.run(run())
+        finally:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            # Путь могли занять другим файлом, пока сервер работал
+            try:
+                info = os.lstat(path)
+            except FileNotFoundError:
+                info = None
+            if (info is not None and stat.S_ISSOCK(info.st_mode)
+                    and (info.st_dev, info.st_ino) in created):
+                os.remove(path)
+
+    def serve_stdio(self, stdin=None, stdout=None):
+        """
+        Отвечает на запросы построчно из stdin в stdout
+
+        Args:
+            stdin: Бинарный поток запросов (по умолчанию: sys.stdin.buffer)
+            stdout: Бинарный поток ответов (по умолчанию: sys.stdout.buffer)
+        """
+        import json
+
+        stdin = stdin or sys.stdin.buffer
+        stdout = stdout or sys.stdout.buffer
+        self.warm_up()
+        for line in stdin:
+            if not line.strip():
+                continue
+            try:
+                response = self.handle_request(json.loads(line))
+            except ValueError as e:
+                response = {'error': f"Некорректный JSON: {e}"}
+            stdout.write(self._encode(response))
+            stdout.flush()
+
+
+def request_passwords(socket_path, request, timeout=30):
+    """
+    Отправляет запрос серверу (--serve) и возвращает ответ
+
+    Args:
+        socket_path (str): Путь к Unix domain socket сервера
+        request (dict): Запрос (см. PasswordServer)
+        timeout (float): Таймаут в секундах
+
+    Returns:
+        dict: Ответ сервера с полем "passwords"
+    """
+    import json
+    import socket
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(request).encode('utf-8') + b"\n")
+            with sock.makefile('rb') as f:
+                line = f.readline()
+    except OSError as e:
+        raise ValueError(f"Не удалось подключиться к серверу {socket_path}: {e}")
+
+    if not line:
+        raise ValueError("Сервер закрыл соединение без ответа")
+    response = json.loads(line)
+    if 'error' in response:
+        raise ValueError(response['error'])
+    return response
+
+
+def read_passphrase(confirm=True):
+    """
+    Получает парольную фразу для шифрования
+
+    Берётся из переменной окружения PASSPHRASE_ENV, иначе запрашивается
+    с клавиатуры без отображения.
+
+    Args:
+        confirm (bool): Запросить фразу повторно для проверки
+
+    Returns:
+        str: Парольная фраза
+    """
+    passphrase = os.environ.get(PASSPHRASE_ENV)
+    if passphrase:
+        return passphrase
+
+    import getpass
+
+    passphrase = getpass.getpass("Парольная фраза: ")
+    if not passphrase:
+        raise ValueError("Парольная фраза не может быть пустой")
+    if confirm and getpass.getpass("Повторите парольную фразу: ") != passphrase:
+        raise ValueError("Парольные фразы не совпадают")
+    return passphrase
+
+
+def ask_yes_no(prompt, default=True):
+    """
+    Спрашивает у пользователя да/нет
+
+    Args:
+        prompt (str): Вопрос для пользователя
+        default (bool): Значение по умолчанию
+
+    Returns:
+        bool: True или False
+    """
+    default_hint = "[Д/н]" if default else "[д/Н]"
+    while True:
+        answer = input(f"{prompt} {default_hint}: ").strip().lower()
+        if answer == "":
+            return default
+        if answer in ("д", "да", "y", "yes"):
+            return True
+        if answer in ("н", "нет", "n", "no"):
+            return False
+        print("Пожалуйста, введите 'д' (да) или 'н' (нет)")
+
+
+def ask_int(prompt, default, min_val=1, max_val=1000):
+    """
+    Спрашивает у пользователя число
+
+    Args:
+        prompt (str): Вопрос для пользователя
+        default (int): Значение по умолчанию
+        min_val (int): Минимальное значение
+        max_val (int): Максимальное значение
+
+    Returns:
+        int: Введённое число
+    """
+    while True:
+        answer = input(f"{prompt} [{default}]: ").strip()
+        if answer == "":
+            return default
+        try:
+            value = int(answer)
+            if min_val <= value <= max_val:
+                return value
+            print(f"Введите число от {min_val} до {max_val}")
+        except ValueError:
+            print("Пожалуйста, введите число")
+
+
+def interactive_mode():
+    """Интерактивный режим генерации паролей"""
+    print("\n" + "="*50)
+    print("  Генератор паролей - Интерактивный режим")
+    print("="*50 + "\n")
+
+    generator = PasswordGenerator()
+
+    # Спрашиваем параметры
+    length = ask_int("Длина пароля", default=12, min_val=4, max_val=128)
+    count = ask_int("Количество паролей", default=1, min_val=1, max_val=100)
+
+    print()
+    use_uppercase = ask_yes_no("Использовать заглавные буквы?", default=True)
+    use_digits = ask_yes_no("Использовать цифры?", default=True)
+    use_special = ask_yes_no("Использовать спецсимволы (!@#$...)?", default=True)
+    exclude_ambiguous = ask_yes_no("Исключить похожие символы (0, O, l, 1, I)?", default=False)
+
+    print()
+    show_strength = ask_yes_no("Показать оценку силы пароля?", default=False)
+    save_file = ask_yes_no("Сохранить в файл?", default=False)
+
+    filename = None
+    if save_file:
+        filename = input("Имя файла [passwords.txt]: ").strip()
+        if not filename:
+            filename = "passwords.txt"
+
+    # Генерируем пароли
+    print("\n" + "-"*50)
+    print("Генерация...")
+    print("-"*50 + "\n")
+
+    try:
+        policy = CharsetPolicy.compile(
+            use_uppercase=use_uppercase,
+            use_digits=use_digits,
+            use_special=use_special,
+            exclude_ambiguous=exclude_ambiguous
+        )
+        passwords = generator.generate_multiple(count=count, length=length, policy=policy)
+
+        # Выводим результат
+        if count == 1:
+            print(f"Пароль: {passwords[0]}")
+            if show_strength:
+                result = check_password_strength(passwords[0])
+                print(f"\nСила пароля: {result.level}")
+                print(f"Детали: {result.details}")
+                print(f"Энтропия: {result.entropy_bits:.1f} бит по алфавиту, "
+                      f"{result.shannon_bits:.1f} бит по Шеннону")
+        else:
+            print_passwords(passwords, level_format="  [{}]" if show_strength else None,
+                            header=f"Сгенерировано {count} {pluralize_password(count)}:\n\n")
+
+        # Сохраняем в файл
+        if filename:
+            print()
+            save_to_file(passwords, filename, length, count)
+
+        print()
+
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+# Этапы --profile: (класс или None для функции модуля, атрибут, этап, счётчик паролей).
+# Счётчик: 'result' - длина результата, число - длина аргумента с этим номером
+# (у методов 0 - это self), 'one' - один пароль на вызов, None - не считать
+PROFILE_HOOKS = (
+    ('EntropyBuffer', 'read', 'энтропия', None),
+    ('SeededStream', 'read', 'энтропия', None),
+    ('ConstraintPolicy', '_compile', 'компиляция политики', None),
+    ('PasswordGenerator', '_sample_batch', 'генерация', 'result'),
+    ('PasswordGenerator', '_diceware', 'генерация', 'one'),
+    ('FingerprintSet', 'add', 'уникальность', None),
+    ('BreachIndex', '__contains__', 'индекс утечек', None),
+    (None, 'check_password_strength', 'оценка силы', 'one'),
+    (None, 'hash_password', 'хеширование', 'one'),
+    ('PasswordWriter', 'write_chunk', 'запись', 1),
+    ('PasswordWriter', 'close', 'запись', None),
+    ('EncryptedWriter', 'write', 'шифрование', None),
+    (None, 'print_passwords', 'вывод', 0),
+    (None, 'print', 'вывод print', None),
+)
+
+
+def _peak_rss():
+    """
+    Пиковый объём памяти процесса (RSS)
+
+    Returns:
+        int or None: Байт или None, если модуль resource недоступен
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает килобайты, macOS - байты
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class StageProfiler:
+    """
+    Счётчики времени по этапам генерации (--profile)
+
+    Выключенный профилировщик ничего не стоит: код модуля не меняется.
+    enable() подменяет функции из PROFILE_HOOKS обёртками с замером времени,
+    disable() возвращает исходные. Время этапа собственное: вложенные этапы
+    (например, энтропия внутри генерации) из него вычитаются. Замеряется
+    только текущий процесс; пачки из процессов --jobs в отчёт не попадают.
+    """
+
+    def __init__(self, hooks=PROFILE_HOOKS, dump=None):
+        """
+        Args:
+            hooks (tuple): Замеряемые функции в формате PROFILE_HOOKS
+            dump (str): Файл для статистики cProfile или "-" для сводки pstats в stderr
+        """
+        self.hooks = hooks
+        self.dump = dump
+        # этап -> [собственное время, вызовов, паролей]
+        self.stats = {}
+        self.elapsed = 0.0
+        self._stack = []
+        self._patched = []
+        self._started = None
+        self._cprofile = None
+
+    def _wrap(self, func, stage, counter):
+        """Обёртка с замером собственного времени функции"""
+        from time import perf_counter
+        stats = self.stats.setdefault(stage, [0.0, 0, 0])
+        stack = self._stack
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack.append(0.0)
+            started = perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                spent = perf_counter() - started
+                stats[0] += spent - stack.pop()
+                stats[1] += 1
+                if stack:
+                    stack[-1] += spent
+            if counter == 'result':
+                stats[2] += len(result)
+            elif counter == 'one':
+                stats[2] += 1
+            elif counter is not None:
+                stats[2] += len(args[counter])
+            return result
+
+        return wrapper
+
+    def enable(self):
+        """Подменяет функции обёртками и запускает отсчёт времени"""
+        import builtins
+        from time import perf_counter
+        module = globals()
+        for owner_name, name, stage, counter in self.hooks:
+            if owner_name is None:
+                original = module.get(name)
+                func = original if original is not None else getattr(builtins, name)
+                self._patched.append((module, name, original))
+                module[name] = self._wrap(func, stage, counter)
+            else:
+                owner = module[owner_name]
+                original = owner.__dict__[name]
+                self._patched.append((owner, name, original))
+                setattr(owner, name, self._wrap(original, stage, counter))
+        if self.dump:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._started = perf_counter()
+
+    def disable(self):
+        """Возвращает исходные функции и сохраняет статистику cProfile"""
+        from time import perf_counter
+        if self._started is None:
+            return
+        self.elapsed += perf_counter() - self._started
+        self._started = None
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        for owner, name, original in reversed(self._patched):
+            if isinstance(owner, dict):
+                if original is None:
+                    del owner[name]
+                else:
+                    owner[name] = original
+            else:
+                setattr(owner, name, original)
+        self._patched.clear()
+        if self._cprofile is not None:
+            import pstats
+            if self.dump == '-':
+                pstats.Stats(self._cprofile, stream=sys.stderr) \
+                    .sort_stats('cumulative').print_stats(25)
+            else:
+                self._cprofile.dump_stats(self.dump)
+            self._cprofile = None
+
+    def report(self):
+        """
+        Отчёт по этапам: время, доля, вызовы, паролей/с и пиковая память
+
+        Returns:
+            str: Таблица для вывода в stderr
+        """
+        elapsed = self.elapsed or 1e-9
+        passwords = self.stats.get('генерация', [0.0, 0, 0])[2]
+        lines = [f"Профиль: {passwords:,} {pluralize_password(passwords)} "
+                 f"за {self.elapsed:.3f} с",
+                 f"  {'Этап':<22} {'Время, с':>10} {'Доля':>7} {'Вызовов':>10} {'Паролей/с':>14}"]
+        measured = 0.0
+        for stage, (spent, calls, items) in sorted(self.stats.items(),
+                                                   key=lambda item: -item[1][0]):
+            if not calls:
+                continue
+            measured += spent
+            rate = f"{items / spent:,.0f}" if items and spent > 0 else "-"
+            lines.append(f"  {stage:<22} {spent:>10.3f} {spent / elapsed:>7.1%} "
+                         f"{calls:>10,} {rate:>14}")
+        rest = max(self.elapsed - measured, 0.0)
+        lines.append(f"  {'прочее':<22} {rest:>10.3f} {rest / elapsed:>7.1%}")
+        peak = _peak_rss()
+        if peak is not None:
+            lines.append(f"Пиковая память (RSS): {peak / 2**20:.1f} МБ")
+        if self.dump and self.dump != '-':
+            lines.append(f"Статистика cProfile сохранена в файл: {self.dump}")
+        return '\n'.join(lines)
+
+
+def build_parser():
+    """
+    Создаёт полный парсер аргументов командной строки
+
+    Returns:
+        CustomArgumentParser: Парсер
+    """
+    CustomFormatter, CustomArgumentParser = _argparse_classes()
+    parser = CustomArgumentParser(
+        description='Генератор случайных паролей с настройкой сложности',
+        formatter_class=CustomFormatter,
+        usage='%(prog)s [опции]',
+        add_help=False,
+        epilog="""
+Примеры:
+  %(prog)s -l 16                     # Генерация пароля длиной 16 символов
+  %(prog)s -l 20 --no-special        # Пароль без спецсимволов
+  %(prog)s -l 12 -c 5                # Генерация 5 паролей
+  %(prog)s -l 16 --exclude-ambiguous # Пароль без похожих символов
+  %(prog)s -s -l 10                  # Простой пароль
+  %(prog)s --complex                 # Максимально сложный пароль
+  %(prog)s -l 16 -c 3 -o passwords.txt # Сохранить 3 пароля в файл
+  %(prog)s -l 10 --custom-chars "abc123!@#" # Пароль из заданных символов
+  %(prog)s --policy corp.json -c 10  # Пароли по корпоративной политике
+  %(prog)s --pattern "Cvccvc-9999-Cvccvc" -c 5 # Запоминающиеся пароли по шаблону
+  %(prog)s -l 16 --exclude-ambiguous --entropy # Точная энтропия настроек
+  %(prog)s -i                        # Интерактивный режим
+  %(prog)s -d                        # Diceware пароль (5 слов)
+  %(prog)s -d --words 6 --capitalize # Diceware с 6 словами и заглавными буквами
+  %(prog)s -d --add-number -c 3      # 3 diceware пароля с числом в конце
+  %(prog)s -c 1000000 --stream --raw -o big.txt # Миллион паролей без расхода памяти
+  %(prog)s -c 1000000 --stream --raw --jobs 4 # Генерация в 4 процессах
+  %(prog)s -d --words 3 -c 100000 --unique # Без повторяющихся паролей
+  %(prog)s -c 1000000 --stream --raw --deterministic --seed load1 # Тестовые данные
+  %(prog)s --raw --deterministic --seed load1 --range 500000:500010 # Часть тех же данных
+  %(prog)s -c 1000000 --raw --profile > /dev/null # Время по этапам генерации
+  %(prog)s -c 1000 --format jsonl --metadata -o out.jsonl # JSON Lines с метаданными
+  %(prog)s -c 10000000 --stream --raw --compress gzip --encrypt -o out.enc # Сжатие и шифрование
+  %(prog)s --decrypt out.enc -o out.txt # Расшифровать файл
+  %(prog)s -c 100 --hash scrypt -o users.csv # Пароли с хешами scrypt
+  %(prog)s --serve /tmp/pwgen.sock   # Сервер генерации паролей
+  %(prog)s --client /tmp/pwgen.sock -l 16 # Пароль от запущенного сервера
+  %(prog)s --audit dump.txt --jobs 4 # Проверить силу паролей из файла
+  %(prog)s --build-index pwned.txt --breach-index pwned.idx # Индекс утечек
+  %(prog)s -l 16 --breach-index pwned.idx # Пароль не из списка утечек
+        """
+    )
+
+    parser.add_argument('-h', '--help', action='help',
+                        help='Показать справку')
+
+    parser.add_argument('-i', '--interactive', action='store_true',
+                        help='Интерактивный режим')
+
+    parser.add_argument('-l', '--length', type=int,
+                        help='Длина пароля (по умолчанию: 12)')
+
+    parser.add_argument('-c', '--count', type=int,
+                        help='Количество генерируемых паролей (по умолчанию: 1)')
+
+    parser.add_argument('--no-uppercase', action='store_true',
+                        help='Не использовать заглавные буквы')
+
+    parser.add_argument('--no-digits', action='store_true',
+                        help='Не использовать цифры')
+
+    parser.add_argument('--no-special', action='store_true',
+                        help='Не использовать специальные символы')
+
+    parser.add_argument('--exclude-ambiguous', action='store_true',
+                        help='Исключить похожие символы (0, O, l, 1, I)')
+
+    parser.add_argument('-s', '--simple', action='store_true',
+                        help='Простой режим (только буквы и цифры)')
+
+    parser.add_argument('--complex', action='store_true',
+                        help='Сложный режим (все типы символов, длина 20)')
+
+    parser.add_argument('-o', '--output', type=str, metavar='FILE',
+                        help='Сохранить пароли в файл')
+
+    parser.add_argument('--show-strength', action='store_true',
+                        help='Показать оценку силы пароля')
+
+    parser.add_argument('--entropy', action='store_true',
+                        help='Показать точное число возможных паролей и энтропию '
+                             'для заданных опций (без генерации)')
+
+    parser.add_argument('--custom-chars', type=str, metavar='CHARS',
+                        help='Кастомный набор символов для пароля (например: "abc123!@#")')
+
+    parser.add_argument('--pattern', type=str, metavar='TEMPLATE',
+                        help='Пароль по шаблону: c/v - согласная/гласная, C/V - заглавные, '
+                             'a/A - буква, 9 - цифра, ! - спецсимвол, * - любой, '
+                             'остальное как есть (например: "Cvccvc-9999-Cvccvc")')
+
+    parser.add_argument('--policy', type=str, metavar='FILE',
+                        help='Файл политики (JSON или TOML): минимумы по типам символов, '
+                             'повторы, последовательности и запрещённые подстроки')
+
+    parser.add_argument('--stream', action='store_true',
+                        help='Потоковый вывод пачками (память не зависит от -c)')
+
+    parser.add_argument('--raw', action='store_true',
+                        help='Без заголовка и нумерации, по одному паролю в строке')
+
+    parser.add_argument('--format', choices=OUTPUT_FORMATS,
+                        help='Формат вывода: text, raw, jsonl, csv или nul (по умолчанию: text, '
+                             'без терминала - без рамки и нумерации)')
+
+    parser.add_argument('--metadata', action='store_true',
+                        help='Для jsonl и csv: добавить политику, энтропию и уровень силы')
+
+    parser.add_argument('--append', action='store_true',
+                        help='Дописать пароли в конец файла -o (заголовок - только в пустой файл)')
+
+    parser.add_argument('--compress', choices=COMPRESSION_METHODS,
+                        help='Сжимать файл -o по мере записи: gzip, lzma или zstd')
+
+    parser.add_argument('--encrypt', action='store_true',
+                        help='Шифровать файл -o парольной фразой (из переменной '
+                             f'{PASSPHRASE_ENV} или с клавиатуры)')
+
+    parser.add_argument('--decrypt', type=str, metavar='FILE',
+                        help='Расшифровать файл, созданный с --encrypt, в -o или stdout')
+
+    parser.add_argument('--hash', choices=HASH_METHODS,
+                        help='Выгрузить строки "пароль, соль, хеш" (pbkdf2 или scrypt)')
+
+    parser.add_argument('--hash-cost', type=str, metavar='PARAMS',
+                        help='Стоимость хеширования: "iterations=600000" для pbkdf2, '
+                             '"n=16384,r=8,p=1" для scrypt')
+
+    parser.add_argument('-j', '--jobs', type=int, metavar='N',
+                        help='Количество процессов (по умолчанию: 1, для --hash - число ядер)')
+
+    parser.add_argument('--unordered', action='store_true',
+                        help='С --jobs: выводить пачки по мере готовности, а не по порядку')
+
+    parser.add_argument('--unique', action='store_true',
+                        help='Гарантировать, что все пароли различны')
+
+    parser.add_argument('--deterministic', action='store_true',
+                        help='Воспроизводимые НЕ секретные пароли из --seed '
+                             '(только для тестовых данных)')
+
+    parser.add_argument('--seed', type=str, metavar='SEED',
+                        help='С --deterministic: seed, пароль номер i зависит только '
+                             'от seed, i и опций')
+
+    parser.add_argument('--range', type=str, metavar='START:END',
+                        help='С --deterministic: только пароли с номерами START..END-1 '
+                             '(без генерации предыдущих)')
+
+    parser.add_argument('--backend', choices=BACKENDS,
+                        help='Бэкенд генерации: python, numpy или auto (по умолчанию: python)')
+
+    parser.add_argument('-d', '--diceware', action='store_true',
+                        help='Режим diceware (запоминающиеся пароли из слов)')
+
+    parser.add_argument('--words', type=int,
+                        help='Количество слов для diceware (по умолчанию: 5)')
+
+    parser.add_argument('--separator', type=str,
+                        help='Разделитель между словами (по умолчанию: "-")')
+
+    parser.add_argument('--wordlist', type=str, metavar='PATH',
+                        help='Файл словаря для diceware (например, EFF large wordlist)')
+
+    parser.add_argument('--capitalize', action='store_true',
+                        help='Капитализировать первую букву каждого слова')
+
+    parser.add_argument('--add-number', action='store_true',
+                        help='Добавить случайное число в конец')
+
+    parser.add_argument('--serve', type=str, metavar='SOCKET',
+                        help='Режим сервера: Unix socket SOCKET или "-" для stdin/stdout')
+
+    parser.add_argument('--client', type=str, metavar='SOCKET',
+                        help='Получить пароли у запущенного сервера --serve')
+
+    parser.add_argument('--audit', type=str, metavar='FILE',
+                        help='Проверить силу паролей из файла (по одному в строке) или "-" для stdin')
+
+    parser.add_argument('--audit-report', type=str, metavar='FILE',
+                        help='С --audit: построчный отчёт в CSV или JSON Lines (.jsonl)')
+
+    parser.add_argument('--build-index', type=str, metavar='FILE',
+                        help='Построить индекс утечек --breach-index из списка паролей '
+                             'или SHA-1 хешей (FILE или "-" для stdin)')
+
+    parser.add_argument('--breach-index', type=str, metavar='FILE',
+                        help='Индекс утёкших паролей: совпадения генерируются заново '
+                             'и отмечаются при проверке')
+
+    parser.add_argument('--profile', action='store_true',
+                        help='Вывести в stderr время по этапам, паролей/с и пиковую память')
+
+    parser.add_argument('--profile-dump', type=str, metavar='FILE',
+                        help='С --profile: сохранить статистику cProfile в FILE '
+                             '(или "-" для сводки pstats в stderr)')
+
+    parser.set_defaults(**CLI_DEFAULTS)
+    return parser
+
+
+def parse_fast_args(argv):
+    """
+    Разбирает простые вызовы без argparse
+
+    Понимает только частые флаги (-l, -c, -s, --complex, --no-*,
+    --exclude-ambiguous, --show-strength, --raw, -d и опции diceware).
+    Если встречается что-то другое или значение некорректно, возвращает
+    None - тогда аргументы разбирает полный парсер, который и выводит
+    справку или ошибку.
+
+    Args:
+        argv (list): Аргументы командной строки без имени программы
+
+    Returns:
+        SimpleNamespace: Аргументы или None
+    """
+    from types import SimpleNamespace
+
+    options = dict(CLI_DEFAULTS)
+    args = iter(argv)
+    for arg in args:
+        dest = _FAST_FLAGS.get(arg)
+        if dest is not None:
+            options[dest] = True
+            continue
+        dest = _FAST_INT_OPTIONS.get(arg)
+        if dest is None:
+            return None
+        value = next(args, None)
+        # isdecimal(), а не isdigit(): "²" - цифра, но int() её не примет
+        if value is None or not value.isdecimal():
+            return None
+        options[dest] = int(value)
+    return SimpleNamespace(**options)
+
+
+def main():
+    """Главная функция CLI"""
+    args = parse_fast_args(sys.argv[1:])
+    if args is None:
+        args = build_parser().parse_args()
+
+    if args.profile_dump and not args.profile:
+        build_parser().error("--profile-dump используется только вместе с --profile")
+    try:
+        if not args.profile:
+            _run_cli(args)
+            return
+
+        # Отчёт выводится и при ошибке или выходе через sys.exit()
+        profiler = StageProfiler(dump=args.profile_dump)
+        profiler.enable()
+        try:
+            _run_cli(args)
+        finally:
+            profiler.disable()
+            print(profiler.report(), file=sys.stderr)
+    except BrokenPipeError:
+        # Читатель закрыл канал раньше времени (например, head): завершаемся
+        # без сообщения, а stdout направляем в /dev/null, чтобы сброс буфера
+        # при выходе не вызвал ту же ошибку повторно
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+
+
+def _run_cli(args):
+    """
+    Выполняет команду CLI по разобранным аргументам
+
+    Args:
+        args: Аргументы из build_parser() или parse_fast_args()
+    """
+    if args.stream and args.show_strength:
+        build_parser().error("--show-strength нельзя использовать вместе с --stream")
+    format_given = args.format is not None
+    if args.raw:
+        if args.format not in (None, 'text', 'raw'):
+            build_parser().error("--raw нельзя использовать вместе с --format")
+        args.format = 'raw'
+    elif not format_given:
+        args.format = 'text'
+    args.raw = args.format == 'raw'
+    # Форматы для программ выводятся без оформления и без --show-strength
+    machine_format = args.format in ('jsonl', 'csv', 'nul')
+    if machine_format and args.show_strength:
+        build_parser().error("--show-strength нельзя использовать с --format jsonl, csv и nul "
+                             "(используйте --metadata)")
+    if args.metadata and args.format not in ('jsonl', 'csv'):
+        build_parser().error("--metadata используется только с --format jsonl и csv")
+    if args.append and not args.output:
+        build_parser().error("--append используется только вместе с -o")
+    if (args.compress or args.encrypt) and not args.output:
+        build_parser().error("--compress и --encrypt используются только вместе с -o")
+    if (args.compress or args.encrypt) and args.append:
+        build_parser().error("--append нельзя использовать вместе с --compress и --encrypt")
+    if args.compress == 'zstd' and _load_zstd()[0] is None:
+        build_parser().error("для --compress zstd нужен Python 3.14+ или модуль zstandard")
+
+    # Интерактивный режим
+    if args.interactive:
+        interactive_mode()
+        return
+
+    # Явно заданное --jobs; без него --hash использует все ядра
+    jobs_given = args.jobs is not None
+    if not jobs_given:
+        args.jobs = 1
+    if args.jobs < 1:
+        build_parser().error("количество процессов --jobs должно быть не менее 1")
+    if args.hash_cost and not args.hash:
+        build_parser().error("--hash-cost используется только вместе с --hash")
+    if args.hash and (args.client or args.show_strength or args.metadata
+                      or args.append or args.format not in ('text', 'csv', 'jsonl')):
+        build_parser().error("--hash нельзя использовать вместе с --client, --show-strength, "
+                             "--metadata, --append и форматами raw и nul")
+    if args.client and (args.stream or args.jobs > 1 or args.wordlist or args.breach_index
+                        or args.unique):
+        build_parser().error("--client нельзя использовать вместе с --stream, --jobs, "
+                             "--wordlist, --breach-index и --unique")
+    if args.deterministic != (args.seed is not None):
+        build_parser().error("--deterministic и --seed используются только вместе")
+    if args.deterministic and (args.unique or args.client or args.serve):
+        build_parser().error("--deterministic нельзя использовать вместе с --unique, "
+                             "--client и --serve")
+    # Диапазон номеров паролей детерминированного режима
+    range_start = 0
+    if args.range is not None:
+        if not args.deterministic:
+            build_parser().error("--range используется только вместе с --deterministic")
+        if args.count is not None:
+            build_parser().error("--range нельзя использовать вместе с -c")
+        start, sep, end = args.range.partition(':')
+        if not (sep and start.isdigit() and end.isdigit() and int(start) < int(end)):
+            build_parser().error("--range задаётся как START:END, 0 <= START < END")
+        range_start = int(start)
+        args.count = int(end) - range_start
+    elif args.count is None:
+        args.count = 1
+    if args.entropy and args.client:
+        build_parser().error("--entropy нельзя использовать вместе с --client")
+    if args.audit_report and not args.audit:
+        build_parser().error("--audit-report используется только вместе с --audit")
+    if args.build_index and not args.breach_index:
+        build_parser().error("для --build-index укажите файл индекса в --breach-index")
+    if args.policy and (args.custom_chars or args.simple or args.complex or args.diceware
+                        or args.client or args.no_uppercase or args.no_digits
+                        or args.no_special or args.exclude_ambiguous):
+        build_parser().error("--policy нельзя использовать вместе с --custom-chars, --simple, "
+                             "--complex, --diceware, --client и --no-*/--exclude-ambiguous "
+                             "(типы символов задаются в файле политики)")
+
+    if args.pattern and (args.policy or args.custom_chars or args.simple or args.complex
+                         or args.diceware or args.client or args.no_uppercase
+                         or args.no_digits or args.no_special or args.length is not None):
+        build_parser().error("--pattern нельзя использовать вместе с --policy, --custom-chars, "
+                             "--simple, --complex, --diceware, --client, --no-* и -l "
+                             "(символы и длину задаёт шаблон)")
+
+    # Длина по умолчанию; с --policy её может задать файл политики
+    length_given = args.length is not None
+    if not length_given:
+        args.length = 12
+
+    # Рамка и нумерация в stdout - только для терминала или явного --format text;
+    # в конвейер и перенаправленный вывод пароли идут по одному в строке
+    decorate = (args.count != 1 and not args.raw
+                and (format_given or sys.stdout.isatty()))
+
+    try:
+        # Расшифровка файла
+        if args.decrypt:
+            passphrase = read_passphrase(confirm=False)
+            with open(args.decrypt, 'rb') as source:
+                if args.output:
+                    writer = PasswordWriter.open(args.output, format="raw")
+                    try:
+                        decrypt_stream(source, passphrase, writer)
+                    except BaseException:
+                        writer.discard()
+                        raise
+                    writer.close()
+                    print(f"Файл расшифрован: {args.output}")
+                else:
+                    decrypt_stream(source, passphrase, sys.stdout.buffer)
+                    sys.stdout.flush()
+            return
+
+        # Построение индекса утечек
+        if args.build_index:
+            index = BreachIndex.build(args.build_index, args.breach_index)
+            print(f"Индекс утечек сохранён в файл: {args.breach_index} "
+                  f"({len(index):,} хешей)")
+            return
+
+        breach_index = BreachIndex.open(args.breach_index) if args.breach_index else None
+
+        # Проверка существующих паролей
+        if args.audit:
+            stats = audit_passwords(args.audit, jobs=args.jobs, report=args.audit_report,
+                                    breach_index=breach_index)
+            print(stats.summary())
+            if args.audit_report:
+                print(f"\nОтчёт сохранён в файл: {args.audit_report}")
+            return
+
+        # Режим сервера
+        if args.serve:
+            wordlist = Wordlist.load(args.wordlist) if args.wordlist else None
+            server = PasswordServer(wordlist=wordlist, backend=args.backend,
+                                    breach_index=breach_index)
+            if args.serve == '-':
+                server.serve_stdio()
+            else:
+                server.serve_unix(args.serve)
+            return
+
+        generator = PasswordGenerator(backend=args.backend,
+                                      seed=args.seed if args.deterministic else None)
+        if args.backend == 'numpy' and generator.backend != 'numpy':
+            print("NumPy не установлен, используется бэкенд python", file=sys.stderr)
+        if args.deterministic:
+            generator.seek(range_start)
+        if args.deterministic and not args.entropy:
+            print("Внимание: --deterministic - пароли воспроизводятся по --seed и НЕ секретны, "
+                  "используйте их только для тестовых данных", file=sys.stderr)
+
+        def make_chunks(**options):
+            """Пачки паролей: в одном процессе или параллельно (--jobs)"""
+            if args.jobs > 1:
+                return generator.generate_parallel(args.count, jobs=args.jobs,
+                                                   ordered=not args.unordered, **options)
+            return generator.iter_batches(args.count, **options)
+
+        passphrase = read_passphrase() if args.encrypt else None
+
+        def output_options(metadata):
+            """Параметры записи: формат, метаданные (--metadata), --append и сжатие"""
+            format = args.format
+            if format == 'text' and not args.output and not decorate:
+                format = 'raw'
+            return dict(format=format, append=args.append,
+                        metadata=metadata if args.metadata else None,
+                        compress=args.compress, passphrase=passphrase,
+                        start=range_start + 1)
+
+        if args.hash:
+            hash_options = dict(
+                method=args.hash,
+                cost=parse_hash_cost(args.hash, args.hash_cost),
+                filename=args.output,
+                format='jsonl' if args.format == 'jsonl' else 'csv',
+                jobs=args.jobs if jobs_given else None,
+                compress=args.compress,
+                passphrase=passphrase
+            )
+
+        # Diceware режим
+        if args.diceware:
+            diceware_options = dict(
+                words=args.words,
+                separator=args.separator,
+                capitalize=args.capitalize,
+                add_number=args.add_number
+            )
+            if breach_index is not None:
+                diceware_options['breach_index'] = breach_index
+            if not args.client:
+                wordlist = Wordlist.load(args.wordlist) if args.wordlist else Wordlist.builtin()
+                if args.entropy:
+                    print(diceware_entropy_report(args.words, args.separator, args.capitalize,
+                                                  args.add_number, wordlist).format())
+                    return
+                diceware_options['wordlist'] = wordlist
+                diceware_options['unique'] = args.unique
+                warning = uniqueness_warning(
+                    args.count, diceware_entropy_bits(args.words, len(wordlist), args.add_number),
+                    args.unique)
+                if warning:
+                    print(f"Предупреждение: {warning}", file=sys.stderr)
+
+            def diceware_metadata(wordlist_size):
+                return dict(policy=f"diceware:{args.words}:{wordlist_size}",
+                            entropy_bits=diceware_entropy_bits(args.words, wordlist_size,
+                                                               args.add_number))
+
+            if args.hash:
+                export_hashes(generator.iter_batches(args.count, HASH_CHUNK_SIZE, diceware=True,
+                                                     **diceware_options), **hash_options)
+                return
+
+            # Потоковый режим: пароли пишутся пачками по мере генерации
+            if args.stream:
+                chunks = make_chunks(diceware=True, **diceware_options)
+                stream_passwords(chunks, args.count, "(diceware)", args.output,
+                                 length=args.words,
+                                 **output_options(diceware_metadata(len(wordlist))))
+                return
+
+            if args.client:
+                response = request_passwords(args.client, dict(
+                    mode='diceware', count=args.count, **diceware_options))
+                passwords = response['passwords']
+                wordlist_size = response['wordlist_size']
+            else:
+                wordlist_size = len(wordlist)
+                if args.jobs > 1:
+                    passwords = [pwd for chunk in make_chunks(diceware=True, **diceware_options)
+                                 for pwd in chunk]
+                else:
+                    passwords = generator.generate_diceware_multiple(count=args.count,
+                                                                     **diceware_options)
+
+            # Форматы для программ: в файл -o или в стандартный вывод
+            if machine_format:
+                stream_passwords([passwords], args.count, "(diceware)", args.output,
+                                 length=args.words,
+                                 **output_options(diceware_metadata(wordlist_size)))
+                return
+
+            # Выводим результат
+            if decorate:
+                print_passwords(passwords, start=range_start + 1,
+                                header=result_banner(args.count, "(diceware)"), footer="\n")
+            else:
+                print_passwords(passwords, numbered=False)
+
+            if args.show_strength:
+                bits_per_word = math.log2(wordlist_size)
+                bits = diceware_entropy_bits(args.words, wordlist_size, args.add_number)
+                if not decorate:
+                    print()
+                print(f"Энтропия: {bits:.1f} бит "
+                      f"(размер словаря: {wordlist_size}, {bits_per_word:.2f} бит на слово)")
+
+            # Сохраняем в файл если указан флаг -o
+            if args.output:
+                save_to_file(passwords, args.output, args.words, args.count,
+                             **output_options(None))
+
+            return
+
+        # Применяем предустановленные режимы
+        if args.simple:
+            use_uppercase = True
+            use_digits = True
+            use_special = False
+            exclude_ambiguous = True
+        elif args.complex:
+            args.length = max(args.length, 20)
+            use_uppercase = True
+            use_digits = True
+            use_special = True
+            exclude_ambiguous = False
+        else:
+            use_uppercase = not args.no_uppercase
+            use_digits = not args.no_digits
+            use_special = not args.no_special
+            exclude_ambiguous = args.exclude_ambiguous
+
+        # Компилируем набор символов один раз
+        if args.pattern:
+            policy = PatternPolicy.compile(args.pattern, args.exclude_ambiguous)
+            args.length = policy.length
+        elif args.policy:
+            policy = ConstraintPolicy.load(args.policy)
+            if policy.length and not length_given:
+                args.length = policy.length
+        else:
+            policy = CharsetPolicy.compile(
+                use_uppercase=use_uppercase,
+                use_digits=use_digits,
+                use_special=use_special,
+                exclude_ambiguous=exclude_ambiguous,
+                custom_chars=args.custom_chars
+            )
+
+        # Длину проверяем до расчёта энтропии и метаданных
+        if args.length < 4:
+            raise ValueError("Длина пароля должна быть не менее 4 символов")
+        if args.policy and not policy.keyspace(args.length):
+            raise ValueError(f"политике {args.policy} не удовлетворяет ни один "
+                             f"пароль длины {args.length}")
+
+        if args.entropy:
+            print(charset_entropy_report(args.length, policy=policy).format())
+            return
+
+        def chars_metadata():
+            return dict(policy=f"{policy.describe()}:{args.length}",
+                        entropy_bits=policy.entropy_bits(args.length))
+
+        chars_options = dict(length=args.length, policy=policy, breach_index=breach_index,
+                             unique=args.unique)
+        if not args.client:
+            warning = uniqueness_warning(args.count, policy.entropy_bits(args.length),
+                                         args.unique)
+            if warning:
+                print(f"Предупреждение: {warning}", file=sys.stderr)
+
+        if args.hash:
+            export_hashes(generator.iter_batches(args.count, HASH_CHUNK_SIZE, **chars_options),
+                          **hash_options)
+            return
+
+        # Потоковый режим: пароли пишутся пачками по мере генерации
+        if args.stream:
+            chunks = make_chunks(**chars_options)
+            stream_passwords(chunks, args.count, f"(длина: {args.length})", args.output,
+                             length=args.length, **output_options(chars_metadata()))
+            return
+
+        # Генерируем пароли
+        if args.client:
+            request = dict(mode='chars', count=args.count, length=args.length,
+                           use_uppercase=use_uppercase, use_digits=use_digits,
+                           use_special=use_special, exclude_ambiguous=exclude_ambiguous,
+                           custom_chars=args.custom_chars)
+            passwords = request_passwords(args.client, request)['passwords']
+        elif args.jobs > 1:
+            passwords = [pwd for chunk in make_chunks(**chars_options) for pwd in chunk]
+        else:
+            passwords = generator.generate_batch(count=args.count, **chars_options)
+
+        # Форматы для программ: в файл -o или в стандартный вывод
+        if machine_format:
+            stream_passwords([passwords], args.count, f"(длина: {args.length})", args.output,
+                             length=args.length, **output_options(chars_metadata()))
+            return
+
+        # Выводим результат
+        level_format = "  {}" if args.show_strength else None
+        if args.count == 1 and not args.raw:
+            print(passwords[0])
+            if args.show_strength:
+                result = check_password_strength(passwords[0])
+                print(f"\nСила пароля: {result.level}")
+                print(f"Детали: {result.details}")
+                print(f"Энтропия: {result.entropy_bits:.1f} бит по алфавиту, "
+                      f"{result.shannon_bits:.1f} бит по Шеннону")
+                if args.policy or args.pattern:
+                    print(f"Точная энтропия: {policy.entropy_bits(args.length):.1f} бит "
+                          f"({policy.keyspace(args.length):,} паролей)")
+        elif decorate:
+            print_passwords(passwords, start=range_start + 1, level_format=level_format,
+                            header=result_banner(args.count, f"(длина: {args.length})"),
+                            footer="\n")
+        else:
+            print_passwords(passwords, numbered=False, level_format=level_format)
+
+        # Сохраняем в файл если указан флаг -o
+        if args.output:
+            save_to_file(passwords, args.output, args.length, args.count,
+                         **output_options(None))
+
+    except BrokenPipeError:
+        raise
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Непредвиденная ошибка: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
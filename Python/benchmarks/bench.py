@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Бенчмарки генерации паролей, оценки силы и записи в файл
+
+Измеряет паролей/с и байт/с для generate, generate_multiple,
+generate_diceware_multiple, check_password_strength, check_strength_batch
+и save_to_file при разных длинах, количествах, флагах и бэкендах. Запуск:
+
+    python benchmarks/bench.py --quick
+    python benchmarks/bench.py --json results.json
+    python benchmarks/bench.py --baseline results.json --threshold 0.1
+
+С --baseline каждый случай сравнивается с сохранёнными результатами
+по медиане паролей/с; падение больше порога считается регрессией,
+и скрипт завершается с кодом 1.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import password_generator as pg  # noqa: E402
+
+LENGTHS = (8, 12, 16, 32, 64, 128)
+COUNTS = (1, 100, 10000, 1000000)
+QUICK_COUNTS = (1, 100, 10000)
+FLAG_SETS = {
+    "default": {},
+    "no-special": {"use_special": False},
+    "simple": {"use_special": False, "exclude_ambiguous": True},
+    "letters": {"use_digits": False, "use_special": False},
+    "custom": {"custom_chars": "abcdef0123456789"},
+}
+
+
+def percentile(values, fraction):
+    """Процентиль с линейной интерполяцией"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def measure(func, repeat, min_time):
+    """
+    Запускает функцию repeat раз (и не меньше min_time секунд суммарно)
+
+    Args:
+        func: Функция, возвращающая (паролей, байт)
+        repeat (int): Минимальное количество запусков
+        min_time (float): Минимальное суммарное время в секундах
+
+    Returns:
+        dict: Статистика запусков
+    """
+    timings = []
+    passwords = size = 0
+    started = time.perf_counter()
+    while len(timings) < repeat or time.perf_counter() - started < min_time:
+        start = time.perf_counter()
+        passwords, size = func()
+        timings.append(time.perf_counter() - start)
+
+    rates = [passwords / t for t in timings]
+    return {
+        "runs": len(timings),
+        "passwords": passwords,
+        "bytes": size,
+        "seconds_p50": percentile(timings, 0.5),
+        "seconds_p90": percentile(timings, 0.9),
+        "seconds_p99": percentile(timings, 0.99),
+        "passwords_per_sec_p50": percentile(rates, 0.5),
+        "passwords_per_sec_p10": percentile(rates, 0.1),
+        "bytes_per_sec_p50": size / percentile(timings, 0.5),
+    }
+
+
+def total_bytes(passwords):
+    """Размер паролей в байтах UTF-8 (с переводами строк)"""
+    return sum(len(pwd.encode("utf-8")) + 1 for pwd in passwords)
+
+
+def build_cases(quick):
+    """
+    Составляет список случаев бенчмарка
+
+    Args:
+        quick (bool): Сокращённый набор
+
+    Returns:
+        list: Пары (имя, функция)
+    """
+    counts = QUICK_COUNTS if quick else COUNTS
+    backends = ["python"]
+    if pg._load_numpy() is not None:
+        backends.append("numpy")
+    cases = []
+
+    def add(name, func):
+        cases.append((name, func))
+
+    # generate(): отдельный вызов на каждый пароль
+    generator = pg.PasswordGenerator()
+    for length in LENGTHS:
+        def run(length=length):
+            passwords = [generator.generate(length=length) for _ in range(1000)]
+            return len(passwords), total_bytes(passwords)
+        add(f"generate/length={length}/calls=1000", run)
+
+    # generate_multiple(): длины, количества, флаги и бэкенды
+    for backend in backends:
+        generator = pg.PasswordGenerator(backend=backend)
+        for length in LENGTHS:
+            def run(generator=generator, length=length):
+                passwords = generator.generate_multiple(10000, length=length)
+                return len(passwords), total_bytes(passwords)
+            add(f"generate_multiple/{backend}/length={length}/count=10000", run)
+        for count in counts:
+            def run(generator=generator, count=count):
+                passwords = generator.generate_multiple(count, length=16)
+                return len(passwords), total_bytes(passwords)
+            add(f"generate_multiple/{backend}/length=16/count={count}", run)
+        for flags_name, flags in FLAG_SETS.items():
+            def run(generator=generator, flags=flags):
+                passwords = generator.generate_multiple(10000, length=16, **flags)
+                return len(passwords), total_bytes(passwords)
+            add(f"generate_multiple/{backend}/flags={flags_name}/count=10000", run)
+
+    # generate_diceware_multiple()
+    generator = pg.PasswordGenerator()
+    for count in counts:
+        def run(count=count):
+            passwords = generator.generate_diceware_multiple(count)
+            return len(passwords), total_bytes(passwords)
+        add(f"generate_diceware_multiple/words=5/count={count}", run)
+    for options_name, options in (("words=8", {"words": 8}),
+                                  ("capitalize+number", {"capitalize": True, "add_number": True})):
+        def run(options=options):
+            passwords = generator.generate_diceware_multiple(10000, **options)
+            return len(passwords), total_bytes(passwords)
+        add(f"generate_diceware_multiple/{options_name}/count=10000", run)
+
+    # check_password_strength() на заранее сгенерированных паролях
+    for length in (8, 16, 64):
+        sample = generator.generate_multiple(10000, length=length)
+        sample_bytes = total_bytes(sample)
+
+        def run(sample=sample, sample_bytes=sample_bytes):
+            for pwd in sample:
+                pg.check_password_strength(pwd)
+            return len(sample), sample_bytes
+        add(f"check_password_strength/length={length}/count=10000", run)
+
+        def run_batch(sample=sample, sample_bytes=sample_bytes):
+            for _ in pg.check_strength_batch(sample):
+                pass
+            return len(sample), sample_bytes
+        add(f"check_strength_batch/length={length}/count=10000", run_batch)
+
+    # save_to_file()
+    for count in counts[1:]:
+        sample = generator.generate_multiple(count, length=16)
+        sample_bytes = total_bytes(sample)
+
+        def run(sample=sample, sample_bytes=sample_bytes):
+            with tempfile.TemporaryDirectory() as tmp:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    pg.save_to_file(sample, os.path.join(tmp, "out.txt"), 16)
+            return len(sample), sample_bytes
+        add(f"save_to_file/length=16/count={count}", run)
+
+        for fmt in ("raw", "jsonl", "csv", "nul"):
+            def run_format(sample=sample, sample_bytes=sample_bytes, fmt=fmt):
+                with tempfile.TemporaryDirectory() as tmp:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        pg.save_to_file(sample, os.path.join(tmp, "out"), 16, format=fmt)
+                return len(sample), sample_bytes
+            add(f"save_to_file/format={fmt}/length=16/count={count}", run_format)
+
+    return cases
+
+
+def compare(results, baseline, threshold):
+    """
+    Сравнивает результаты с базовыми
+
+    Args:
+        results (dict): Текущие результаты
+        baseline (dict): Сохранённые результаты
+        threshold (float): Допустимое падение (0.1 = 10%)
+
+    Returns:
+        list: Имена случаев с регрессией
+    """
+    regressions = []
+    print(f"\nСравнение с базовыми результатами (порог {threshold:.0%}):")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = current["passwords_per_sec_p50"] / base["passwords_per_sec_p50"]
+        marker = ""
+        if ratio < 1 - threshold:
+            marker = "  РЕГРЕССИЯ"
+            regressions.append(name)
+        print(f"  {name:<60} {ratio:6.2f}x{marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки генератора паролей")
+    parser.add_argument("--quick", action="store_true", help="Сокращённый набор (без 10^6)")
+    parser.add_argument("--filter", default="", help="Запускать только случаи с подстрокой")
+    parser.add_argument("--repeat", type=int, default=5, help="Минимум запусков на случай")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Минимальное время на случай в секундах")
+    parser.add_argument("--json", metavar="PATH", help="Сохранить результаты в JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="Сравнить с сохранёнными результатами")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Допустимое падение скорости (по умолчанию: 0.1)")
+    args = parser.parse_args()
+
+    results = {}
+    for name, func in build_cases(args.quick):
+        if args.filter not in name:
+            continue
+        stats = measure(func, args.repeat, args.min_time)
+        results[name] = stats
+        print(f"{name:<60} {stats['passwords_per_sec_p50']:>14,.0f} паролей/с "
+              f"{stats['bytes_per_sec_p50'] / 1e6:>8.1f} МБ/с "
+              f"p90 {stats['seconds_p90'] * 1e3:>9.2f} мс")
+
+    if args.json:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк времени запуска генератора паролей
+
+Измеряет время импорта модуля (по данным python -X importtime) и полное
+время запуска CLI для одиночного пароля. Запуск:
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 50 --max-import-ms 15
+
+Скрипт завершается с кодом 1, если загружены лишние модули или медиана
+запуска "script -l 16" дольше "python -c pass" больше чем на бюджет
+--max-overhead-ms. Бюджет по умолчанию меньше накладных расходов
+исходной однофайловой версии (около 45 мс сверх голого интерпретатора).
+Кеш байткода включён, как у обычного запуска, даже если задана
+переменная PYTHONDONTWRITEBYTECODE.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PYTHON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(PYTHON_DIR, "password_generator.py")
+
+# Модули, которые не должны загружаться при обычном запуске "-l 16"
+LAZY_MODULES = ("argparse", "datetime", "hashlib", "mmap", "concurrent.futures", "numpy")
+
+# Допустимое время запуска "-l 16" сверх "python -c pass", мс
+STARTUP_BUDGET_MS = 35
+
+# Окружение запусков: с кешем байткода
+ENV = {name: value for name, value in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"}
+
+
+def measure_import():
+    """
+    Импортирует модуль в отдельном процессе с -X importtime
+
+    Returns:
+        tuple: (суммарное время импорта в мс, {модуль: собственное время в мкс})
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import password_generator"],
+        cwd=PYTHON_DIR, env=ENV, capture_output=True, text=True, check=True
+    )
+    total_us = 0
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        name = name.strip()
+        modules[name] = int(self_us)
+        if name == "password_generator":
+            total_us = int(cumulative_us)
+    return total_us / 1000, modules
+
+
+def measure_runs(command, runs):
+    """
+    Запускает команду несколько раз и замеряет время
+
+    Args:
+        command (list): Команда
+        runs (int): Количество запусков
+
+    Returns:
+        list: Время каждого запуска в мс
+    """
+    # Первый запуск записывает байткод в __pycache__ и не учитывается
+    subprocess.run(command, cwd=PYTHON_DIR, env=ENV, stdout=subprocess.DEVNULL, check=True)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=PYTHON_DIR, env=ENV, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк времени запуска")
+    parser.add_argument("--runs", type=int, default=20, help="Количество запусков CLI")
+    parser.add_argument("--max-import-ms", type=float,
+                        help="Завершиться с ошибкой, если импорт дольше (мс)")
+    parser.add_argument("--max-overhead-ms", type=float, default=STARTUP_BUDGET_MS,
+                        help="Допустимое время запуска -l 16 сверх python -c pass "
+                             f"(мс, по умолчанию: {STARTUP_BUDGET_MS})")
+    args = parser.parse_args()
+
+    import_ms, modules = measure_import()
+    print(f"Импорт password_generator: {import_ms:.1f} мс")
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:5]
+    for name, self_us in slowest:
+        print(f"  {name:<30} {self_us / 1000:6.2f} мс")
+
+    loaded_lazy = [name for name in LAZY_MODULES if name in modules]
+    if loaded_lazy:
+        print(f"Загружены лишние модули: {', '.join(loaded_lazy)}")
+
+    commands = {
+        "script -l 16": [sys.executable, SCRIPT, "-l", "16"],
+        "-m -l 16": [sys.executable, "-m", "password_generator", "-l", "16"],
+        "python -c pass": [sys.executable, "-c", "pass"],
+    }
+    medians = {}
+    for label, command in commands.items():
+        timings = measure_runs(command, args.runs)
+        medians[label] = statistics.median(timings)
+        print(f"{label:<16} медиана {medians[label]:6.1f} мс, "
+              f"минимум {min(timings):6.1f} мс")
+
+    overhead = medians["script -l 16"] - medians["python -c pass"]
+    over_budget = overhead > args.max_overhead_ms
+    print(f"Накладные расходы запуска: {overhead:.1f} мс "
+          f"(бюджет {args.max_overhead_ms:.0f} мс){'  ПРЕВЫШЕН' if over_budget else ''}")
+
+    if (loaded_lazy or over_budget
+            or (args.max_import_ms is not None and import_ms > args.max_import_ms)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк масштабирования PasswordGenerator по потокам
+
+Все потоки используют один экземпляр PasswordGenerator: у каждого потока
+свой буфер энтропии. Для сравнения тот же прогон выполняется с общим
+буфером под блокировкой - так генератор работал бы без буферов на поток.
+Запуск:
+
+    python benchmarks/bench_threads.py
+    python benchmarks/bench_threads.py --threads 1 2 4 8 16 --batch 1
+
+На сборках Python с GIL рост ограничен временем, которое потоки проводят
+вне GIL (os.urandom); на free-threaded сборках (3.13t+) он близок
+к линейному.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import password_generator as pg  # noqa: E402
+
+
+class LockedEntropy:
+    """Один буфер энтропии на все потоки, доступ под блокировкой"""
+
+    def __init__(self):
+        self._buffer = pg.EntropyBuffer()
+        self._lock = threading.Lock()
+
+    def read(self, n):
+        with self._lock:
+            return self._buffer.read(n)
+
+    def randbelow(self, n):
+        with self._lock:
+            return self._buffer.randbelow(n)
+
+
+class SharedLockGenerator(pg.PasswordGenerator):
+    """Генератор с общим буфером энтропии под блокировкой"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._shared = LockedEntropy()
+
+    @property
+    def _entropy(self):
+        return self._shared
+
+
+def run(generator, threads, total, batch, length):
+    """
+    Генерирует total паролей в threads потоках пачками по batch
+
+    Returns:
+        float: Паролей в секунду
+    """
+    per_thread = total // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        done = 0
+        while done < per_thread:
+            done += len(generator.generate_batch(min(batch, per_thread - done), length=length))
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Масштабирование генератора по потокам")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Количество потоков (по умолчанию: 1 2 4 8)")
+    parser.add_argument("--total", type=int, default=200000,
+                        help="Паролей на прогон (по умолчанию: 200000)")
+    parser.add_argument("--batch", type=int, default=16,
+                        help="Паролей на вызов generate_batch (по умолчанию: 16)")
+    parser.add_argument("--length", type=int, default=16, help="Длина пароля")
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'включён' if gil else 'выключен'}, "
+          f"ядер: {os.cpu_count()}")
+    print(f"{'потоков':>8} {'буфер на поток, паролей/с':>26} {'ускорение':>10} "
+          f"{'общий буфер под lock':>20} {'ускорение':>10}")
+
+    generators = (pg.PasswordGenerator(), SharedLockGenerator())
+    baselines = [None, None]
+    for threads in args.threads:
+        row = [f"{threads:>8}"]
+        for i, generator in enumerate(generators):
+            rate = run(generator, threads, args.total, args.batch, args.length)
+            if baselines[i] is None:
+                baselines[i] = rate
+            width = 26 if i == 0 else 20
+            row.append(f"{rate:>{width},.0f} {rate / baselines[i]:>9.2f}x")
+        print(" ".join(row))
+
+
+if __name__ == "__main__":
+    main()